@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NumPy in-process conversion vs the old pydub/ffmpeg path
+
+Usage: python benchmarks/audio_conversion.py [--runs 20] [files ...]
+
+With no files, every PCM WAV in uploads/ is used, plus a synthetic 5 s
+48 kHz stereo clip. The legacy path is the conversion STTService used to do
+per request (AudioSegment.from_file -> set_frame_rate/channels/sample_width
+-> export via ffmpeg); it is skipped if pydub or ffmpeg is unavailable.
+"""
+
+import argparse
+import io
+import shutil
+import statistics
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from utils.audio_helper import convert_audio_format, parse_wav
+
+
+def synthetic_clip(seconds: float = 5.0, sample_rate: int = 48000) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    left = 0.3 * np.sin(2 * np.pi * 220 * t)
+    right = 0.3 * np.sin(2 * np.pi * 330 * t)
+    pcm = (np.stack([left, right], axis=1) * 32767).astype("<i2").tobytes()
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def legacy_convert(data: bytes) -> bytes:
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(io.BytesIO(data))
+    audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+    out = io.BytesIO()
+    audio.export(out, format="wav", parameters=["-ar", "16000", "-ac", "1"])
+    return out.getvalue()
+
+
+def legacy_available() -> bool:
+    try:
+        import pydub  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which("ffmpeg") is not None
+
+
+def time_runs(fn, data: bytes, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    inputs = [(path.name, path.read_bytes()) for path in args.files]
+    if not inputs:
+        for path in sorted((backend_dir / "uploads").glob("*.wav")):
+            data = path.read_bytes()
+            if parse_wav(data) is not None:
+                inputs.append((path.name, data))
+        inputs.append(("synthetic-48k-stereo-5s", synthetic_clip()))
+
+    run_legacy = legacy_available()
+    if not run_legacy:
+        print("[Bench] ⚠️ pydub/ffmpeg not available, timing the NumPy path only\n")
+
+    print(f"{'input':<44} {'format':>16} {'audio s':>8} {'numpy p50':>10} {'legacy p50':>11} {'speedup':>8}")
+    native_totals, legacy_totals = [], []
+    for name, data in inputs:
+        wav = parse_wav(data)
+        fmt = f"{wav.sample_rate}Hz/{wav.channels}ch/{wav.sample_width * 8}b" if wav else "compressed"
+        seconds = len(wav.pcm) / (wav.sample_rate * wav.channels * wav.sample_width) if wav else float("nan")
+
+        native = statistics.median(time_runs(convert_audio_format, data, args.runs))
+        native_totals.append(native)
+        legacy_cell, speedup_cell = "-", "-"
+        if run_legacy:
+            legacy = statistics.median(time_runs(legacy_convert, data, args.runs))
+            legacy_totals.append(legacy)
+            legacy_cell, speedup_cell = f"{legacy:.2f}ms", f"{legacy / native:.1f}x"
+
+        print(f"{name[-44:]:<44} {fmt:>16} {seconds:>8.2f} {native:>8.2f}ms {legacy_cell:>11} {speedup_cell:>8}")
+
+    print(f"\n[Bench] NumPy path total p50: {sum(native_totals):.1f}ms over {len(inputs)} inputs")
+    if legacy_totals:
+        print(f"[Bench] Legacy path total p50: {sum(legacy_totals):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
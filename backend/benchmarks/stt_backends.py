@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark an STT backend over the recordings in uploads/
+
+Usage: python benchmarks/stt_backends.py [--backend google|local|stub] [--runs 3] [--no-vad] [files ...]
+
+Each clip is decoded and VAD-trimmed once, exactly as STTService does,
+then recognized ``--runs`` times. Reports per-clip latency, overall p50/p95
+latency and the real-time factor (processing time / audio duration; below
+1.0 is faster than real time).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from services.stt_backends import create_backend
+from services.vad_service import VoiceActivityDetector, NoSpeechError
+from utils.audio_helper import convert_audio_format, TARGET_SAMPLE_RATE, TARGET_SAMPLE_WIDTH
+
+
+def load_clips(paths, use_vad: bool):
+    vad = VoiceActivityDetector()
+    clips = []
+    for path in paths:
+        try:
+            pcm = convert_audio_format(path.read_bytes())
+            if use_vad:
+                pcm = vad.trim(pcm, TARGET_SAMPLE_RATE).pcm
+        except NoSpeechError:
+            print(f"[Bench] Skipping {path.name}: no speech")
+            continue
+        except Exception as e:
+            print(f"[Bench] Skipping {path.name}: {e}")
+            continue
+        clips.append((path.name, pcm, len(pcm) / (TARGET_SAMPLE_RATE * TARGET_SAMPLE_WIDTH)))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--backend", default=None, help="Defaults to STT_BACKEND or google")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-vad", action="store_true", help="Recognize untrimmed audio")
+    args = parser.parse_args()
+
+    paths = args.files or sorted((backend_dir / "uploads").glob("*.wav"))
+    clips = load_clips(paths, use_vad=not args.no_vad)
+    if not clips:
+        print("[Bench] No usable recordings found")
+        return
+
+    backend = create_backend(args.backend)
+    print(f"[Bench] Backend: {backend.name}, {len(clips)} clips, {args.runs} runs each\n")
+    print(f"{'clip':<44} {'audio s':>8} {'p50 ms':>9} {'rtf':>6}  text")
+
+    latencies, processing, audio_seconds, errors = [], 0.0, 0.0, 0
+    for name, pcm, seconds in clips:
+        clip_times, text = [], ""
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            try:
+                text = backend.recognize(pcm, TARGET_SAMPLE_RATE, TARGET_SAMPLE_WIDTH)
+            except Exception as e:
+                errors += 1
+                text = f"<{type(e).__name__}>"
+            clip_times.append(time.perf_counter() - start)
+
+        latencies.extend(clip_times)
+        processing += sum(clip_times)
+        audio_seconds += seconds * args.runs
+        p50 = float(np.median(clip_times)) * 1000
+        print(f"{name[-44:]:<44} {seconds:>8.2f} {p50:>9.1f} {sum(clip_times) / (seconds * args.runs):>6.3f}  {text[:40]}")
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"\n[Bench] Latency p50: {np.percentile(latencies_ms, 50):.1f}ms  p95: {np.percentile(latencies_ms, 95):.1f}ms")
+    print(f"[Bench] Real-time factor: {processing / audio_seconds:.3f} ({audio_seconds:.1f}s of audio in {processing:.1f}s)")
+    if errors:
+        print(f"[Bench] ⚠️ {errors} of {len(latencies)} recognitions failed")
+
+
+if __name__ == "__main__":
+    main()
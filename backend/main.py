@@ -1,9 +1,72 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from routes import conversation, appointments
+from services.memory_service import shutdown_memory
+from services.executors import executor_stats, shutdown_executors
+from services.email_outbox import get_outbox
+from services.janitor import create_janitor
+from services.llm_service import FALLBACK_RESPONSE
+from services.metrics import REGISTRY, CONTENT_TYPE
 import uvicorn
 
-app = FastAPI(title="AI Receptionist - SmileCare Dental")
+# Keeps uploads/ and audio_outputs/ within their retention limits
+janitor = create_janitor(conversation.UPLOAD_DIR, conversation.tts_service.cache)
+
+def service_metrics():
+    """Scrape-time collector over the counters the services already keep"""
+    executors = executor_stats()
+    for field, kind, help in (
+        ("active", "gauge", "Jobs running on each stage executor"),
+        ("queued", "gauge", "Jobs waiting for a stage executor worker"),
+        ("completed", "counter", "Jobs finished by each stage executor"),
+        ("rejected", "counter", "Jobs refused because a stage executor queue was full"),
+    ):
+        yield (f"executor_{field}" if kind == "gauge" else f"executor_{field}_total", kind, help,
+               [({"stage": stage}, stats[field]) for stage, stats in executors.items()])
+
+    tts = conversation.tts_service.cache.stats()
+    llm_cache = conversation.llm_service.response_cache.stats()
+    yield ("cache_hits_total", "counter", "Cache lookups that were served from the cache",
+           [({"cache": "tts"}, tts["hits"]), ({"cache": "llm"}, llm_cache["hits"])])
+    yield ("cache_misses_total", "counter", "Cache lookups that fell through",
+           [({"cache": "tts"}, tts["misses"]), ({"cache": "llm"}, llm_cache["misses"])])
+    yield ("tts_cache_bytes", "gauge", "Size of the synthesized audio cache", [({}, tts["bytes"])])
+
+    faq = conversation.llm_service.faq.stats()
+    yield ("faq_hits_total", "counter", "Turns answered by the FAQ router without the model",
+           [({"intent": intent}, hits) for intent, hits in faq["hits_by_intent"].items()])
+
+    client = conversation.llm_service.client.stats()
+    yield ("llm_requests_total", "counter", "Model calls by outcome",
+           [({"outcome": outcome}, client[outcome])
+            for outcome in ("success", "error", "timeout", "throttled", "retries", "hedges", "hedge_wins")])
+
+    sweeps = janitor.stats()["directories"]
+    yield ("janitor_reclaimed_bytes_total", "counter", "Bytes deleted by the retention janitor",
+           [({"directory": name}, metrics["reclaimed_bytes"]) for name, metrics in sweeps.items()])
+
+REGISTRY.add_collector(service_metrics)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume delivering confirmations left pending by the previous run
+    await get_outbox().start()
+    # Fixed prompts are synthesized (or loaded) once and pinned in the TTS cache
+    await conversation.tts_service.prewarm(
+        [conversation.GREETING_TEXT, FALLBACK_RESPONSE] + conversation.llm_service.faq.common_answers()
+    )
+    # Started after prewarm so the fixed prompts are already pinned
+    await janitor.start()
+    yield
+    await janitor.stop()
+    await get_outbox().stop()
+    conversation.tts_service.close()
+    # Flush queued conversation writes before the worker exits
+    shutdown_memory()
+    shutdown_executors()
+
+app = FastAPI(title="AI Receptionist - SmileCare Dental", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -28,7 +91,20 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "executors": executor_stats(),
+        "janitor": janitor.stats(),
+        "faq": conversation.llm_service.faq.stats(),
+        "llm_cache": conversation.llm_service.response_cache.stats(),
+        "llm_client": conversation.llm_service.client.stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies and service counters"""
+    # Set as a header: media_type would get a second charset appended
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
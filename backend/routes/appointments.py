@@ -1,27 +1,59 @@
-from fastapi import APIRouter, HTTPException
-from services.memory_service import ConversationMemory
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from services.memory_service import get_memory
+from services.email_outbox import get_outbox
+from services import events
+import asyncio
+import json
 
 router = APIRouter()
-memory = ConversationMemory()
 
 @router.get("/list")
-async def list_appointments():
-    """Get all appointments"""
-    all_appointments = []
-    for session_id, session_data in memory.sessions.items():
-        for appointment in session_data.get("appointments", []):
-            all_appointments.append({
-                "session_id": session_id,
-                **appointment
-            })
+async def list_appointments(date: str = None, dentist: str = None, memory=Depends(get_memory)):
+    """Get all appointments, optionally filtered by date and dentist"""
+    all_appointments = memory.list_appointments(date=date, dentist=dentist)
     return {"appointments": all_appointments, "count": len(all_appointments)}
 
+@router.get("/events")
+async def appointment_events(request: Request, memory=Depends(get_memory)):
+    """Server-sent events stream of newly booked appointments"""
+    queue, unsubscribe = memory.events.subscribe_queue()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["type"] == events.APPOINTMENT_BOOKED:
+                    payload = {"session_id": event["session_id"], **event["appointment"]}
+                    yield f"event: appointment\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            unsubscribe()
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@router.get("/outbox/status")
+async def outbox_status(outbox=Depends(get_outbox)):
+    """Confirmation email queue: pending, sent and dead-lettered jobs"""
+    return outbox.status()
+
+@router.post("/outbox/{job_id}/retry")
+async def retry_outbox_job(job_id: str, outbox=Depends(get_outbox)):
+    """Move a dead-lettered confirmation back onto the queue"""
+    if not outbox.retry_dead(job_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered job not found")
+    return {"status": "queued", "id": job_id}
+
 @router.get("/{session_id}")
-async def get_session_appointments(session_id: str):
+async def get_session_appointments(session_id: str, memory=Depends(get_memory)):
     """Get appointments for a specific session"""
-    if session_id not in memory.sessions:
+    session = memory.get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
     return {
-        "appointments": memory.sessions[session_id].get("appointments", [])
+        "appointments": session.get("appointments", [])
     }
\ No newline at end of file
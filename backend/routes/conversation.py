@@ -1,12 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
 from services.stt_service import STTService
 from services.llm_service import LLMService
 from services.tts_service import TTSService
-from services.memory_service import ConversationMemory
-from services.email_service import EmailService
-import aiofiles
-import os
+from services.memory_service import get_memory
+from services.email_outbox import get_outbox
+from services.booking_slots import BookingSlots
+from services.metrics import STAGE_SECONDS, TURN_SECONDS, TURNS_IN_FLIGHT, INTENTS, BOOKINGS
+from services.endpointer import UtteranceEndpointer, SPEECH_STARTED, PAUSE, END_OF_UTTERANCE
+import asyncio
+import json
+import mimetypes
+import struct
+import time
 from pathlib import Path
 import uuid
 import traceback
@@ -17,14 +23,14 @@ router = APIRouter()
 stt_service = STTService()
 llm_service = LLMService()
 tts_service = TTSService()
-memory = ConversationMemory()
-email_service = EmailService()
 
 # Paths
 BASE_DIR = Path(__file__).parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 AUDIO_OUTPUT_DIR = BASE_DIR / "audio_outputs"
 
+GREETING_TEXT = "Hello! I'm Sarah, the AI receptionist at SmileCare Dental. How may I help you today?"
+
 # Create directories
 UPLOAD_DIR.mkdir(exist_ok=True, parents=True)
 AUDIO_OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
@@ -33,9 +39,228 @@ print(f"[Routes] Base directory: {BASE_DIR}")
 print(f"[Routes] Upload directory: {UPLOAD_DIR}")
 print(f"[Routes] Audio output directory: {AUDIO_OUTPUT_DIR}")
 
+# Opt-in single round-trip responses for voice turns (see _inline_response)
+VOICE_TURN_MEDIA_TYPE = "application/x-voice-turn"
+
+def _inline_mode(request: Request, inline: str = None):
+    """``binary`` / ``multipart`` if the client asked for inline audio, else None"""
+    if inline in ("binary", "multipart"):
+        return inline
+    accept = request.headers.get("accept", "")
+    if VOICE_TURN_MEDIA_TYPE in accept:
+        return "binary"
+    if "multipart/mixed" in accept:
+        return "multipart"
+    return None
+
+def _inline_response(payload: dict, mode: str):
+    """
+    Return the turn's JSON payload and its synthesized audio in one response
+    
+    binary:    4-byte big-endian header length, UTF-8 JSON header, audio bytes
+    multipart: multipart/mixed with an application/json part and an audio part
+    
+    The JSON header is the usual payload plus ``audio_media_type`` and
+    ``audio_length``; ``audio_url`` stays valid for replay. Falls back to plain
+    JSON if the clip is no longer cached.
+    """
+    audio_name = payload["audio_url"].rsplit("/", 1)[-1]
+    audio = tts_service.cache.read(audio_name)
+    if audio is None:
+        return payload
+    
+    media_type = mimetypes.guess_type(audio_name)[0] or "application/octet-stream"
+    header = json.dumps({**payload, "audio_media_type": media_type, "audio_length": len(audio)}).encode("utf-8")
+    headers = {"Cache-Control": "no-store", "Vary": "Accept"}
+    
+    if mode == "binary":
+        body = struct.pack(">I", len(header)) + header + audio
+        return Response(content=body, media_type=VOICE_TURN_MEDIA_TYPE, headers=headers)
+    
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        header,
+        f"\r\n--{boundary}\r\nContent-Type: {media_type}\r\nContent-Length: {len(audio)}\r\n\r\n".encode(),
+        audio,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}", headers=headers)
+
+async def _handle_booking(session_id: str, intent: str, metadata: dict, memory):
+    """Record a completed booking and queue the confirmation email"""
+    if intent == "book_appointment" and metadata:
+        print(f"[Process] Booking appointment: {metadata}")
+        with STAGE_SECONDS.time("persistence"):
+            # Clears the booking form so the caller can book again
+            memory.update_metadata(session_id, {**metadata, **BookingSlots.completed().to_metadata()})
+            memory.add_appointment(session_id, metadata)
+        BOOKINGS.inc()
+        
+        # Queue confirmation email; the outbox worker delivers it off the turn
+        if "email" in metadata:
+            with STAGE_SECONDS.time("email"):
+                get_outbox().enqueue(metadata["email"], metadata)
+
+def _update_slots(session_id: str, user_text: str, memory) -> BookingSlots:
+    """Fold the user's message into the session's booking form, persisting any change"""
+    with STAGE_SECONDS.time("slots"):
+        booking = BookingSlots.from_metadata(memory.get_metadata(session_id))
+        changed = booking.update(user_text)
+        if changed:
+            print(f"[Process] Booking slots: {changed} (missing: {booking.missing})")
+            memory.update_metadata(session_id, booking.to_metadata())
+    return booking
+
+async def _run_turn(session_id: str, user_text: str, memory) -> dict:
+    """Everything after STT: memory -> LLM -> booking -> TTS"""
+    # Add user message to memory
+    with STAGE_SECONDS.time("persistence"):
+        memory.add_message(session_id, "user", user_text)
+    
+    # Step 2: Get LLM response
+    print(f"[Process] Getting LLM response...")
+    booking = _update_slots(session_id, user_text, memory)
+    context = memory.get_context(session_id)
+    with STAGE_SECONDS.time("llm"):
+        llm_result = await llm_service.get_response(user_text, context.messages, context.summary, booking)
+    
+    assistant_response = llm_result["response"]
+    intent = llm_result["intent"]
+    metadata = llm_result.get("metadata")
+    
+    print(f"[Process] Assistant: {assistant_response}")
+    print(f"[Process] Intent: {intent}")
+    INTENTS.inc(intent)
+    
+    # Add assistant message to memory
+    with STAGE_SECONDS.time("persistence"):
+        memory.add_message(session_id, "assistant", assistant_response)
+    
+    # Step 3: Handle appointment booking
+    await _handle_booking(session_id, intent, metadata, memory)
+    
+    # Step 4: Text to Speech
+    print(f"[Process] Generating TTS...")
+    with STAGE_SECONDS.time("tts"):
+        audio_response_path = await tts_service.text_to_speech(assistant_response)
+    print(f"[Process] Audio generated at: {audio_response_path}")
+    
+    # Verify audio file exists
+    if not Path(audio_response_path).exists():
+        raise Exception(f"Audio file not generated: {audio_response_path}")
+    
+    audio_filename = Path(audio_response_path).name
+    
+    return {
+        "session_id": session_id,
+        "user_text": user_text,
+        "assistant_text": assistant_response,
+        "intent": intent,
+        "metadata": metadata,
+        "audio_url": f"/api/conversation/audio/{audio_filename}"
+    }
+
+async def _timed_tts(text: str) -> str:
+    with STAGE_SECONDS.time("tts"):
+        return await tts_service.text_to_speech(text)
+
+async def _run_streaming_turn(session_id: str, user_text: str, memory, send) -> dict:
+    """Streaming variant of _run_turn
+
+    Gemini output is consumed as it is generated and every completed
+    sentence is handed to TTS immediately. ``audio_segment`` events are
+    sent in sentence order as soon as each clip is ready, so the first
+    audio reaches the client long before the full reply is finished.
+    """
+    with STAGE_SECONDS.time("persistence"):
+        memory.add_message(session_id, "user", user_text)
+    booking = _update_slots(session_id, user_text, memory)
+    context = memory.get_context(session_id)
+    
+    segments: asyncio.Queue = asyncio.Queue()
+    
+    async def deliver_segments() -> int:
+        index = 0
+        while True:
+            item = await segments.get()
+            if item is None:
+                return index
+            text, synthesis = item
+            try:
+                audio_path = await synthesis
+            except Exception as e:
+                print(f"[Stream] ✗ TTS failed for segment {index}: {e}")
+                await send({"type": "error", "detail": str(e), "segment": index})
+                continue
+            await send({
+                "type": "audio_segment",
+                "index": index,
+                "text": text,
+                "audio_url": f"/api/conversation/audio/{Path(audio_path).name}"
+            })
+            index += 1
+    
+    delivery = asyncio.create_task(deliver_segments())
+    syntheses = []
+    try:
+        llm_result = None
+        llm_started = time.perf_counter()
+        try:
+            async for event in llm_service.stream_response(user_text, context.messages, context.summary, booking):
+                if event["type"] == "sentence":
+                    synthesis = asyncio.create_task(_timed_tts(event["text"]))
+                    syntheses.append(synthesis)
+                    segments.put_nowait((event["text"], synthesis))
+                else:
+                    llm_result = event
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - llm_started, "llm")
+            segments.put_nowait(None)
+        
+        assistant_response = llm_result["response"]
+        intent = llm_result["intent"]
+        metadata = llm_result.get("metadata")
+        print(f"[Stream] Assistant: {assistant_response}")
+        INTENTS.inc(intent)
+        
+        with STAGE_SECONDS.time("persistence"):
+            memory.add_message(session_id, "assistant", assistant_response)
+        await send({"type": "assistant", "text": assistant_response, "intent": intent, "metadata": metadata})
+        
+        await _handle_booking(session_id, intent, metadata, memory)
+        segment_count = await delivery
+    finally:
+        # On failure no audio_segment may follow the turn's error event
+        pending = [task for task in [delivery, *syntheses] if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    return {
+        "session_id": session_id,
+        "user_text": user_text,
+        "assistant_text": assistant_response,
+        "intent": intent,
+        "metadata": metadata,
+        "segments": segment_count
+    }
+
 @router.post("/process-voice")
-async def process_voice(audio: UploadFile = File(...), session_id: str = None):
-    """Process voice input: STT -> LLM -> TTS"""
+async def process_voice(
+    request: Request,
+    audio: UploadFile = File(...),
+    session_id: str = None,
+    inline: str = None,
+    memory=Depends(get_memory)
+):
+    """Process voice input: STT -> LLM -> TTS
+    
+    Pass ``inline=binary|multipart`` (or the matching Accept header) to get
+    the audio in the same response instead of fetching ``audio_url``.
+    """
+    started = time.perf_counter()
+    TURNS_IN_FLIGHT.inc("process_voice")
     try:
         print(f"\n[Process] New voice message")
         
@@ -45,132 +270,234 @@ async def process_voice(audio: UploadFile = File(...), session_id: str = None):
         
         print(f"[Process] Session ID: {session_id}")
         
-        # Save uploaded audio
-        audio_path = UPLOAD_DIR / f"{session_id}_{audio.filename}"
-        async with aiofiles.open(audio_path, 'wb') as f:
+        # Keep the upload in memory; STT decodes it without temp files
+        with STAGE_SECONDS.time("upload"):
             content = await audio.read()
-            await f.write(content)
-        
-        print(f"[Process] Saved audio to: {audio_path}")
+        print(f"[Process] Received audio: {audio.filename} ({len(content)} bytes)")
         
         # Step 1: Speech to Text
         print(f"[Process] Starting STT...")
-        user_text = await stt_service.transcribe_audio(str(audio_path))
+        with STAGE_SECONDS.time("stt"):
+            user_text = await stt_service.transcribe_bytes(content, session_id)
         print(f"[Process] User said: {user_text}")
         
-        # Add user message to memory
-        memory.add_message(session_id, "user", user_text)
-        
-        # Step 2: Get LLM response
-        print(f"[Process] Getting LLM response...")
-        conversation_history = memory.get_history(session_id)
-        llm_result = await llm_service.get_response(user_text, conversation_history)
-        
-        assistant_response = llm_result["response"]
-        intent = llm_result["intent"]
-        metadata = llm_result.get("metadata")
+        result = await _run_turn(session_id, user_text, memory)
         
-        print(f"[Process] Assistant: {assistant_response}")
-        print(f"[Process] Intent: {intent}")
-        
-        # Add assistant message to memory
-        memory.add_message(session_id, "assistant", assistant_response)
-        
-        # Step 3: Handle appointment booking
-        if intent == "book_appointment" and metadata:
-            print(f"[Process] Booking appointment: {metadata}")
-            memory.update_metadata(session_id, metadata)
-            memory.add_appointment(session_id, metadata)
-            
-            # Send confirmation email
-            if "email" in metadata:
-                await email_service.send_appointment_confirmation(
-                    metadata["email"],
-                    metadata
-                )
-        
-        # Step 4: Text to Speech
-        print(f"[Process] Generating TTS...")
-        audio_response_path = await tts_service.text_to_speech(assistant_response)
-        print(f"[Process] Audio generated at: {audio_response_path}")
-        
-        # Verify audio file exists
-        if not Path(audio_response_path).exists():
-            raise Exception(f"Audio file not generated: {audio_response_path}")
-        
-        # Cleanup uploaded file
-        try:
-            os.remove(audio_path)
-            print(f"[Process] Cleaned up uploaded file")
-        except:
-            pass
-        
-        audio_filename = Path(audio_response_path).name
-        
-        return {
-            "session_id": session_id,
-            "user_text": user_text,
-            "assistant_text": assistant_response,
-            "intent": intent,
-            "metadata": metadata,
-            "audio_url": f"/api/conversation/audio/{audio_filename}"
-        }
+        mode = _inline_mode(request, inline)
+        return _inline_response(result, mode) if mode else result
         
     except Exception as e:
         print(f"[Process] ✗ Error: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        TURNS_IN_FLIGHT.dec("process_voice")
+        TURN_SECONDS.observe(time.perf_counter() - started, "process_voice")
+
+# PCM sample rates the stream endpoint accepts (telephone to studio audio)
+STREAM_SAMPLE_RATES = range(8000, 48001)
+
+@router.websocket("/stream")
+async def stream_voice(websocket: WebSocket, session_id: str = None, sample_rate: int = 16000, memory=Depends(get_memory)):
+    """Streaming voice turns over a WebSocket
 
-@router.get("/audio/{filename}")
-async def get_audio(filename: str):
-    """Serve audio file"""
+    The client sends 16-bit mono little-endian PCM as binary frames while
+    the caller speaks (optionally ``{"type": "end"}`` to force the end of an
+    utterance). The server detects end-of-utterance itself and pushes JSON
+    events: ready, speech_started, partial, transcript, audio_segment (one
+    per sentence, in order), assistant, done, error.
+    """
+    if sample_rate not in STREAM_SAMPLE_RATES:
+        print(f"[Stream] ✗ Rejected sample rate {sample_rate} Hz")
+        await websocket.close(code=1008, reason="sample_rate must be between 8000 and 48000")
+        return
+    
+    await websocket.accept()
+    
+    if not session_id:
+        session_id = str(uuid.uuid4())
+    
+    print(f"\n[Stream] Session {session_id} connected ({sample_rate} Hz)")
+    
+    endpointer = UtteranceEndpointer(sample_rate=sample_rate)
+    turn_lock = asyncio.Lock()
+    tasks = set()
+    partial_task = None
+    
+    async def send(event: dict):
+        try:
+            await websocket.send_json(event)
+        except Exception:
+            pass
+    
+    def spawn(coro):
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+    
+    async def send_partial(pcm: bytes):
+        try:
+            text = await stt_service.transcribe_pcm(pcm, sample_rate, session_id=session_id)
+            await send({"type": "partial", "text": text})
+        except Exception:
+            # Partial transcripts are best effort; mid-utterance audio often fails
+            pass
+    
+    async def finish_utterance(pcm: bytes):
+        async with turn_lock:
+            started = time.perf_counter()
+            try:
+                with STAGE_SECONDS.time("stt"):
+                    user_text = await stt_service.transcribe_pcm(pcm, sample_rate, session_id=session_id)
+                print(f"[Stream] User said: {user_text}")
+                await send({"type": "transcript", "text": user_text})
+                
+                result = await _run_streaming_turn(session_id, user_text, memory, send)
+                await send({"type": "done", "segments": result["segments"]})
+            except Exception as e:
+                print(f"[Stream] ✗ Error: {str(e)}")
+                await send({"type": "error", "detail": str(e)})
+            finally:
+                TURN_SECONDS.observe(time.perf_counter() - started, "stream")
+    
+    await send({"type": "ready", "session_id": session_id, "sample_rate": sample_rate})
+    
     try:
-        print(f"\n[Audio] Request for file: {filename}")
-        
-        audio_path = AUDIO_OUTPUT_DIR / filename
-        
-        print(f"[Audio] Full path: {audio_path}")
-        print(f"[Audio] File exists: {audio_path.exists()}")
-        
-        if not audio_path.exists():
-            # List all files in directory for debugging
-            all_files = list(AUDIO_OUTPUT_DIR.glob("*"))
-            print(f"[Audio] Files in directory: {[f.name for f in all_files]}")
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
             
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Audio file not found: {filename}"
-            )
-        
-        file_size = audio_path.stat().st_size
-        print(f"[Audio] Serving file. Size: {file_size} bytes")
-        
-        return FileResponse(
-            path=str(audio_path),
-            media_type="audio/mpeg",
-            filename=filename
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"[Audio] ✗ Error: {str(e)}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+            if message.get("bytes"):
+                events = endpointer.feed(message["bytes"])
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                events = [END_OF_UTTERANCE] if control.get("type") == "end" else []
+            else:
+                continue
+            
+            for event in events:
+                if event == SPEECH_STARTED:
+                    await send({"type": "speech_started"})
+                elif event == PAUSE and (partial_task is None or partial_task.done()):
+                    partial_task = spawn(send_partial(bytes(endpointer.audio)))
+                elif event == END_OF_UTTERANCE:
+                    pcm = endpointer.take_utterance()
+                    if partial_task is not None:
+                        partial_task.cancel()
+                        partial_task = None
+                    if pcm:
+                        spawn(finish_utterance(pcm))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Drop any partial transcript but let a turn in progress finish its booking
+        if partial_task is not None:
+            partial_task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print(f"[Stream] Session {session_id} disconnected")
+
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def _parse_range(header: str, size: int):
+    """
+    Parse a single ``bytes=`` Range header
+    
+    Returns:
+        (start, end) inclusive, None to serve the whole file, or "invalid"
+        if the range cannot be satisfied
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        # Multiple ranges are allowed to be answered with the full body
+        return None
+    
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start_text:
+            suffix = int(end_text)
+            if suffix <= 0:
+                return "invalid"
+            return max(0, size - suffix), size - 1
+        
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    
+    if end < start:
+        # Malformed (RFC 9110): ignore the header rather than answer 416
+        return None
+    if start >= size:
+        return "invalid"
+    return start, min(end, size - 1)
+
+@router.api_route("/audio/{filename}", methods=["GET", "HEAD"])
+async def get_audio(filename: str, request: Request):
+    """Serve audio file
+    
+    Filenames are content hashes, so responses are immutable: they carry a
+    strong ETag and a one-year Cache-Control, and support Range requests
+    for seeking. Lookups go through the TTS cache index, never the disk.
+    """
+    size = tts_service.cache.size(filename)
+    if size is None:
+        print(f"[Audio] ✗ Not found: {filename}")
+        raise HTTPException(status_code=404, detail=f"Audio file not found: {filename}")
+    
+    etag = f'"{Path(filename).stem}-{size}"'
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": AUDIO_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+    
+    if request.headers.get("if-none-match") in (etag, "*"):
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = None
+    if request.headers.get("if-range") in (None, etag):
+        byte_range = _parse_range(request.headers.get("range"), size)
+    
+    if byte_range == "invalid":
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+    
+    if byte_range is None:
+        # Whole clip: served from the hot tier when it is there
+        data = tts_service.cache.read(filename)
+    else:
+        # Seek to the requested span instead of loading the whole clip
+        start, end = byte_range
+        data = tts_service.cache.read_range(filename, start, end)
+    if data is None:
+        print(f"[Audio] ✗ Indexed file missing on disk: {filename}")
+        raise HTTPException(status_code=404, detail=f"Audio file not found: {filename}")
+    
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+    
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(content=data, status_code=206, media_type=media_type, headers=headers)
 
 @router.get("/history/{session_id}")
-async def get_conversation_history(session_id: str):
+async def get_conversation_history(session_id: str, memory=Depends(get_memory)):
     """Get conversation history"""
     print(f"\n[History] Request for session: {session_id}")
     
-    if session_id not in memory.sessions:
+    session = memory.get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return memory.sessions[session_id]
+    return session
 
 @router.get("/greeting")  # Changed to GET
-async def get_greeting(session_id: str = None):
+async def get_greeting(request: Request, session_id: str = None, inline: str = None, memory=Depends(get_memory)):
     """Get initial greeting"""
+    started = time.perf_counter()
+    TURNS_IN_FLIGHT.inc("greeting")
     try:
         print(f"\n[Greeting] New greeting request")
         
@@ -179,14 +506,16 @@ async def get_greeting(session_id: str = None):
         
         print(f"[Greeting] Session ID: {session_id}")
         
-        greeting_text = "Hello! I'm Sarah, the AI receptionist at SmileCare Dental. How may I help you today?"
+        greeting_text = GREETING_TEXT
         
-        memory.create_session(session_id)
-        memory.add_message(session_id, "assistant", greeting_text)
+        with STAGE_SECONDS.time("persistence"):
+            memory.create_session(session_id)
+            memory.add_message(session_id, "assistant", greeting_text)
         
         # Generate greeting audio
         print(f"[Greeting] Calling TTS service...")
-        audio_path = await tts_service.text_to_speech(greeting_text)
+        with STAGE_SECONDS.time("tts"):
+            audio_path = await tts_service.text_to_speech(greeting_text)
         print(f"[Greeting] TTS returned path: {audio_path}")
         
         # Convert to Path object and verify
@@ -210,9 +539,13 @@ async def get_greeting(session_id: str = None):
         
         print(f"[Greeting] Returning response: {response}")
         
-        return response
+        mode = _inline_mode(request, inline)
+        return _inline_response(response, mode) if mode else response
         
     except Exception as e:
         print(f"[Greeting] ✗ Error: {str(e)}")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        TURNS_IN_FLIGHT.dec("greeting")
+        TURN_SECONDS.observe(time.perf_counter() - started, "greeting")
\ No newline at end of file
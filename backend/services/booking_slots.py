@@ -0,0 +1,111 @@
+import re
+from typing import Dict, List, Optional
+from services.context_window import extract_facts
+from utils.date_parser import parse_date, parse_time, get_day_of_week, is_weekend
+from utils.validators import validate_email, validate_date, validate_time, validate_service, validate_dentist
+
+SLOTS = ["name", "email", "service", "date", "time", "dentist"]
+
+COLLECTING = "collecting"
+READY = "ready"
+BOOKED = "booked"
+
+_DATE_PHRASE = re.compile(
+    r"\b(today|tomorrow|"
+    r"(?:next |this )?(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)|"
+    r"\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})\b"
+)
+# Explicit times only; parse_time alone would read "good morning" as 09:00
+_TIME_PHRASE = re.compile(
+    r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b|\b(?:noon|in the (?:morning|afternoon|evening))\b"
+)
+
+
+class BookingSlots:
+    """Per-session booking form filled in turn by turn
+
+    Each user message is scanned for the booking fields; a value is kept
+    only once it passes the validators (a real service, a future business
+    day, a time within opening hours, ...). The state is stored in the
+    session metadata, so it survives restarts, and the prompt only has to
+    tell the model what is known and what is still missing.
+    """
+
+    def __init__(self, values: Dict[str, str] = None, state: str = COLLECTING):
+        self.values = dict(values or {})
+        self.state = state
+
+    @classmethod
+    def from_metadata(cls, metadata: Optional[Dict]) -> "BookingSlots":
+        metadata = metadata or {}
+        return cls(metadata.get("booking_slots"), metadata.get("booking_state", COLLECTING))
+
+    @classmethod
+    def completed(cls) -> "BookingSlots":
+        """Empty form after a booking, ready for the caller's next one"""
+        return cls(state=BOOKED)
+
+    def to_metadata(self) -> Dict:
+        return {"booking_slots": dict(self.values), "booking_state": self.state}
+
+    @property
+    def missing(self) -> List[str]:
+        return [slot for slot in SLOTS if slot not in self.values]
+
+    def update(self, text: str) -> Dict[str, str]:
+        """Fill slots from a user message; returns the slots that changed"""
+        changed = {
+            slot: value for slot, value in self.extract(text).items()
+            if self.values.get(slot) != value
+        }
+        if changed:
+            self.values.update(changed)
+            self.state = READY if not self.missing else COLLECTING
+        return changed
+
+    @staticmethod
+    def extract(text: str) -> Dict[str, str]:
+        """Validated booking fields stated in one message"""
+        found = {}
+        facts = extract_facts(text)
+        if "name" in facts:
+            found["name"] = facts["name"]
+        if "email" in facts and validate_email(facts["email"]):
+            found["email"] = facts["email"]
+        if "service" in facts and validate_service(facts["service"]):
+            found["service"] = facts["service"]
+        if "dentist" in facts and validate_dentist(facts["dentist"]):
+            found["dentist"] = facts["dentist"]
+
+        lowered = text.lower()
+        date_phrase = _DATE_PHRASE.search(lowered)
+        if date_phrase:
+            date = parse_date(date_phrase.group(0))
+            if date and validate_date(date) and not is_weekend(date):
+                found["date"] = date
+        time_phrase = _TIME_PHRASE.search(lowered)
+        if time_phrase:
+            time = parse_time(time_phrase.group(0))
+            if time and validate_time(time):
+                found["time"] = time
+        return found
+
+    def describe(self) -> Optional[str]:
+        """Prompt line with the known and missing fields, or None before any is known"""
+        if not self.values:
+            return None
+        known = []
+        for slot in SLOTS:
+            if slot in self.values:
+                value = self.values[slot]
+                if slot == "date":
+                    value = f"{value} ({get_day_of_week(value)})"
+                known.append(f"{slot}: {value}")
+        line = "; ".join(known)
+        if self.missing:
+            return f"{line}. Still needed: {', '.join(self.missing)}."
+        return f"{line}. All details collected; confirm them with the patient."
+
+    def fill(self, metadata: Dict) -> Dict:
+        """Complete a model-produced booking with validated slots it left out"""
+        return {**{slot: value for slot, value in self.values.items() if slot not in metadata}, **metadata}
@@ -0,0 +1,130 @@
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, NamedTuple, Optional
+from services import events
+from utils.clinic_info import DENTISTS, SERVICE_ALIASES
+
+# Messages of history sent verbatim with each turn
+RECENT_MESSAGES = int(os.getenv("CONTEXT_RECENT_MESSAGES", 6))
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+_NAME = re.compile(r"(?i:\b(?:my name is|my name's|this is|call me|i am|i'm)\s+)([A-Z][a-z]+(?: [A-Z][a-z]+)?)")
+_NOT_NAMES = {"Calling", "Looking", "Interested", "Not", "Sorry", "Here", "Fine", "Good", "Free", "Available"}
+
+
+def extract_facts(text: str) -> Dict[str, str]:
+    """Patient details stated in a message (name, email, phone, service, dentist)"""
+    facts = {}
+    name = _NAME.search(text)
+    if name and name.group(1).split()[0] not in _NOT_NAMES:
+        facts["name"] = name.group(1)
+    email = _EMAIL.search(text)
+    if email:
+        facts["email"] = email.group(0)
+    phone = _PHONE.search(text)
+    if phone:
+        facts["phone"] = phone.group(0)
+
+    lowered = text.lower()
+    for service, aliases in SERVICE_ALIASES.items():
+        if any(re.search(rf"\b{re.escape(alias)}\b", lowered) for alias in aliases):
+            facts["service"] = service
+    for dentist in DENTISTS:
+        if re.search(rf"\b{re.escape(dentist.split()[-1].lower())}\b", lowered):
+            facts["dentist"] = dentist
+    return facts
+
+
+class ConversationContext(NamedTuple):
+    """What a turn's prompt is built from"""
+    messages: List[Dict[str, str]]
+    summary: Optional[str]
+
+
+class ContextWindow:
+    """Ring buffer of a session's recent messages plus a running summary
+
+    A message pushed out of the ring is folded into ``facts`` once, so
+    details given early in a long call (the caller's name, their email) stay
+    in the prompt while its size stays bounded.
+    """
+
+    def __init__(self, size: int = RECENT_MESSAGES):
+        self.recent = deque(maxlen=size)
+        self.facts: Dict[str, str] = {}
+        self.folded = 0
+        self.count = 0
+
+    def append(self, message: Dict):
+        if len(self.recent) == self.recent.maxlen:
+            self._fold(self.recent[0])
+        self.recent.append({"role": message["role"], "content": message["content"]})
+        self.count += 1
+
+    def summary(self) -> Optional[str]:
+        if not self.folded:
+            return None
+        summary = f"{self.folded} earlier messages"
+        if self.facts:
+            summary += "; patient said: " + ", ".join(f"{key} {value}" for key, value in self.facts.items())
+        return summary
+
+    def context(self) -> ConversationContext:
+        return ConversationContext(list(self.recent), self.summary())
+
+    def _fold(self, message: Dict):
+        self.folded += 1
+        if message["role"] == "user":
+            self.facts.update(extract_facts(message["content"]))
+
+
+class ContextWindows:
+    """Per-session context windows kept current from a store's change events
+
+    Each new message is appended to its session's window as it is written,
+    so building a turn's context never re-reads the history. A window is
+    (re)built from ``load_history`` only the first time a session is seen by
+    this process, or when ``message_count`` shows another process wrote to it.
+    """
+
+    def __init__(self, load_history: Callable[[str], List[Dict]], size: int = None, max_sessions: int = None):
+        self.load_history = load_history
+        self.size = size or RECENT_MESSAGES
+        self.max_sessions = max_sessions or int(os.getenv("CONTEXT_MAX_SESSIONS", 1000))
+        self._windows: "OrderedDict[str, ContextWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def on_event(self, event: Dict):
+        """ChangeBus subscriber"""
+        if event["type"] != events.MESSAGE_ADDED:
+            return
+        with self._lock:
+            window = self._windows.get(event["session_id"])
+            if window is not None:
+                window.append(event["message"])
+
+    def get(self, session_id: str, message_count: int = None) -> ConversationContext:
+        with self._lock:
+            window = self._windows.get(session_id)
+            if window is not None and (message_count is None or window.count == message_count):
+                self._windows.move_to_end(session_id)
+                return window.context()
+
+        window = ContextWindow(self.size)
+        for message in self.load_history(session_id):
+            window.append(message)
+        with self._lock:
+            self.rebuilds += 1
+            self._windows[session_id] = window
+            self._windows.move_to_end(session_id)
+            while len(self._windows) > self.max_sessions:
+                self._windows.popitem(last=False)
+            return window.context()
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._windows.pop(session_id, None)
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from services.email_service import EmailService
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Errors that retrying cannot fix: the server rejected the recipient or message"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        # Credentials can be fixed by the operator; keep retrying until then
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class EmailOutbox:
+    """Durable on-disk queue for confirmation emails
+
+    Each job is one JSON file under ``pending/``; it is written atomically
+    before ``enqueue`` returns, so a booking never waits on SMTP and a
+    confirmation survives restarts. A background worker delivers due jobs,
+    retrying transient failures with jittered exponential backoff. Jobs that
+    fail permanently or exhaust ``max_attempts`` move to ``dead/``.
+    """
+
+    def __init__(
+        self,
+        email_service: EmailService,
+        outbox_dir: str = None,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None
+    ):
+        if outbox_dir is None:
+            outbox_dir = os.getenv("OUTBOX_DIR")
+        if outbox_dir is None:
+            backend_dir = Path(__file__).parent.parent
+            outbox_dir = backend_dir.parent / "data" / "outbox"
+
+        self.email_service = email_service
+        self.pending_dir = Path(outbox_dir) / "pending"
+        self.dead_dir = Path(outbox_dir) / "dead"
+        self.pending_dir.mkdir(exist_ok=True, parents=True)
+        self.dead_dir.mkdir(exist_ok=True, parents=True)
+
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("OUTBOX_BASE_DELAY", 5))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("OUTBOX_MAX_DELAY", 600))
+
+        self._lock = threading.Lock()
+        self.pending: Dict[str, Dict] = self._load_jobs(self.pending_dir)
+        self.dead: Dict[str, Dict] = self._load_jobs(self.dead_dir)
+        self.sent = 0
+        self.failed_attempts = 0
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def enqueue(self, to_email: str, appointment: Dict) -> str:
+        """Persist a confirmation job and wake the worker; returns the job id"""
+        job = {
+            "id": uuid.uuid4().hex,
+            "to": to_email,
+            "appointment": appointment,
+            "attempts": 0,
+            "created_at": datetime.now().isoformat(),
+            "next_attempt_at": time.time(),
+            "last_error": None
+        }
+        self._write_job(self.pending_dir, job)
+        with self._lock:
+            self.pending[job["id"]] = job
+
+        print(f"[Outbox] Queued confirmation {job['id']} for {to_email}")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job["id"]
+
+    def retry_dead(self, job_id: str) -> bool:
+        """Move a dead-lettered job back to pending with a fresh attempt budget"""
+        with self._lock:
+            job = self.dead.pop(job_id, None)
+            if job is None:
+                return False
+            job["attempts"] = 0
+            job["next_attempt_at"] = time.time()
+            self.pending[job_id] = job
+
+        self._write_job(self.pending_dir, job)
+        (self.dead_dir / f"{job_id}.json").unlink(missing_ok=True)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def status(self) -> Dict:
+        with self._lock:
+            pending = list(self.pending.values())
+            dead = list(self.dead.values())
+        return {
+            "pending": len(pending),
+            "dead": len(dead),
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "running": self._worker is not None and not self._worker.done(),
+            "next_attempt_in": max(0, min(j["next_attempt_at"] for j in pending) - time.time()) if pending else None,
+            "dead_letters": [
+                {"id": j["id"], "to": j["to"], "attempts": j["attempts"], "last_error": j["last_error"]}
+                for j in dead
+            ]
+        }
+
+    async def start(self):
+        """Start the background delivery worker on the running loop"""
+        if self._worker is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        print(f"[Outbox] Worker started ({len(self.pending)} pending, {len(self.dead)} dead)")
+
+    async def stop(self):
+        """Stop the worker; undelivered jobs stay on disk for the next start"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        self.email_service.close()
+
+    async def drain(self):
+        """Attempt every job that is currently due (used by the worker and tests)"""
+        now = time.time()
+        with self._lock:
+            due = sorted(
+                (j for j in self.pending.values() if j["next_attempt_at"] <= now),
+                key=lambda j: j["next_attempt_at"]
+            )
+        for job in due:
+            await self._attempt(job)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                print(f"[Outbox] ✗ Worker error: {e}")
+
+            with self._lock:
+                next_due = min((j["next_attempt_at"] for j in self.pending.values()), default=None)
+            timeout = None if next_due is None else max(0.0, next_due - time.time())
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _attempt(self, job: Dict):
+        job["attempts"] += 1
+        try:
+            await self.email_service.deliver_confirmation(job["to"], job["appointment"])
+        except Exception as e:
+            self.failed_attempts += 1
+            job["last_error"] = f"{type(e).__name__}: {e}"
+
+            if _is_permanent(e) or job["attempts"] >= self.max_attempts:
+                print(f"[Outbox] ✗ Dead-lettering {job['id']} after {job['attempts']} attempts: {job['last_error']}")
+                self._move_to_dead(job)
+                return
+
+            delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+            job["next_attempt_at"] = time.time() + delay * random.uniform(0.5, 1.0)
+            print(f"[Outbox] ⚠️ Attempt {job['attempts']} for {job['id']} failed, retrying in {delay:.0f}s: {job['last_error']}")
+            self._write_job(self.pending_dir, job)
+            return
+
+        self.sent += 1
+        with self._lock:
+            self.pending.pop(job["id"], None)
+        (self.pending_dir / f"{job['id']}.json").unlink(missing_ok=True)
+        print(f"[Outbox] ✓ Delivered {job['id']} to {job['to']}")
+
+    def _move_to_dead(self, job: Dict):
+        self._write_job(self.dead_dir, job)
+        with self._lock:
+            self.pending.pop(job["id"], None)
+            self.dead[job["id"]] = job
+        (self.pending_dir / f"{job['id']}.json").unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_job(directory: Path, job: Dict):
+        tmp_file = directory / f"{job['id']}.json.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, directory / f"{job['id']}.json")
+
+    @staticmethod
+    def _load_jobs(directory: Path) -> Dict[str, Dict]:
+        jobs = {}
+        for path in directory.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+                jobs[job["id"]] = job
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[Outbox] ⚠️ Skipping unreadable job {path.name}: {e}")
+        return jobs
+
+
+_outbox: Optional[EmailOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> EmailOutbox:
+    """Process-wide outbox, injected into routes with Depends(get_outbox)"""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = EmailOutbox(EmailService())
+    return _outbox
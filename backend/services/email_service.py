@@ -1,11 +1,18 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import asyncio
 import os
+from typing import List
 from dotenv import load_dotenv
+from services.executors import get_executor
+from services.smtp_pool import SMTPConnectionPool
 
 load_dotenv()
 
+class EmailNotConfiguredError(Exception):
+    """SMTP sender credentials are missing from the environment"""
+
 class EmailService:
     """Email service for sending appointment confirmations"""
     
@@ -14,17 +21,104 @@ class EmailService:
         self.smtp_port = int(os.getenv("SMTP_PORT", 587))
         self.email = os.getenv("SMTP_EMAIL")
         self.password = os.getenv("SMTP_PASSWORD")
+        # Set SMTP_STARTTLS=false to talk to a plain local SMTP stand-in (no TLS, no login)
+        self.use_tls = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+        self.executor = get_executor("email")
+        # ✅ Reuse authenticated sessions instead of TLS + login per email
+        self.pool = SMTPConnectionPool(
+            self._open_connection,
+            max_size=int(os.getenv("SMTP_POOL_SIZE", self.executor.max_workers)),
+            idle_timeout=float(os.getenv("SMTP_IDLE_TIMEOUT", 60)),
+            max_messages=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", 100))
+        )
         
         # ✅ Log initialization
         print(f"[Email Init] SMTP Server: {self.smtp_server}:{self.smtp_port}")
         print(f"[Email Init] From Email: {self.email if self.email else '❌ NOT SET'}")
         print(f"[Email Init] Password: {'✓ SET' if self.password else '❌ NOT SET'}")
     
+    def is_configured(self) -> bool:
+        """A sender address is always needed; a password only when using TLS/login"""
+        return bool(self.email) and (bool(self.password) or not self.use_tls)
+    
+    async def deliver_confirmation(self, to_email: str, appointment_details: dict):
+        """Send appointment confirmation email, raising on any failure (used by the outbox)"""
+        if not self.is_configured():
+            raise EmailNotConfiguredError("SMTP_EMAIL / SMTP_PASSWORD not configured")
+        
+        msg = self.build_confirmation_message(to_email, appointment_details)
+        
+        # ✅ Send on the email executor so SMTP never blocks the event loop
+        await self.executor.run(self._send_message, msg)
+    
+    def build_confirmation_message(self, to_email: str, appointment_details: dict) -> MIMEMultipart:
+        """Build the HTML confirmation email"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"Appointment Confirmation - SmileCare Dental"
+        msg['From'] = self.email
+        msg['To'] = to_email
+        
+        # Create HTML content
+        html = f"""
+        <html>
+          <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f5f5f5;">
+            <div style="max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+              <h2 style="color: #667eea; margin-top: 0;">✓ Appointment Confirmed!</h2>
+              
+              <p>Dear <strong>{appointment_details.get('name', 'Patient')}</strong>,</p>
+              
+              <p>Your appointment at <strong>SmileCare Dental</strong> has been successfully confirmed.</p>
+              
+              <div style="background-color: #f8f9fa; padding: 20px; border-left: 4px solid #667eea; margin: 20px 0;">
+                <h3 style="margin-top: 0; color: #333;">Appointment Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                  <tr>
+                    <td style="padding: 8px 0;"><strong>Service:</strong></td>
+                    <td style="padding: 8px 0;">{appointment_details.get('service', 'N/A')}</td>
+                  </tr>
+                  <tr>
+                    <td style="padding: 8px 0;"><strong>Date:</strong></td>
+                    <td style="padding: 8px 0;">{appointment_details.get('date', 'N/A')}</td>
+                  </tr>
+                  <tr>
+                    <td style="padding: 8px 0;"><strong>Time:</strong></td>
+                    <td style="padding: 8px 0;">{appointment_details.get('time', 'N/A')}</td>
+                  </tr>
+                  <tr>
+                    <td style="padding: 8px 0;"><strong>Dentist:</strong></td>
+                    <td style="padding: 8px 0;">{appointment_details.get('dentist', 'To be assigned')}</td>
+                  </tr>
+                </table>
+              </div>
+              
+              <div style="background-color: #e8f5e9; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                <p style="margin: 0;"><strong>📍 Location:</strong> 123 Healthcare Ave, Downtown</p>
+                <p style="margin: 10px 0 0 0;"><strong>📞 Phone:</strong> (555) 123-4567</p>
+              </div>
+              
+              <p style="color: #7f8c8d; font-size: 14px; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee;">
+                <strong>Important:</strong> If you need to reschedule or cancel, please call us at least 24 hours in advance.
+              </p>
+              
+              <p style="margin-top: 20px;">
+                Best regards,<br>
+                <strong>SmileCare Dental Team</strong>
+              </p>
+            </div>
+          </body>
+        </html>
+        """
+        
+        part = MIMEText(html, 'html')
+        msg.attach(part)
+        
+        return msg
+    
     async def send_appointment_confirmation(self, to_email: str, appointment_details: dict) -> bool:
         """Send appointment confirmation email"""
         try:
             # ✅ Better credential check with clear logging
-            if not self.email or not self.password:
+            if not self.is_configured():
                 print("\n" + "="*60)
                 print("[Email] ❌ EMAIL CREDENTIALS NOT CONFIGURED!")
                 print("[Email] Please add to backend/.env:")
@@ -41,76 +135,7 @@ class EmailService:
             print(f"[Email] Details: {appointment_details}")
             print(f"{'📧'*30}\n")
             
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"Appointment Confirmation - SmileCare Dental"
-            msg['From'] = self.email
-            msg['To'] = to_email
-            
-            # Create HTML content
-            html = f"""
-            <html>
-              <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f5f5f5;">
-                <div style="max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                  <h2 style="color: #667eea; margin-top: 0;">✓ Appointment Confirmed!</h2>
-                  
-                  <p>Dear <strong>{appointment_details.get('name', 'Patient')}</strong>,</p>
-                  
-                  <p>Your appointment at <strong>SmileCare Dental</strong> has been successfully confirmed.</p>
-                  
-                  <div style="background-color: #f8f9fa; padding: 20px; border-left: 4px solid #667eea; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #333;">Appointment Details:</h3>
-                    <table style="width: 100%; border-collapse: collapse;">
-                      <tr>
-                        <td style="padding: 8px 0;"><strong>Service:</strong></td>
-                        <td style="padding: 8px 0;">{appointment_details.get('service', 'N/A')}</td>
-                      </tr>
-                      <tr>
-                        <td style="padding: 8px 0;"><strong>Date:</strong></td>
-                        <td style="padding: 8px 0;">{appointment_details.get('date', 'N/A')}</td>
-                      </tr>
-                      <tr>
-                        <td style="padding: 8px 0;"><strong>Time:</strong></td>
-                        <td style="padding: 8px 0;">{appointment_details.get('time', 'N/A')}</td>
-                      </tr>
-                      <tr>
-                        <td style="padding: 8px 0;"><strong>Dentist:</strong></td>
-                        <td style="padding: 8px 0;">{appointment_details.get('dentist', 'To be assigned')}</td>
-                      </tr>
-                    </table>
-                  </div>
-                  
-                  <div style="background-color: #e8f5e9; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <p style="margin: 0;"><strong>📍 Location:</strong> 123 Healthcare Ave, Downtown</p>
-                    <p style="margin: 10px 0 0 0;"><strong>📞 Phone:</strong> (555) 123-4567</p>
-                  </div>
-                  
-                  <p style="color: #7f8c8d; font-size: 14px; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee;">
-                    <strong>Important:</strong> If you need to reschedule or cancel, please call us at least 24 hours in advance.
-                  </p>
-                  
-                  <p style="margin-top: 20px;">
-                    Best regards,<br>
-                    <strong>SmileCare Dental Team</strong>
-                  </p>
-                </div>
-              </body>
-            </html>
-            """
-            
-            part = MIMEText(html, 'html')
-            msg.attach(part)
-            
-            # ✅ Send with detailed logging and timeout
-            print(f"[Email] Connecting to {self.smtp_server}:{self.smtp_port}...")
-            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10) as server:
-                print(f"[Email] Starting TLS encryption...")
-                server.starttls()
-                
-                print(f"[Email] Authenticating as {self.email}...")
-                server.login(self.email, self.password)
-                
-                print(f"[Email] Sending message...")
-                server.send_message(msg)
+            await self.deliver_confirmation(to_email, appointment_details)
             
             # ✅ Clear success message
             print(f"\n{'✅'*30}")
@@ -147,4 +172,63 @@ class EmailService:
             import traceback
             traceback.print_exc()
             print(f"{'❌'*30}\n")
-            return False
\ No newline at end of file
+            return False
+    
+    async def send_many(self, messages: List[MIMEMultipart]) -> List[bool]:
+        """
+        Send a batch of prepared messages (reminders, schedule changes)
+        
+        Messages are spread over up to ``SMTP_POOL_SIZE`` pooled connections
+        and sent back to back on each one.
+        
+        Returns:
+            One success flag per message, in input order
+        """
+        if not messages:
+            return []
+        if not self.is_configured():
+            raise EmailNotConfiguredError("SMTP_EMAIL / SMTP_PASSWORD not configured")
+        
+        lanes = min(self.pool.max_size, len(messages))
+        batches = [messages[i::lanes] for i in range(lanes)]
+        print(f"[Email] Sending {len(messages)} messages over {lanes} connection(s)...")
+        lane_results = await asyncio.gather(
+            *[self.executor.run(self.pool.send_batch, batch) for batch in batches]
+        )
+        
+        results = [False] * len(messages)
+        for lane, errors in enumerate(lane_results):
+            for offset, error in enumerate(errors):
+                index = lane + offset * lanes
+                results[index] = error is None
+                if error is not None:
+                    print(f"[Email] ❌ Message to {messages[index]['To']} failed: {error}")
+        
+        print(f"[Email] ✓ Sent {sum(results)}/{len(messages)} messages")
+        return results
+    
+    def close(self):
+        """Close pooled SMTP connections"""
+        self.pool.close()
+    
+    def _send_message(self, msg: MIMEMultipart):
+        """Blocking SMTP delivery over a pooled connection"""
+        print(f"[Email] Sending message...")
+        self.pool.send(msg)
+    
+    def _open_connection(self) -> smtplib.SMTP:
+        """Open an SMTP session ready to send (TLS and login done)"""
+        print(f"[Email] Connecting to {self.smtp_server}:{self.smtp_port}...")
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10)
+        try:
+            if self.use_tls:
+                print(f"[Email] Starting TLS encryption...")
+                server.starttls()
+            
+            if self.password:
+                print(f"[Email] Authenticating as {self.email}...")
+                server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
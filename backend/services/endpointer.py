@@ -0,0 +1,109 @@
+from typing import List
+import numpy as np
+
+# Events returned by UtteranceEndpointer.feed
+SPEECH_STARTED = "speech_started"
+PAUSE = "pause"
+END_OF_UTTERANCE = "end_of_utterance"
+
+
+class UtteranceEndpointer:
+    """Server-side end-of-utterance detection for streamed PCM16 mono audio
+
+    Audio is split into fixed frames and each frame's RMS energy is compared
+    against an adaptive noise floor. A short pause inside speech emits
+    ``PAUSE`` (a good moment for a partial transcript); a long enough silence
+    after speech emits ``END_OF_UTTERANCE``.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        pause_ms: int = 300,
+        end_silence_ms: int = 700,
+        min_speech_ms: int = 200,
+        max_utterance_ms: int = 30000,
+        preroll_ms: int = 300,
+        min_threshold: int = 300
+    ):
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.pause_frames = pause_ms // frame_ms
+        self.end_frames = end_silence_ms // frame_ms
+        self.min_speech_frames = min_speech_ms // frame_ms
+        self.max_utterance_bytes = sample_rate * max_utterance_ms // 1000 * 2
+        self.preroll_bytes = max(preroll_ms, min_speech_ms + 100) * sample_rate // 1000 * 2
+        self.min_threshold = min_threshold
+
+        self.noise_floor = None
+        self._remainder = b""
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (the noise floor estimate is kept)"""
+        self.audio = bytearray()
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silent_frames = 0
+
+    @property
+    def threshold(self) -> float:
+        if self.noise_floor is None:
+            return self.min_threshold
+        return max(self.min_threshold, self.noise_floor * 3)
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Consume an audio chunk and return the events it triggered"""
+        events = []
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+
+        # RMS of every whole frame in one pass (audioop is gone in Python 3.13)
+        frames = np.frombuffer(data, dtype="<i2", count=usable // 2).reshape(-1, self.frame_bytes // 2).astype(np.float64)
+        energies = np.sqrt(np.mean(frames * frames, axis=1))
+
+        for index, offset in enumerate(range(0, usable, self.frame_bytes)):
+            frame = data[offset:offset + self.frame_bytes]
+            self.audio.extend(frame)
+            energy = float(energies[index])
+
+            if self.in_speech and len(self.audio) >= self.max_utterance_bytes:
+                events.append(END_OF_UTTERANCE)
+                self._remainder = data[offset + self.frame_bytes:]
+                break
+
+            if energy >= self.threshold:
+                self.speech_frames += 1
+                self.silent_frames = 0
+                if not self.in_speech and self.speech_frames >= self.min_speech_frames:
+                    self.in_speech = True
+                    events.append(SPEECH_STARTED)
+                continue
+
+            # Quiet frame: track the background level while nobody is talking
+            # and only keep a short pre-roll so leading silence is not buffered
+            if not self.in_speech:
+                self.speech_frames = 0
+                self.noise_floor = energy if self.noise_floor is None else 0.95 * self.noise_floor + 0.05 * energy
+                if len(self.audio) > self.preroll_bytes:
+                    del self.audio[:-self.preroll_bytes]
+                continue
+
+            self.silent_frames += 1
+            if self.silent_frames == self.pause_frames:
+                events.append(PAUSE)
+            if self.silent_frames >= self.end_frames:
+                events.append(END_OF_UTTERANCE)
+                # Audio after the end point belongs to the next utterance
+                self._remainder = data[offset + self.frame_bytes:]
+                break
+
+        return events
+
+    def take_utterance(self) -> bytes:
+        """Return the buffered utterance audio and start a new one"""
+        audio = bytes(self.audio)
+        self.reset()
+        return audio
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# Change event types published by the conversation stores
+SESSION_CREATED = "session_created"
+MESSAGE_ADDED = "message_added"
+METADATA_UPDATED = "metadata_updated"
+APPOINTMENT_BOOKED = "appointment_booked"
+
+
+class ChangeBus:
+    """In-process pub/sub for conversation store change events
+
+    Subscribers are plain callables invoked synchronously with the event
+    dict, so they must be cheap. Async consumers (push channels) should use
+    ``subscribe_queue`` which hands events over to their event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """Register a callback; returns a function that unsubscribes it"""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not callback]
+
+        return unsubscribe
+
+    def subscribe_queue(self, maxsize: int = 100) -> Tuple[asyncio.Queue, Callable[[], None]]:
+        """Subscribe an asyncio.Queue on the running loop
+
+        Events are dropped for a consumer whose queue is full rather than
+        blocking the publisher.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+
+        def put(event: Dict):
+            if not queue.full():
+                queue.put_nowait(event)
+
+        return queue, self.subscribe(lambda event: loop.call_soon_threadsafe(put, event))
+
+    def publish(self, event_type: str, session_id: str, **data) -> None:
+        """Notify every subscriber of a change"""
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+
+        event = {"type": event_type, "session_id": session_id, **data}
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[Events] ⚠️ Subscriber failed on {event_type}: {e}")
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+# Default worker threads and queue bound per pipeline stage.
+# Override with <STAGE>_WORKERS / <STAGE>_MAX_QUEUE, e.g. STT_WORKERS=8.
+STAGE_DEFAULTS = {
+    "stt": (4, 32),
+    "llm": (8, 64),
+    "tts": (4, 32),
+    "email": (2, 64),
+    "janitor": (1, 1),
+}
+
+
+class StageOverloadedError(Exception):
+    """Raised when a stage's queue is full and new work is rejected"""
+
+
+class StageExecutor:
+    """Bounded thread pool for one blocking pipeline stage
+
+    ``max_workers`` caps how many calls of this stage run at once;
+    ``max_queue`` caps how many more may wait for a worker before callers
+    get ``StageOverloadedError`` instead of piling up unbounded latency.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-stage")
+
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking callable on this stage's pool and await its result"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise StageOverloadedError(
+                    f"{self.name} stage is overloaded ({self.queued} calls waiting)"
+                )
+            self.queued += 1
+
+        future = self.pool.submit(self._call, fn, args, kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call cancelled before a worker picked it up never reaches _call
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+            raise
+
+    def _call(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, StageExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(stage: str) -> StageExecutor:
+    """Get (creating on first use) the shared executor for a pipeline stage"""
+    executor = _executors.get(stage)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        if stage not in _executors:
+            default_workers, default_queue = STAGE_DEFAULTS.get(stage, (4, 32))
+            prefix = stage.upper()
+            _executors[stage] = StageExecutor(
+                stage,
+                max_workers=int(os.getenv(f"{prefix}_WORKERS", default_workers)),
+                max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", default_queue))
+            )
+        return _executors[stage]
+
+
+def executor_stats() -> Dict[str, Dict]:
+    """Per-stage concurrency and queue-depth snapshot"""
+    return {name: executor.stats() for name, executor in list(_executors.items())}
+
+
+def shutdown_executors():
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
@@ -0,0 +1,163 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+from utils.clinic_info import (
+    CLINIC_NAME, SERVICES, DENTISTS, SERVICE_ALIASES, LOCATION, OPENING_DAYS, OPENING_TIMES, CLOSED_DAYS
+)
+
+
+# Turns mentioning any of these need the full conversation model
+_BLOCKERS = re.compile(
+    r"\b(book|booking|schedule|appointment|reschedule|cancel|available|availability|slot|"
+    r"see|visit|come in|want|need|like to|price|prices|cost|costs|insurance|emergency|pain|hurts?|bleeding|swollen|my name)\b|@|\d"
+)
+_QUESTION = re.compile(r"\?|^(what|when|where|which|who|how|are|is|do|does|can|could|tell)\b")
+
+_INTENTS = {
+    "hours": re.compile(r"\b(hours|opening|open|close|closing|closed|sundays?|saturdays?|weekends?)\b"),
+    "location": re.compile(r"\b(where|address|located|location|directions|find you|get there)\b"),
+    "services": re.compile(r"\b(services|treatments|procedures|what do you (do|offer)|do you offer)\b"),
+    "dentists": re.compile(r"\b(dentists|doctors|who works|staff)\b"),
+}
+_WHO = re.compile(r"\b(who|which|whom)\b")
+_DENTIST_WORD = re.compile(r"\b(dentist|doctor|dr|specialist)\b")
+
+FIRST_TURN_FOLLOW_UP = "Would you like to book an appointment?"
+FOLLOW_UP = "Is there anything else I can help you with?"
+
+
+class FAQRouter:
+    """Answers common clinic questions locally, without a Gemini round trip
+
+    A turn is classified with keyword rules built from ``utils.clinic_info``.
+    Only short, standalone questions matching exactly one FAQ intent are
+    answered; anything that looks like booking, mentions personal details or
+    numbers, or matches several intents is left to the model. Answers are
+    fixed text, so they also hit the TTS cache.
+    """
+
+    def __init__(self, enabled: bool = None, max_words: int = 16):
+        if enabled is None:
+            enabled = os.getenv("FAQ_ROUTER_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self.max_words = max_words
+
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.hits: Dict[str, int] = {}
+        self.saved_ms = 0.0
+        # Moving average of real model turns, used to estimate time saved
+        self.llm_latency_ms: Optional[float] = None
+
+    def classify(self, message: str) -> Optional[str]:
+        """FAQ intent of a high-confidence turn, or None to defer to the model"""
+        text = message.lower().strip()
+        if not text or len(text.split()) > self.max_words:
+            return None
+        if _BLOCKERS.search(text) or not _QUESTION.search(text):
+            return None
+
+        service = self._service_in(text)
+        dentist = self._dentist_in(text)
+        if service and dentist:
+            return None
+        if service:
+            # "Who does root canals?" / "Which dentist does whitening?"
+            if _WHO.search(text) or _DENTIST_WORD.search(text):
+                return f"service:{service}" if SERVICES[service] else None
+            return None
+        if dentist:
+            return f"dentist:{dentist}"
+
+        matched = [intent for intent, pattern in _INTENTS.items() if pattern.search(text)]
+        return matched[0] if len(matched) == 1 else None
+
+    def answer(self, message: str, history: List[Dict[str, str]] = None) -> Optional[str]:
+        """Local reply for an FAQ turn, or None if the model should answer"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.turns += 1
+
+        intent = self.classify(message)
+        if intent is None:
+            return None
+
+        first_turn = sum(1 for msg in history or [] if msg["role"] == "user") <= 1
+        reply = f"{self.fact(intent)} {FIRST_TURN_FOLLOW_UP if first_turn else FOLLOW_UP}"
+        with self._lock:
+            key = intent.split(":", 1)[0]
+            self.hits[key] = self.hits.get(key, 0) + 1
+            if self.llm_latency_ms is not None:
+                self.saved_ms += self.llm_latency_ms
+        print(f"[FAQ] ✓ Answered locally ({intent})")
+        return reply
+
+    def fact(self, intent: str) -> str:
+        """The spoken answer for an intent returned by ``classify``"""
+        if intent.startswith("service:"):
+            service = intent.split(":", 1)[1]
+            return f"{service} is handled by {SERVICES[service]}."
+        if intent.startswith("dentist:"):
+            name = intent.split(":", 1)[1]
+            return f"{name} specializes in {_areas(name)}."
+        if intent == "hours":
+            return f"We're open {OPENING_DAYS}, {OPENING_TIMES}, and closed on {CLOSED_DAYS}."
+        if intent == "location":
+            return f"{CLINIC_NAME} is at {LOCATION}."
+        if intent == "services":
+            return f"We offer {_join(list(SERVICES))}."
+        if intent == "dentists":
+            return f"Our dentists are {_join([f'{name} for {_areas(name)}' for name in DENTISTS])}."
+        raise ValueError(f"Unknown FAQ intent '{intent}'")
+
+    def common_answers(self) -> List[str]:
+        """First-turn answers to the general questions, for TTS prewarming"""
+        return [f"{self.fact(intent)} {FIRST_TURN_FOLLOW_UP}" for intent in _INTENTS]
+
+    def record_llm_latency(self, seconds: float):
+        """Feed the duration of a real model turn into the saved-time estimate"""
+        ms = seconds * 1000
+        with self._lock:
+            self.llm_latency_ms = ms if self.llm_latency_ms is None else 0.9 * self.llm_latency_ms + 0.1 * ms
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            return {
+                "enabled": self.enabled,
+                "turns": self.turns,
+                "hits": hits,
+                "hit_rate": round(hits / self.turns, 3) if self.turns else 0.0,
+                "hits_by_intent": dict(self.hits),
+                "saved_ms": round(self.saved_ms),
+                "llm_latency_ms": round(self.llm_latency_ms) if self.llm_latency_ms is not None else None,
+            }
+
+    @staticmethod
+    def _service_in(text: str) -> Optional[str]:
+        found = {
+            service for service, aliases in SERVICE_ALIASES.items()
+            if any(re.search(rf"\b{re.escape(alias)}\b", text) for alias in aliases)
+        }
+        return found.pop() if len(found) == 1 else None
+
+    @staticmethod
+    def _dentist_in(text: str) -> Optional[str]:
+        found = [
+            name for name in DENTISTS
+            if re.search(rf"\b{re.escape(name.split()[-1].lower())}\b", text)
+        ]
+        return found[0] if len(found) == 1 else None
+
+
+def _join(items: List[str]) -> str:
+    """Spoken list: "a, b and c" """
+    if len(items) == 1:
+        return items[0]
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+
+def _areas(dentist: str) -> str:
+    return _join([area.replace(" Specialist", "") for area in DENTISTS[dentist]])
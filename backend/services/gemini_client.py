@@ -0,0 +1,216 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from google.api_core import exceptions as google_exceptions
+from services.executors import StageExecutor
+
+# Failures worth another attempt: quota bursts, overload and network trouble
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError,
+    # A distinct class before Python 3.11, an alias of TimeoutError since
+    asyncio.TimeoutError,
+)
+
+
+class LLMDeadlineError(Exception):
+    """Raised when a turn's model call cannot finish within its deadline"""
+
+
+class TokenBucket:
+    """Request rate limiter: ``rate`` tokens per second, bursts of ``capacity``
+
+    Tokens are reserved, so concurrent callers queue in arrival order; a
+    negative balance is the backlog of reservations already handed out.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Take a token; returns how long to wait for it, or None if longer than ``max_wait``"""
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def try_take(self) -> bool:
+        """Take a token only if one is available right now"""
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class GeminiClient:
+    """Bounded-latency wrapper around blocking model calls
+
+    Every call is rate limited by a token bucket sized to the API quota and
+    must finish within ``deadline`` seconds. Transient errors are retried
+    with jittered exponential backoff while time remains. With hedging on,
+    a duplicate request is sent once a call has run longer than the recent
+    p95 latency, and whichever answers first wins. Outcomes and latencies
+    are counted for ``stats``.
+    """
+
+    def __init__(
+        self,
+        executor: StageExecutor,
+        rate_per_minute: float = None,
+        burst: int = None,
+        deadline: float = None,
+        max_retries: int = None,
+        base_delay: float = 0.25,
+        hedge: bool = None,
+        hedge_min_samples: int = 20
+    ):
+        self.executor = executor
+        rate_per_minute = rate_per_minute or float(os.getenv("LLM_RATE_PER_MINUTE", 60))
+        self.bucket = TokenBucket(rate_per_minute / 60, burst or int(os.getenv("LLM_BURST", 10)))
+        self.deadline = deadline or float(os.getenv("LLM_DEADLINE_SECONDS", 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", 2))
+        self.base_delay = base_delay
+        if hedge is None:
+            hedge = os.getenv("LLM_HEDGE", "false").lower() == "true"
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+
+        self.latencies = deque(maxlen=200)
+        self.outcomes: Dict[str, int] = {
+            "success": 0, "error": 0, "timeout": 0, "throttled": 0,
+            "retries": 0, "hedges": 0, "hedge_wins": 0,
+        }
+        self._lock = threading.Lock()
+
+    async def acquire(self, deadline_at: float):
+        """Wait for a rate-limit token, giving up if it would arrive after the deadline"""
+        wait = self.bucket.reserve(max(0.0, deadline_at - time.monotonic()))
+        if wait is None:
+            self._count("throttled")
+            raise LLMDeadlineError("Rate limit leaves no time for this turn")
+        if wait:
+            await asyncio.sleep(wait)
+
+    async def generate(self, fn: Callable, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` on the executor with rate limit, deadline, retries and hedging"""
+        deadline_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            await self.acquire(deadline_at)
+            remaining = deadline_at - time.monotonic()
+            try:
+                result = await asyncio.wait_for(self._attempt(fn, args, kwargs, remaining), timeout=remaining)
+                self._count("success")
+                return result
+            except TRANSIENT_ERRORS as e:
+                # wait_for's deadline and a transient SDK timeout can be the
+                # same class (Python 3.11+), so only the clock tells them apart
+                if isinstance(e, (TimeoutError, asyncio.TimeoutError)) and time.monotonic() >= deadline_at:
+                    self._count("timeout")
+                    raise LLMDeadlineError(f"No model response within {self.deadline:.1f}s") from e
+                delay = self.base_delay * 2 ** attempt * random.uniform(0.5, 1.0)
+                attempt += 1
+                if attempt > self.max_retries or time.monotonic() + delay >= deadline_at:
+                    self._count("error")
+                    raise
+                self._count("retries")
+                print(f"[LLM Client] ⚠️ {type(e).__name__}, retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self._count("error")
+                raise
+
+    async def _attempt(self, fn: Callable, args, kwargs, remaining: float):
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.executor.run(fn, *args, **kwargs))
+        hedge_after = self._hedge_delay()
+        if hedge_after is None or hedge_after >= remaining:
+            result = await primary
+            self._record_latency(time.monotonic() - started)
+            return result
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done or not self.bucket.try_take():
+            result = await primary
+            self._record_latency(time.monotonic() - started)
+            return result
+
+        self._count("hedges")
+        hedge = asyncio.ensure_future(self.executor.run(fn, *args, **kwargs))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        self._record_latency(time.monotonic() - started)
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            # The losing request runs to completion on its worker; just stop waiting for it
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self) -> Optional[float]:
+        """p95 of recent latencies once there are enough samples, else None"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def record(self, outcome: str, seconds: float = None):
+        """Count an outcome of a call made outside ``generate`` (streaming)"""
+        self._count(outcome)
+        if seconds is not None:
+            self._record_latency(seconds)
+
+    def _record_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            ordered = sorted(self.latencies)
+            outcomes = dict(self.outcomes)
+        percentile = lambda p: round(ordered[max(0, int(len(ordered) * p) - 1)] * 1000) if ordered else None
+        return {
+            **outcomes,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "deadline_s": self.deadline,
+            "hedging": self.hedge,
+            "tokens": round(self.bucket.tokens, 2),
+        }
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from services.executors import get_executor
+from services.tts_cache import TTSCache
+
+
+class RetentionPolicy(NamedTuple):
+    """How long, and how much, a directory may keep
+
+    ``max_age`` and ``max_bytes`` of 0 disable that limit. Files younger than
+    ``min_age`` are never touched, so a file still being written survives.
+    When ``cache`` is set the directory belongs to that TTS cache: pinned
+    clips are kept and deleted clips are dropped from its index.
+    """
+    name: str
+    directory: Path
+    max_age: float
+    max_bytes: int
+    min_age: float = 60
+    cache: Optional[TTSCache] = None
+
+    @classmethod
+    def from_env(cls, name: str, directory: Path, age_hours: float, max_mb: float, cache: TTSCache = None):
+        """Policy configured by <NAME>_MAX_AGE_HOURS and <NAME>_MAX_MB"""
+        prefix = name.upper()
+        return cls(
+            name=name,
+            directory=Path(directory),
+            max_age=float(os.getenv(f"{prefix}_MAX_AGE_HOURS", age_hours)) * 3600,
+            max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", max_mb)) * 1024 * 1024),
+            cache=cache
+        )
+
+
+class RetentionJanitor:
+    """Background sweeper keeping upload and audio directories bounded
+
+    Every ``interval`` seconds each directory is listed with a single
+    scandir. Files past the policy's age are deleted, then, while the
+    directory is still over its byte budget, the oldest remaining files go
+    too (for a TTS cache directory: untracked files first, then clips in the
+    cache's LRU order). Reclaimed bytes and file counts are kept per directory.
+    """
+
+    def __init__(self, policies: List[RetentionPolicy], interval: float = None):
+        self.policies = policies
+        self.interval = interval if interval is not None else float(os.getenv("JANITOR_INTERVAL", 300))
+        self.executor = get_executor("janitor")
+        self.sweeps = 0
+        self.last_sweep_at: Optional[float] = None
+        self.metrics: Dict[str, Dict] = {
+            policy.name: {"files": 0, "bytes": 0, "reclaimed_files": 0, "reclaimed_bytes": 0, "errors": 0, "last_sweep_ms": 0.0}
+            for policy in policies
+        }
+        self._worker: Optional[asyncio.Task] = None
+
+    def sweep(self) -> Dict[str, Dict]:
+        """Apply every policy once (blocking); returns the metrics"""
+        for policy in self.policies:
+            try:
+                self._sweep_directory(policy)
+            except OSError as e:
+                self.metrics[policy.name]["errors"] += 1
+                print(f"[Janitor] ✗ Could not sweep {policy.directory}: {e}")
+        self.sweeps += 1
+        self.last_sweep_at = time.time()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        return {
+            "interval": self.interval,
+            "sweeps": self.sweeps,
+            "last_sweep_at": self.last_sweep_at,
+            "running": self._worker is not None and not self._worker.done(),
+            "directories": {name: dict(metrics) for name, metrics in self.metrics.items()},
+        }
+
+    async def start(self):
+        """Sweep now, then every ``interval`` seconds, on the running loop"""
+        if self._worker is not None:
+            return
+        self._worker = asyncio.create_task(self._run())
+        print(f"[Janitor] Started (every {self.interval:.0f}s: {', '.join(p.name for p in self.policies)})")
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.executor.run(self.sweep)
+            except Exception as e:
+                print(f"[Janitor] ✗ Sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _sweep_directory(self, policy: RetentionPolicy):
+        started = time.perf_counter()
+        now = time.time()
+        cache = policy.cache
+        lru_rank = cache.lru_order() if cache is not None else {}
+
+        total = count = 0
+        candidates = []
+        with os.scandir(policy.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or (cache is not None and entry.name == cache.INDEX_NAME):
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                total += stat.st_size
+                count += 1
+                if now - stat.st_mtime < policy.min_age or (cache is not None and cache.is_pinned(entry.name)):
+                    continue
+                candidates.append((entry.name, stat.st_size, stat.st_mtime))
+
+        doomed = []
+        if policy.max_age:
+            doomed = [c for c in candidates if now - c[2] > policy.max_age]
+        remaining = total - sum(size for _, size, _ in doomed)
+
+        if policy.max_bytes and remaining > policy.max_bytes:
+            expired = {name for name, _, _ in doomed}
+            # Untracked files oldest first, then cached clips least recently used first
+            ordered = sorted(
+                (c for c in candidates if c[0] not in expired),
+                key=lambda c: (1, lru_rank[c[0]]) if c[0] in lru_rank else (0, c[2])
+            )
+            for candidate in ordered:
+                if remaining <= policy.max_bytes:
+                    break
+                doomed.append(candidate)
+                remaining -= candidate[1]
+
+        if cache is not None and doomed:
+            # Forget clips before deleting them so the cache never hands out a dead path
+            cache.discard_many([name for name, _, _ in doomed if name in lru_rank])
+
+        metrics = self.metrics[policy.name]
+        reclaimed_files = reclaimed_bytes = 0
+        for name, size, _ in doomed:
+            try:
+                os.unlink(policy.directory / name)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                metrics["errors"] += 1
+                print(f"[Janitor] ⚠️ Could not delete {name}: {e}")
+                continue
+            reclaimed_files += 1
+            reclaimed_bytes += size
+
+        metrics["files"] = count - reclaimed_files
+        metrics["bytes"] = total - reclaimed_bytes
+        metrics["reclaimed_files"] += reclaimed_files
+        metrics["reclaimed_bytes"] += reclaimed_bytes
+        metrics["last_sweep_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if reclaimed_files:
+            print(f"[Janitor] ✓ {policy.name}: removed {reclaimed_files} files ({reclaimed_bytes / 1024:.0f} KB)")
+
+
+def create_janitor(upload_dir: Path, tts_cache: TTSCache) -> RetentionJanitor:
+    """Janitor for uploads/ and the TTS cache directory, configured from the environment"""
+    return RetentionJanitor([
+        RetentionPolicy.from_env("uploads", upload_dir, age_hours=24, max_mb=100),
+        RetentionPolicy.from_env("audio_outputs", tts_cache.cache_dir, age_hours=24 * 7, max_mb=250, cache=tts_cache),
+    ])
@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List
+from services.persistence_writer import GroupCommitWriter
+
+
+class JournalStore:
+    """Append-only JSONL journal with periodic snapshot compaction
+
+    The snapshot file keeps the historical ``conversations.json`` layout (the
+    full sessions dict).  Every mutation after the last snapshot is appended
+    to ``<snapshot>.journal.jsonl`` as a single JSON line, so persisting a
+    turn costs one small write instead of re-serializing every session.
+
+    Journal writes go through a ``GroupCommitWriter``; callers mutating the
+    sessions dict must hold ``self.lock`` so compaction sees a consistent view.
+    """
+
+    def __init__(
+        self,
+        snapshot_file: Path,
+        compact_every: int = 500,
+        durability: str = "sync",
+        flush_interval_ms: int = 50,
+        flush_max_pending: int = 64
+    ):
+        self.snapshot_file = Path(snapshot_file)
+        self.journal_file = self.snapshot_file.with_suffix(".journal.jsonl")
+        self.compact_every = compact_every
+        self.pending_events = 0
+        self.sessions: Dict = {}
+        self.lock = threading.RLock()
+
+        self.writer = GroupCommitWriter(
+            self._write_lines,
+            mode=durability,
+            interval_ms=flush_interval_ms,
+            max_pending=flush_max_pending,
+            after_flush=self._maybe_compact
+        )
+        self._journal = None
+        self._compacting = False
+
+    def load(self, apply_event: Callable[[Dict, Dict], None]) -> Dict:
+        """Load the snapshot and replay the journal on top of it"""
+        sessions = self._load_snapshot()
+        events = self._read_journal()
+
+        for event in events:
+            apply_event(sessions, event)
+
+        if events:
+            print(f"[Journal] Replayed {len(events)} events from {self.journal_file.name}")
+
+        self.sessions = sessions
+        self.pending_events = len(events)
+        return sessions
+
+    def append(self, event: Dict) -> None:
+        """Hand one event to the writer; compaction follows automatically"""
+        self.pending_events += 1
+        self.writer.submit(json.dumps(event, separators=(",", ":")))
+
+    def flush(self) -> None:
+        """Force every queued event to disk"""
+        self.writer.flush()
+
+    def compact(self) -> None:
+        """Write a fresh snapshot atomically and drop the journal prefix it covers
+
+        Only a shallow copy of the sessions is taken under ``self.lock``;
+        serializing and writing the snapshot happen outside it, so turns
+        keep appending while a large store compacts. The journal is cut at
+        the bytes already written when the copy was taken, all of which the
+        copy includes; later events stay in the journal tail. Replay is
+        idempotent (see ``ConversationMemory._apply_event``), so events in
+        both the snapshot and the tail, or a crash between the snapshot swap
+        and the journal rewrite, are harmless.
+        """
+        with self.lock:
+            if self._compacting:
+                return
+            self._compacting = True
+            sessions = self._copy_sessions(self.sessions)
+            with self.writer.lock:
+                cut = self.journal_file.stat().st_size if self.journal_file.exists() else 0
+            compacted = self.pending_events
+
+        try:
+            payload = json.dumps(sessions, separators=(",", ":"))
+            self.writer.flush()
+            self.write_snapshot(payload)
+            with self.writer.lock:
+                self._drop_journal_prefix(cut)
+            with self.lock:
+                self.pending_events -= compacted
+        finally:
+            self._compacting = False
+
+    @staticmethod
+    def _copy_sessions(sessions: Dict) -> Dict:
+        """Copy each session's lists and dicts so serializing never races a mutation
+
+        Events only append to those containers or replace their values, so
+        one level of copying is a consistent view.
+        """
+        return {
+            session_id: {
+                key: value.copy() if isinstance(value, (list, dict)) else value
+                for key, value in session.items()
+            }
+            for session_id, session in sessions.items()
+        }
+
+    def write_snapshot(self, payload: str) -> None:
+        """Replace the snapshot file without ever exposing a partial write"""
+        tmp_file = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def close(self) -> None:
+        """Flush queued events and release the journal file handle"""
+        self.writer.close()
+        with self.writer.lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _maybe_compact(self):
+        if self.pending_events >= self.compact_every:
+            self.compact()
+
+    def _write_lines(self, lines: List[str], fsync: bool):
+        """Append a batch of serialized events (called with writer.lock held)"""
+        if not lines:
+            return
+        if self._journal is None:
+            self._journal = open(self.journal_file, "a", encoding="utf-8")
+
+        self._journal.write("\n".join(lines) + "\n")
+        self._journal.flush()
+        if fsync:
+            os.fsync(self._journal.fileno())
+
+    def _drop_journal_prefix(self, cut: int):
+        """Keep only the journal bytes written after offset ``cut``"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, "rb") as f:
+            f.seek(cut)
+            tail = f.read()
+
+        tmp_file = self.journal_file.with_suffix(".jsonl.tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.journal_file)
+
+    def _load_snapshot(self) -> Dict:
+        if not self.snapshot_file.exists():
+            return {}
+
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            # Snapshots are swapped in atomically, so this means the file was
+            # damaged outside our control. Refuse to start with an empty store
+            # and silently overwrite the caller's history on the next save.
+            raise RuntimeError(f"Corrupt snapshot {self.snapshot_file}: {e}") from e
+
+    def _read_journal(self) -> List[Dict]:
+        """Read journal events, dropping a torn tail left by a crash"""
+        if not self.journal_file.exists():
+            return []
+
+        events = []
+        good_offset = 0
+        with open(self.journal_file, "rb") as f:
+            for raw_line in f:
+                if not raw_line.endswith(b"\n"):
+                    break
+                try:
+                    events.append(json.loads(raw_line))
+                except json.JSONDecodeError:
+                    break
+                good_offset += len(raw_line)
+
+        if good_offset != self.journal_file.stat().st_size:
+            print(f"[Journal] ⚠️ Truncating torn journal tail at byte {good_offset}")
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(good_offset)
+
+        return events
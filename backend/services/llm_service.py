@@ -1,9 +1,20 @@
 import google.generativeai as genai
-from typing import List, Dict
+from typing import Any, AsyncIterator, List, Dict, NamedTuple
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from textwrap import dedent
+from services.booking_slots import BookingSlots
+from services.context_window import RECENT_MESSAGES
+from services.executors import get_executor
+from services.faq_router import FAQRouter
+from services.gemini_client import GeminiClient, LLMDeadlineError
+from services.response_cache import ResponseCache
+from utils.clinic_info import CLINIC_NAME, SERVICES, DENTISTS, WORKING_HOURS, LOCATION
+from utils.sentence_splitter import SentenceBuffer, split_sentences
+import asyncio
 import os
+import threading
+import time
 
 load_dotenv(override=True)
 
@@ -19,43 +30,96 @@ genai.configure(api_key=GEMINI_API_KEY)
 print("[LLM Init] ✓ Gemini configured successfully")
 
 
+# Spoken when Gemini fails; also prewarmed in the TTS cache
+FALLBACK_RESPONSE = "I'm having technical difficulties. Could you please repeat that?"
+
+MODEL_NAME = "gemini-2.5-flash"
+
+
+class PromptState(NamedTuple):
+    """System instruction and the model built with it, valid for one day"""
+    day: date
+    instruction: str
+    model: Any
+
+
 class LLMService:
     """Language Model Service using Google Gemini 2.5 Flash"""
 
     def __init__(self):
-        # Build dynamic system instruction with date awareness
-        self.SYSTEM_INSTRUCTION = self._build_system_instruction()
-
+        self._state_lock = threading.Lock()
         try:
-            self.model = genai.GenerativeModel(
-                "gemini-2.5-flash",
-                system_instruction=self.SYSTEM_INSTRUCTION
-            )
+            # Dated system instruction and model, rebuilt lazily at day rollover
+            self._state = self._build_state(datetime.now().date())
+            self.executor = get_executor("llm")
+            # Rate limit, deadline, retries and hedging for every Gemini call
+            self.client = GeminiClient(self.executor)
+            # Static clinic questions are answered without calling Gemini
+            self.faq = FAQRouter()
+            # Identical turns (typically conversation openers) reuse the previous reply
+            self.response_cache = ResponseCache()
             print("[LLM] ✓ Gemini 2.5 Flash initialized successfully")
         except Exception as e:
             print(f"[LLM] ✗ Failed to initialize: {e}")
             raise
 
-    def _build_system_instruction(self) -> str:
+    @property
+    def state(self) -> PromptState:
+        """Today's prompt state; the first call after midnight swaps in a new one"""
+        state = self._state
+        today = datetime.now().date()
+        if state.day == today:
+            return state
+
+        with self._state_lock:
+            if self._state.day != today:
+                try:
+                    # One attribute assignment, so readers see either the old or the new state
+                    self._state = self._build_state(today)
+                    print(f"[LLM] ✓ System instruction rolled over to {today.isoformat()}")
+                except Exception as e:
+                    print(f"[LLM] ✗ Could not rebuild model for {today.isoformat()}, keeping previous: {e}")
+                    return self._state
+            return self._state
+
+    @property
+    def SYSTEM_INSTRUCTION(self) -> str:
+        return self.state.instruction
+
+    @property
+    def model(self):
+        return self.state.model
+
+    @model.setter
+    def model(self, model):
+        """Replace today's model (tests use this to inject a fake)"""
+        self._state = self.state._replace(model=model)
+
+    def _build_state(self, day: date) -> PromptState:
+        instruction = self._build_system_instruction(day)
+        return PromptState(day, instruction, genai.GenerativeModel(MODEL_NAME, system_instruction=instruction))
+
+    def _build_system_instruction(self, day: date = None) -> str:
         """Build dynamic system prompt with current date context"""
-        today = datetime.now()
+        today = datetime.combine(day or datetime.now().date(), datetime.min.time())
         tomorrow = today + timedelta(days=1)
         next_week = today + timedelta(days=7)
+        # Indented to match the dedented block below
+        dentists = "\n".join(
+            f"              * {name} - {', '.join(specialties)}" for name, specialties in DENTISTS.items()
+        )
 
         return dedent(f"""
             You are Sarah, a friendly and professional AI receptionist at SmileCare Dental Clinic.
 
             TODAY'S DATE: {today.strftime('%A, %B %d, %Y')}
 
-            About SmileCare Dental:
-            - Services: General Checkup, Teeth Cleaning, Root Canal, Teeth Whitening, Braces Consultation, Dental Implants
+            About {CLINIC_NAME}:
+            - Services: {', '.join(SERVICES)}
             - Dentists:
-              * Dr. Emily Chen - General Dentistry, Teeth Cleaning
-              * Dr. James Wilson - Root Canal Specialist
-              * Dr. Priya Sharma - Cosmetic Dentistry, Whitening
-              * Dr. Mark Johnson - Orthodontics, Braces
-            - Working Hours: Monday to Saturday, 9 AM to 6 PM (Closed Sundays)
-            - Location: 123 Healthcare Ave, Downtown
+{dentists}
+            - Working Hours: {WORKING_HOURS}
+            - Location: {LOCATION}
 
             Your responsibilities:
             1. Greet patients warmly
@@ -100,97 +164,311 @@ class LLMService:
             END_APPOINTMENT"
         """).strip()
 
-    async def get_response(self, user_message: str, conversation_history: List[Dict[str, str]]) -> Dict:
+    def _build_prompt(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        summary: str = None,
+        booking: BookingSlots = None
+    ) -> str:
+        """Build the turn prompt from recent history (system instruction is already set in model)
+
+        Only the last RECENT_MESSAGES messages are sent verbatim; ``summary``
+        stands in for everything older, so the prompt stays bounded.
+        ``booking`` lists the validated booking fields and the ones still missing.
+        """
+        lines = []
+        if summary:
+            lines += [f"Earlier in this call: {summary}", ""]
+        booking_line = booking.describe() if booking else None
+        if booking_line:
+            lines += [f"Booking so far: {booking_line}", ""]
+        if conversation_history:
+            lines.append("Previous conversation:")
+            for msg in conversation_history[-RECENT_MESSAGES:]:
+                role = "Patient" if msg["role"] == "user" else "Sarah"
+                lines.append(f"{role}: {msg['content']}")
+            lines.append("")
+        lines += [f"Patient: {user_message}", "Sarah:"]
+        return "\n".join(lines)
+
+    def _cache_key(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        summary: str = None,
+        booking: BookingSlots = None,
+        day: date = None
+    ) -> str:
+        """Memo key over exactly what the prompt contains; dated like the system instruction"""
+        booking_line = booking.describe() if booking else None
+        return ResponseCache.key(
+            user_message,
+            conversation_history[-RECENT_MESSAGES:],
+            namespace=f"{(day or datetime.now().date()).isoformat()}\n{summary or ''}\n{booking_line or ''}"
+        )
+
+    def _generation_config(self):
+        return genai.types.GenerationConfig(
+            temperature=0.7,
+            top_p=0.95,
+            max_output_tokens=400,
+        )
+
+    async def get_response(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        summary: str = None,
+        booking: BookingSlots = None
+    ) -> Dict:
         """Get AI response using Gemini with conversation context"""
         try:
             print(f"[LLM] User message: '{user_message}'")
 
-            # Build conversation context (last 6 messages)
-            context = ""
-            if conversation_history:
-                context = "Previous conversation:\n"
-                for msg in conversation_history[-6:]:
-                    role = "Patient" if msg["role"] == "user" else "Sarah"
-                    context += f"{role}: {msg['content']}\n"
-                context += "\n"
+            faq_reply = self.faq.answer(user_message, conversation_history)
+            if faq_reply is not None:
+                return {"response": faq_reply, "intent": "faq", "metadata": None}
 
-            # Build prompt (system instruction is already set in model)
-            full_prompt = f"{context}Patient: {user_message}\nSarah:"
+            # One prompt state for the whole turn, even across midnight
+            state = self.state
+            cache_key = self._cache_key(user_message, conversation_history, summary, booking, state.day)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                print("[LLM] ✓ Served from response cache")
+                return cached
+
+            full_prompt = self._build_prompt(user_message, conversation_history, summary, booking)
 
             print("[LLM] Sending request to Gemini...")
-            response = self.model.generate_content(
+            started = time.perf_counter()
+            response = await self.client.generate(
+                state.model.generate_content,
                 full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    max_output_tokens=400,
-                ),
+                generation_config=self._generation_config(),
             )
 
             assistant_message = (response.text or "").strip()
             if not assistant_message:
                 raise Exception("Empty response from Gemini")
 
+            self.faq.record_llm_latency(time.perf_counter() - started)
             print(f"[LLM] ✓ Raw response ({len(assistant_message)} chars)")
-
-            # Default values
-            intent = "conversation"
-            metadata = None
-
-            # Check for appointment booking
-            if "APPOINTMENT_READY" in assistant_message and "END_APPOINTMENT" in assistant_message:
-                print("[LLM] 📅 Appointment booking detected")
-                intent = "book_appointment"
-
-                # Extract appointment block
-                start_idx = assistant_message.find("APPOINTMENT_READY")
-                end_idx = assistant_message.find("END_APPOINTMENT") + len("END_APPOINTMENT")
-                appointment_block = assistant_message[start_idx:end_idx]
-
-                # Parse metadata
-                metadata = {}
-                try:
-                    for line in appointment_block.splitlines():
-                        line = line.strip()
-                        if ":" in line and "APPOINTMENT" not in line:
-                            parts = line.split(":", 1)
-                            if len(parts) == 2:
-                                key, value = parts
-                                metadata[key.strip().lower()] = value.strip()
-                except Exception as parse_error:
-                    print(f"[LLM] ⚠️ Metadata parsing error: {parse_error}")
-                    metadata = None
-
-                # Validate required fields
-                required_fields = ["name", "email", "service", "date", "time", "dentist"]
-                if metadata and all(field in metadata for field in required_fields):
-                    print(f"[LLM] ✓ Extracted metadata: {metadata}")
-                else:
-                    missing = [f for f in required_fields if f not in (metadata or {})]
-                    print(f"[LLM] ⚠️ Incomplete metadata. Missing: {missing}")
-                    intent = "conversation"
-                    metadata = None
-
-                # Remove marker from response
-                assistant_message = assistant_message[:start_idx].strip()
-
-            # Safety cleanup - remove any stray markers
-            if "APPOINTMENT_READY" in assistant_message or "END_APPOINTMENT" in assistant_message:
-                assistant_message = assistant_message.split("APPOINTMENT_READY")[0].strip()
-                print("[LLM] Cleanup: Removed stray appointment markers")
-
-            return {
-                "response": assistant_message,
-                "intent": intent,
-                "metadata": metadata,
-            }
+            result = self._parse_response(assistant_message, booking)
+            self.response_cache.put(cache_key, result, assistant_message)
+            return result
 
         except Exception as e:
             print(f"[LLM] ✗ Error: {e}")
             import traceback
             traceback.print_exc()
             return {
-                "response": "I'm having technical difficulties. Could you please repeat that?",
+                "response": FALLBACK_RESPONSE,
                 "intent": "error",
                 "metadata": None,
-            }
\ No newline at end of file
+            }
+
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: List[Dict[str, str]],
+        summary: str = None,
+        booking: BookingSlots = None
+    ) -> AsyncIterator[Dict]:
+        """Stream the reply sentence by sentence as Gemini generates it
+
+        Yields ``{"type": "sentence", "text": ...}`` for every completed
+        speakable sentence, then one ``{"type": "done", ...}`` carrying the
+        same response/intent/metadata dict as ``get_response``. The
+        APPOINTMENT_READY block is never yielded as a sentence.
+        """
+        print(f"[LLM] User message (streaming): '{user_message}'")
+
+        faq_reply = self.faq.answer(user_message, conversation_history)
+        if faq_reply is not None:
+            for sentence in split_sentences(faq_reply):
+                yield {"type": "sentence", "text": sentence}
+            yield {"type": "done", "response": faq_reply, "intent": "faq", "metadata": None}
+            return
+
+        state = self.state
+        cache_key = self._cache_key(user_message, conversation_history, summary, booking, state.day)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            print("[LLM] ✓ Served from response cache")
+            for sentence in split_sentences(cached["response"]):
+                yield {"type": "sentence", "text": sentence}
+            yield {"type": "done", **cached}
+            return
+
+        full_prompt = self._build_prompt(user_message, conversation_history, summary, booking)
+
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                response = state.model.generate_content(
+                    full_prompt,
+                    generation_config=self._generation_config(),
+                    stream=True,
+                )
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk.text or "")
+            except Exception as e:
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+
+        async def start():
+            # Streams are rate limited too, but not retried once text may have been spoken
+            try:
+                await self.client.acquire(deadline_at)
+                await self.executor.run(produce)
+            except Exception as e:
+                # Throttled, or rejected (stage overloaded) before produce ran:
+                # nothing else will end the stream
+                chunks.put_nowait(e)
+                chunks.put_nowait(done)
+
+        started = time.perf_counter()
+        # The whole stream, not just the token wait, shares the turn's deadline
+        deadline_at = time.monotonic() + self.client.deadline
+        producer = asyncio.ensure_future(start())
+        raw = ""
+        spoken = 0
+        sentences = SentenceBuffer()
+        error = None
+        finished = timed_out = False
+
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(chunks.get(), timeout=max(0.0, deadline_at - time.monotonic()))
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    error = LLMDeadlineError(f"No complete model response within {self.client.deadline:.1f}s")
+                    break
+                if item is done:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    error = item
+                    continue
+
+                raw += item
+                speakable = _speakable_prefix(raw)
+                for sentence in sentences.push(speakable[spoken:]):
+                    yield {"type": "sentence", "text": sentence}
+                spoken = len(speakable)
+        finally:
+            if not finished:
+                # Stop waiting on a stream we gave up on; its worker exits at the next chunk
+                stop.set()
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+        if error is not None:
+            print(f"[LLM] ✗ Streaming error: {error}")
+        if timed_out:
+            self.client.record("timeout")
+        elif error is not None and not isinstance(error, LLMDeadlineError):
+            # A throttled stream was already counted by acquire
+            self.client.record("error")
+        if not raw.strip():
+            yield {"type": "sentence", "text": FALLBACK_RESPONSE}
+            yield {"type": "done", "response": FALLBACK_RESPONSE, "intent": "error", "metadata": None}
+            return
+
+        # Everything left is speakable once the stream ends without a marker
+        speakable = _speakable_prefix(raw, final=True)
+        sentences.push(speakable[spoken:])
+        tail = sentences.flush()
+        if tail:
+            yield {"type": "sentence", "text": tail}
+
+        result = self._parse_response(raw.strip(), booking)
+        if error is None:
+            self.client.record("success", time.perf_counter() - started)
+            self.faq.record_llm_latency(time.perf_counter() - started)
+            self.response_cache.put(cache_key, result, raw)
+        print(f"[LLM] ✓ Streamed response ({len(raw)} chars)")
+        yield {"type": "done", **result}
+
+    def _parse_response(self, assistant_message: str, booking: BookingSlots = None) -> Dict:
+        """Split the spoken reply from an optional APPOINTMENT_READY block
+
+        Fields the block leaves out are taken from ``booking`` when known.
+        """
+        # Default values
+        intent = "conversation"
+        metadata = None
+
+        # Check for appointment booking
+        if "APPOINTMENT_READY" in assistant_message and "END_APPOINTMENT" in assistant_message:
+            print("[LLM] 📅 Appointment booking detected")
+            intent = "book_appointment"
+
+            # Extract appointment block
+            start_idx = assistant_message.find("APPOINTMENT_READY")
+            end_idx = assistant_message.find("END_APPOINTMENT") + len("END_APPOINTMENT")
+            appointment_block = assistant_message[start_idx:end_idx]
+
+            # Parse metadata
+            metadata = {}
+            try:
+                for line in appointment_block.splitlines():
+                    line = line.strip()
+                    if ":" in line and "APPOINTMENT" not in line:
+                        parts = line.split(":", 1)
+                        if len(parts) == 2:
+                            key, value = parts
+                            metadata[key.strip().lower()] = value.strip()
+            except Exception as parse_error:
+                print(f"[LLM] ⚠️ Metadata parsing error: {parse_error}")
+                metadata = None
+
+            if metadata is not None and booking is not None:
+                metadata = booking.fill(metadata)
+
+            # Validate required fields
+            required_fields = ["name", "email", "service", "date", "time", "dentist"]
+            if metadata and all(field in metadata for field in required_fields):
+                print(f"[LLM] ✓ Extracted metadata: {metadata}")
+            else:
+                missing = [f for f in required_fields if f not in (metadata or {})]
+                print(f"[LLM] ⚠️ Incomplete metadata. Missing: {missing}")
+                intent = "conversation"
+                metadata = None
+
+            # Remove marker from response
+            assistant_message = assistant_message[:start_idx].strip()
+
+        # Safety cleanup - remove any stray markers
+        if "APPOINTMENT_READY" in assistant_message or "END_APPOINTMENT" in assistant_message:
+            assistant_message = assistant_message.split("APPOINTMENT_READY")[0].strip()
+            print("[LLM] Cleanup: Removed stray appointment markers")
+
+        return {
+            "response": assistant_message,
+            "intent": intent,
+            "metadata": metadata,
+        }
+
+
+def _speakable_prefix(raw: str, final: bool = False) -> str:
+    """Text safe to speak so far: cut at the appointment marker and, while
+    streaming, hold back a tail that could be the start of that marker."""
+    marker = "APPOINTMENT_READY"
+    idx = raw.find(marker)
+    if idx != -1:
+        return raw[:idx]
+    if not final:
+        for length in range(min(len(marker) - 1, len(raw)), 0, -1):
+            if marker.startswith(raw[-length:]):
+                return raw[:-length]
+    return raw
@@ -1,12 +1,16 @@
-import json
-from typing import List, Dict
+import os
+import threading
+from typing import List, Dict, Optional
 from pathlib import Path
 from datetime import datetime
+from services.journal_store import JournalStore
+from services.context_window import ContextWindows, ConversationContext
+from services import events
 
 class ConversationMemory:
     """Manages conversation history and metadata"""
     
-    def __init__(self, data_file: str = None):
+    def __init__(self, data_file: str = None, compact_every: int = None, durability: str = None):
         if data_file is None:
             # Get path relative to backend directory
             backend_dir = Path(__file__).parent.parent
@@ -17,45 +21,98 @@ class ConversationMemory:
             self.data_file = Path(data_file)
             self.data_file.parent.mkdir(exist_ok=True, parents=True)
         
+        if compact_every is None:
+            compact_every = int(os.getenv("MEMORY_COMPACT_EVERY", 500))
+        if durability is None:
+            durability = os.getenv("MEMORY_DURABILITY", "group")
+
+        self.store = JournalStore(
+            self.data_file,
+            compact_every=compact_every,
+            durability=durability,
+            flush_interval_ms=int(os.getenv("MEMORY_FLUSH_INTERVAL_MS", 50)),
+            flush_max_pending=int(os.getenv("MEMORY_FLUSH_MAX_PENDING", 64))
+        )
         self.sessions = self._load_data()
+        self.events = events.ChangeBus()
+        self.contexts = ContextWindows(self.get_history)
+        self.events.subscribe(self.contexts.on_event)
     
     def _load_data(self) -> Dict:
-        """Load conversation data from file"""
-        if self.data_file.exists():
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    def _save_data(self):
-        """Save conversation data to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.sessions, f, indent=2)
+        """Load the last snapshot and replay the journal written since"""
+        sessions = self.store.load(self._apply_event)
+        if self.store.pending_events >= self.store.compact_every:
+            self.store.compact()
+        return sessions
     
-    def create_session(self, session_id: str) -> None:
-        """Create a new conversation session"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "created_at": datetime.now().isoformat(),
+    def _save_event(self, event: Dict):
+        """Apply an event in memory, queue it for the journal and notify subscribers"""
+        with self.store.lock:
+            self._apply_event(self.sessions, event)
+            self.store.append(event)
+        
+        op = event["op"]
+        if op == "create_session":
+            self.events.publish(events.SESSION_CREATED, event["session_id"])
+        elif op == "add_message":
+            self.events.publish(events.MESSAGE_ADDED, event["session_id"], message=event["message"])
+        elif op == "update_metadata":
+            self.events.publish(events.METADATA_UPDATED, event["session_id"], metadata=event["metadata"])
+        elif op == "add_appointment":
+            self.events.publish(events.APPOINTMENT_BOOKED, event["session_id"], appointment=event["appointment"])
+    
+    @staticmethod
+    def _apply_event(sessions: Dict, event: Dict):
+        """Apply a journal event to the sessions dict
+
+        Message and appointment events carry their list position so replaying
+        an event that is already in the snapshot is a no-op.
+        """
+        op = event["op"]
+        session_id = event["session_id"]
+        
+        if session_id not in sessions:
+            sessions[session_id] = {
+                "created_at": event.get("created_at", event.get("timestamp")),
                 "messages": [],
                 "metadata": {},
                 "appointments": []
             }
-            self._save_data()
+        session = sessions[session_id]
+        
+        if op == "add_message":
+            if len(session["messages"]) == event["index"]:
+                session["messages"].append(event["message"])
+        elif op == "update_metadata":
+            session["metadata"].update(event["metadata"])
+        elif op == "add_appointment":
+            if len(session["appointments"]) == event["index"]:
+                session["appointments"].append(event["appointment"])
+    
+    def create_session(self, session_id: str) -> None:
+        """Create a new conversation session"""
+        if session_id not in self.sessions:
+            self._save_event({
+                "op": "create_session",
+                "session_id": session_id,
+                "created_at": datetime.now().isoformat()
+            })
     
     def add_message(self, session_id: str, role: str, content: str):
         """Add message to session history"""
         if session_id not in self.sessions:
             self.create_session(session_id)
         
-        self.sessions[session_id]["messages"].append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
+        self._save_event({
+            "op": "add_message",
+            "session_id": session_id,
+            "index": len(self.sessions[session_id]["messages"]),
+            "message": {
+                "role": role,
+                "content": content,
+                "timestamp": datetime.now().isoformat()
+            }
         })
-        self._save_data()
     
     def get_history(self, session_id: str) -> List[Dict]:
         """Get conversation history for session"""
@@ -68,13 +125,21 @@ class ConversationMemory:
             for msg in self.sessions[session_id]["messages"]
         ]
     
+    def get_context(self, session_id: str) -> ConversationContext:
+        """Recent messages and a summary of older ones, without copying the history"""
+        session = self.sessions.get(session_id)
+        return self.contexts.get(session_id, len(session["messages"]) if session else 0)
+    
     def update_metadata(self, session_id: str, metadata: Dict):
         """Update session metadata"""
         if session_id not in self.sessions:
             self.create_session(session_id)
         
-        self.sessions[session_id]["metadata"].update(metadata)
-        self._save_data()
+        self._save_event({
+            "op": "update_metadata",
+            "session_id": session_id,
+            "metadata": metadata
+        })
     
     def add_appointment(self, session_id: str, appointment: Dict):
         """Add appointment to session"""
@@ -82,5 +147,80 @@ class ConversationMemory:
             self.create_session(session_id)
         
         appointment["booked_at"] = datetime.now().isoformat()
-        self.sessions[session_id]["appointments"].append(appointment)
-        self._save_data()
\ No newline at end of file
+        self._save_event({
+            "op": "add_appointment",
+            "session_id": session_id,
+            "index": len(self.sessions[session_id]["appointments"]),
+            "appointment": appointment
+        })
+    
+    def get_metadata(self, session_id: str) -> Dict:
+        """Session metadata (empty for an unknown session)"""
+        session = self.sessions.get(session_id)
+        return dict(session["metadata"]) if session else {}
+    
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Get the full session record, or None if it does not exist"""
+        return self.sessions.get(session_id)
+    
+    def list_appointments(self, date: str = None, dentist: str = None) -> List[Dict]:
+        """List appointments across sessions, optionally filtered by date and dentist"""
+        return [
+            {"session_id": session_id, **appointment}
+            for session_id, session_data in self.sessions.items()
+            for appointment in session_data.get("appointments", [])
+            if (not date or appointment.get("date") == date)
+            and (not dentist or appointment.get("dentist") == dentist)
+        ]
+    
+    def compact(self):
+        """Fold the journal into a fresh snapshot"""
+        self.store.compact()
+    
+    def flush(self):
+        """Force queued journal writes to disk"""
+        self.store.flush()
+    
+    def close(self):
+        """Flush queued writes and release the journal file handle"""
+        self.store.close()
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def create_memory():
+    """Build the conversation store selected by MEMORY_BACKEND (journal or sqlite)"""
+    backend = os.getenv("MEMORY_BACKEND", "journal").lower()
+    
+    if backend == "sqlite":
+        from services.sqlite_memory import SQLiteConversationMemory
+        return SQLiteConversationMemory(os.getenv("MEMORY_DB_FILE"))
+    if backend == "journal":
+        return ConversationMemory(os.getenv("MEMORY_DATA_FILE"))
+    
+    raise ValueError(f"Unknown MEMORY_BACKEND: {backend}")
+
+
+def get_memory():
+    """Process-wide conversation store, injected into routes with Depends(get_memory)
+
+    Every router shares this instance so reads always see the latest writes
+    without reloading from disk.
+    """
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = create_memory()
+    return _memory
+
+
+def shutdown_memory():
+    """Flush and close the shared store; registered as an app shutdown hook"""
+    global _memory
+    with _memory_lock:
+        if _memory is not None:
+            _memory.close()
+            _memory = None
@@ -0,0 +1,193 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; covers a cached TTS hit (ms) up to a slow Gemini turn
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A collector yields (name, type, help, [(labels, value), ...]) at scrape time
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class _Metric:
+    """Shared label handling: one value slot per label tuple, created on first use"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames and self.kind != "histogram":
+            # Unlabelled series are exported as 0 before their first update
+            self._values[()] = 0
+
+    def _labels_text(self, labels: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_value(labels, value))
+        return lines
+
+    def _render_value(self, labels, value) -> List[str]:
+        return [f"{self.name}{self._labels_text(labels)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; an observation is a bisect and two additions"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts..., +Inf count, sum]
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def time(self, *labels: str) -> "Span":
+        return Span(self, labels)
+
+    def _render_value(self, labels, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{self._labels_text(labels, le)} {cumulative}")
+        cumulative += state[len(self.buckets)]
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{self._labels_text(labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels_text(labels)} {_number(state[-1])}")
+        lines.append(f"{self.name}_count{self._labels_text(labels)} {cumulative}")
+        return lines
+
+
+class Span:
+    """``with HISTOGRAM.time("stage"):`` records the block's wall time"""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Registry:
+    """Metrics owned by this process plus collectors polled at scrape time
+
+    Collectors read counters the services already keep (cache hits,
+    executor queues, ...) so those cost nothing on the request path.
+    """
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"[Metrics] ⚠️ Collector failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_number(value)}" if label_text else f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "voice_stage_seconds", "Time spent in each stage of a voice turn", ("stage",)
+))
+TURN_SECONDS = REGISTRY.register(Histogram(
+    "voice_turn_seconds", "End-to-end time of a voice endpoint", ("endpoint",)
+))
+TURNS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "voice_turns_in_flight", "Voice turns currently being processed", ("endpoint",)
+))
+INTENTS = REGISTRY.register(Counter(
+    "voice_intents_total", "Assistant turns by detected intent", ("intent",)
+))
+BOOKINGS = REGISTRY.register(Counter(
+    "appointments_booked_total", "Appointments booked through conversations"
+))
+STT_FAILURES = REGISTRY.register(Counter(
+    "stt_failures_total", "Speech recognition failures by reason", ("reason",)
+))
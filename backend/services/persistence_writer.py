@@ -0,0 +1,113 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+DURABILITY_MODES = ("sync", "group", "async")
+
+
+class GroupCommitWriter:
+    """Coalesces persistence writes and flushes them in batches
+
+    Durability modes:
+    - ``sync``: every item is written and fsynced before ``submit`` returns.
+    - ``group``: items are queued and a background thread writes and fsyncs
+      them as one batch every ``interval_ms``, or sooner once ``max_pending``
+      items are waiting. At most one interval of writes can be lost.
+    - ``async``: like ``group`` but batches are only handed to the OS page
+      cache; fsync happens on ``flush()``/``close()``.
+
+    ``write_batch(items, fsync)`` is always called with ``self.lock`` held, so
+    batches reach disk in submission order. ``after_flush`` runs after every
+    batch without the lock (used to trigger journal compaction).
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[str], bool], None],
+        mode: str = "group",
+        interval_ms: int = 50,
+        max_pending: int = 64,
+        after_flush: Optional[Callable[[], None]] = None
+    ):
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {mode} (expected one of {DURABILITY_MODES})")
+
+        self.write_batch = write_batch
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self.after_flush = after_flush
+
+        self.lock = threading.Lock()
+        self._pending: List[str] = []
+        self._wakeup = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, item: str) -> None:
+        """Queue an item for writing (or write it now in sync mode)"""
+        if self.mode == "sync":
+            with self.lock:
+                self.write_batch([item], True)
+            if self.after_flush:
+                self.after_flush()
+            return
+
+        with self._wakeup:
+            self._pending.append(item)
+            if self._thread is None:
+                self._start()
+            if len(self._pending) >= self.max_pending:
+                self._wakeup.notify()
+
+    def flush(self) -> bool:
+        """Write and fsync everything queued so far on the calling thread"""
+        return self._write_pending(True)
+
+    def close(self) -> None:
+        """Stop the background thread and flush whatever is still queued"""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _write_pending(self, fsync: bool) -> bool:
+        """Write the queued batch; on failure put it back and return False"""
+        with self.lock:
+            with self._wakeup:
+                batch, self._pending = self._pending, []
+            try:
+                self.write_batch(batch, fsync)
+                return True
+            except Exception as e:
+                print(f"[Writer] ✗ Batch flush failed, will retry: {e}")
+                with self._wakeup:
+                    self._pending = batch + self._pending
+                return False
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._closed and len(self._pending) < self.max_pending:
+                    self._wakeup.wait(self.interval)
+                if self._closed:
+                    return
+                if not self._pending:
+                    continue
+
+            if not self._write_pending(self.mode == "group"):
+                time.sleep(self.interval)
+                continue
+
+            if self.after_flush:
+                try:
+                    self.after_flush()
+                except Exception as e:
+                    print(f"[Writer] ✗ After-flush hook failed: {e}")
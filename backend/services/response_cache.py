@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a message"""
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"[^\w@'\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ResponseCache:
+    """TTL + LRU memo of model replies keyed by the normalized turn context
+
+    The key covers the same window of history the prompt is built from, the
+    user's message and a namespace (the prompt's date), so a hit is only
+    possible when the model would have been asked the same thing.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512))
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", 3600))
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, result)
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.skipped = 0
+
+    @staticmethod
+    def key(user_message: str, history: List[Dict[str, str]], namespace: str = "") -> str:
+        parts = [namespace]
+        parts.extend(f"{msg['role']}:{normalize_text(msg['content'])}" for msg in history)
+        parts.append(f"user:{normalize_text(user_message)}")
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+
+    def put(self, key: str, result: Dict, raw: str = "") -> bool:
+        """Remember a reply unless it books an appointment or is an error"""
+        if not self.max_entries:
+            return False
+        if result["intent"] != "conversation" or result.get("metadata") or "APPOINTMENT_READY" in raw:
+            with self._lock:
+                self.skipped += 1
+            return False
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expired": self.expired,
+                "skipped": self.skipped,
+            }
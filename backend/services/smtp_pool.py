@@ -0,0 +1,189 @@
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Callable, Dict, List, Optional
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions open between sends
+
+    ``connect`` opens a ready-to-send session (TLS and login done). At most
+    ``max_size`` sessions exist at once, which also caps concurrent
+    connections to the provider. Idle sessions older than ``idle_timeout``
+    are closed instead of reused; ones idle longer than ``check_after`` get a
+    NOOP probe first. A session is retired after ``max_messages`` sends.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        max_size: int = 2,
+        idle_timeout: float = 60.0,
+        max_messages: int = 100,
+        check_after: float = 5.0
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.check_after = check_after
+
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def send(self, msg: Message):
+        """Send one message, raising on failure (blocking)"""
+        error = self.send_batch([msg])[0]
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Send messages in order over one pooled session (blocking)
+
+        Returns one entry per message: None if it was accepted, otherwise the
+        exception. A session that turns out to be dead is replaced and the
+        message retried once, but only if the session came from the idle pool
+        (so an accepted message is never sent twice on a fresh connection).
+        """
+        results: List[Optional[Exception]] = []
+        with self._slot():
+            entry, reused = None, False
+            for msg in messages:
+                while True:
+                    try:
+                        if entry is None:
+                            entry, reused = self._checkout()
+                        entry.server.send_message(msg)
+                        entry.sent += 1
+                        results.append(None)
+                    except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                        # Rejected message (SMTPException subclasses OSError, so
+                        # this must come first); reset and keep the healthy session
+                        results.append(e)
+                        if entry is not None:
+                            entry = self._reset(entry)
+                    except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout) as e:
+                        self._discard(entry)
+                        retry, entry = reused, None
+                        reused = False
+                        if retry:
+                            print(f"[SMTP Pool] ⚠️ Pooled connection was dead, reconnecting: {e}")
+                            continue
+                        results.append(e)
+                    except smtplib.SMTPException as e:
+                        results.append(e)
+                        if entry is not None:
+                            entry = self._reset(entry)
+                    except OSError as e:
+                        # Any other socket failure: the session is unusable
+                        self._discard(entry)
+                        entry, reused = None, False
+                        results.append(e)
+                    break
+
+                reused = False
+                if entry is not None and entry.sent >= self.max_messages:
+                    self._discard(entry)
+                    entry = None
+
+            if entry is not None:
+                self._checkin(entry)
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+    def close(self):
+        """Close every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._quit(entry)
+
+    @contextmanager
+    def _slot(self):
+        self._slots.acquire()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        """Return (connection, reused) with a live idle session if one exists"""
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                break
+
+            idle_for = time.monotonic() - entry.last_used
+            if idle_for > self.idle_timeout:
+                self._discard(entry)
+                continue
+            if idle_for > self.check_after and not self._is_alive(entry):
+                self._discard(entry)
+                continue
+
+            with self._lock:
+                self.reused += 1
+            return entry, True
+
+        entry = _PooledConnection(self.connect())
+        with self._lock:
+            self.opened += 1
+        return entry, False
+
+    def _checkin(self, entry: _PooledConnection):
+        entry.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(entry)
+
+    def _reset(self, entry: _PooledConnection) -> Optional[_PooledConnection]:
+        try:
+            entry.server.rset()
+            return entry
+        except (smtplib.SMTPException, OSError):
+            self._discard(entry)
+            return None
+
+    def _discard(self, entry: Optional[_PooledConnection]):
+        if entry is None:
+            return
+        with self._lock:
+            self.discarded += 1
+        self._quit(entry)
+
+    @staticmethod
+    def _is_alive(entry: _PooledConnection) -> bool:
+        try:
+            return entry.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(entry: _PooledConnection):
+        try:
+            entry.server.quit()
+        except (smtplib.SMTPException, OSError):
+            entry.server.close()
@@ -0,0 +1,251 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+from pathlib import Path
+from datetime import datetime
+from services.context_window import ContextWindows, ConversationContext
+from services import events
+
+# MEMORY_DURABILITY mapped onto SQLite's own commit durability
+SYNCHRONOUS_PRAGMAS = {"sync": "FULL", "group": "NORMAL", "async": "OFF"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    name TEXT,
+    email TEXT,
+    service TEXT,
+    date TEXT,
+    time TEXT,
+    dentist TEXT,
+    booked_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_appointments_session ON appointments(session_id);
+CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(date, time);
+CREATE INDEX IF NOT EXISTS idx_appointments_dentist ON appointments(dentist, date);
+CREATE INDEX IF NOT EXISTS idx_appointments_booked_at ON appointments(booked_at);
+"""
+
+
+class SQLiteConversationMemory:
+    """ConversationMemory backed by SQLite in WAL mode
+
+    Exposes the same methods as ``ConversationMemory`` but keeps no
+    process-local copy of the data, so several uvicorn workers can share one
+    database file and always see each other's writes.
+    """
+
+    def __init__(self, db_file: str = None, durability: str = None):
+        if db_file is None:
+            backend_dir = Path(__file__).parent.parent
+            data_dir = backend_dir.parent / "data"
+            self.db_file = data_dir / "conversations.db"
+        else:
+            self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(exist_ok=True, parents=True)
+
+        if durability is None:
+            durability = os.getenv("MEMORY_DURABILITY", "group")
+        self.synchronous = SYNCHRONOUS_PRAGMAS[durability]
+
+        self._local = threading.local()
+        # Every thread's connection, so close() can release them all
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        self._conn.executescript(SCHEMA)
+        self.events = events.ChangeBus()
+        self.contexts = ContextWindows(self.get_history)
+        self.events.subscribe(self.contexts.on_event)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not shareable"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is only used by its own thread; check_same_thread
+            # is off so close() may release it from whichever thread shuts down
+            conn = sqlite3.connect(str(self.db_file), timeout=10, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.add(conn)
+        return conn
+
+    def _ensure_session(self, conn: sqlite3.Connection, session_id: str) -> bool:
+        """Insert the session row if missing; returns True if it was created"""
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)",
+            (session_id, datetime.now().isoformat())
+        )
+        return cursor.rowcount > 0
+
+    def create_session(self, session_id: str) -> None:
+        """Create a new conversation session"""
+        if self._ensure_session(self._conn, session_id):
+            self.events.publish(events.SESSION_CREATED, session_id)
+
+    def add_message(self, session_id: str, role: str, content: str):
+        """Add message to session history"""
+        message = {"role": role, "content": content, "timestamp": datetime.now().isoformat()}
+        conn = self._conn
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            created = self._ensure_session(conn, session_id)
+            conn.execute(
+                "INSERT INTO messages (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                (session_id, role, content, message["timestamp"])
+            )
+
+        if created:
+            self.events.publish(events.SESSION_CREATED, session_id)
+        self.events.publish(events.MESSAGE_ADDED, session_id, message=message)
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        """Get conversation history for session"""
+        rows = self._conn.execute(
+            "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        )
+        return [{"role": row["role"], "content": row["content"]} for row in rows]
+
+    def get_context(self, session_id: str) -> ConversationContext:
+        """Recent messages and a summary of older ones
+
+        The message count (an index lookup) detects writes made by other
+        workers, in which case the window is rebuilt from the database.
+        """
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS n FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return self.contexts.get(session_id, row["n"])
+
+    def update_metadata(self, session_id: str, metadata: Dict):
+        """Update session metadata"""
+        conn = self._conn
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            created = self._ensure_session(conn, session_id)
+            row = conn.execute(
+                "SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            merged = json.loads(row["metadata"])
+            merged.update(metadata)
+            conn.execute(
+                "UPDATE sessions SET metadata = ? WHERE session_id = ?",
+                (json.dumps(merged), session_id)
+            )
+
+        if created:
+            self.events.publish(events.SESSION_CREATED, session_id)
+        self.events.publish(events.METADATA_UPDATED, session_id, metadata=metadata)
+
+    def add_appointment(self, session_id: str, appointment: Dict):
+        """Add appointment to session"""
+        appointment["booked_at"] = datetime.now().isoformat()
+        conn = self._conn
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            created = self._ensure_session(conn, session_id)
+            conn.execute(
+                """INSERT INTO appointments
+                   (session_id, name, email, service, date, time, dentist, booked_at, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    session_id,
+                    appointment.get("name"),
+                    appointment.get("email"),
+                    appointment.get("service"),
+                    appointment.get("date"),
+                    appointment.get("time"),
+                    appointment.get("dentist"),
+                    appointment["booked_at"],
+                    json.dumps(appointment)
+                )
+            )
+
+        if created:
+            self.events.publish(events.SESSION_CREATED, session_id)
+        self.events.publish(events.APPOINTMENT_BOOKED, session_id, appointment=appointment)
+
+    def get_metadata(self, session_id: str) -> Dict:
+        """Session metadata (empty for an unknown session)"""
+        row = self._conn.execute(
+            "SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row["metadata"]) if row else {}
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Get the full session record, or None if it does not exist"""
+        conn = self._conn
+        row = conn.execute(
+            "SELECT created_at, metadata FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        messages = conn.execute(
+            "SELECT role, content, timestamp FROM messages WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        )
+        appointments = conn.execute(
+            "SELECT data FROM appointments WHERE session_id = ? ORDER BY id", (session_id,)
+        )
+        return {
+            "created_at": row["created_at"],
+            "messages": [dict(message) for message in messages],
+            "metadata": json.loads(row["metadata"]),
+            "appointments": [json.loads(a["data"]) for a in appointments]
+        }
+
+    def list_appointments(self, date: str = None, dentist: str = None) -> List[Dict]:
+        """List appointments across sessions, optionally filtered by date and dentist"""
+        query = "SELECT session_id, data FROM appointments"
+        clauses, params = [], []
+        if date:
+            clauses.append("date = ?")
+            params.append(date)
+        if dentist:
+            clauses.append("dentist = ?")
+            params.append(dentist)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY booked_at"
+
+        return [
+            {"session_id": row["session_id"], **json.loads(row["data"])}
+            for row in self._conn.execute(query, params)
+        ]
+
+    def flush(self):
+        """Commits are durable per the synchronous pragma; nothing is queued"""
+
+    def close(self):
+        """Close the connections opened by every thread (route, executor and worker threads)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+            # Threads reconnect on next use instead of reusing a closed handle
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,126 @@
+import os
+import time
+import zlib
+from typing import Dict, Type
+import speech_recognition as sr
+
+# Backends raise speech_recognition's own errors so STTService maps every
+# engine's failures the same way:
+#   sr.UnknownValueError -> audio had no recognizable speech
+#   sr.RequestError      -> the engine itself failed or is unreachable
+
+
+class STTBackend:
+    """A speech recognition engine for 16 kHz-or-similar mono PCM held in memory"""
+
+    name = "base"
+
+    def recognize(self, pcm: bytes, sample_rate: int, sample_width: int) -> str:
+        raise NotImplementedError
+
+
+class GoogleSTTBackend(STTBackend):
+    """Google's free Web Speech API via speech_recognition (network round trip)"""
+
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        # Adjust recognition settings for better accuracy
+        self.recognizer.energy_threshold = 4000
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 0.8
+
+    def recognize(self, pcm: bytes, sample_rate: int, sample_width: int) -> str:
+        audio_data = sr.AudioData(pcm, sample_rate, sample_width)
+        return self.recognizer.recognize_google(audio_data)
+
+
+class LocalSTTBackend(STTBackend):
+    """Offline CPU recognition with faster-whisper (optional dependency)
+
+    Configure with STT_LOCAL_MODEL (default ``base.en``), STT_LOCAL_COMPUTE_TYPE
+    (default ``int8``) and STT_LOCAL_THREADS. The model is loaded once, at
+    construction, so the first request does not pay for it.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size: str = None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("STT_BACKEND=local needs faster-whisper: pip install faster-whisper")
+
+        self.model_size = model_size or os.getenv("STT_LOCAL_MODEL", "base.en")
+        print(f"[STT Local] Loading faster-whisper model '{self.model_size}'...")
+        self.model = WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=os.getenv("STT_LOCAL_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("STT_LOCAL_THREADS", 0))
+        )
+        print(f"[STT Local] ✓ Model ready")
+
+    def recognize(self, pcm: bytes, sample_rate: int, sample_width: int) -> str:
+        import numpy as np
+        from utils.audio_helper import convert_pcm, pcm_to_float
+
+        if sample_rate != 16000 or sample_width != 2:
+            pcm = convert_pcm(pcm, sample_rate, 1, sample_width)
+        samples = pcm_to_float(pcm, 2).astype(np.float32)
+
+        try:
+            segments, _ = self.model.transcribe(samples, language="en", beam_size=1, vad_filter=False)
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            raise sr.RequestError(f"local recognition failed: {e}")
+
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class StubSTTBackend(STTBackend):
+    """Deterministic fake recognizer for load tests
+
+    Returns one of ``STUB_PHRASES`` chosen by a checksum of the audio, so the
+    same clip always yields the same text. STT_STUB_TEXT pins a single reply
+    and STT_STUB_LATENCY_MS simulates engine latency.
+    """
+
+    name = "stub"
+
+    STUB_PHRASES = [
+        "I would like to book a teeth cleaning",
+        "What are your opening hours",
+        "Can I see Dr. Emily Chen next Monday at 10 am",
+        "My name is John Doe and my email is john@example.com",
+        "Yes, that works for me",
+    ]
+
+    def __init__(self, text: str = None, latency_ms: float = None):
+        self.text = text if text is not None else os.getenv("STT_STUB_TEXT")
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv("STT_STUB_LATENCY_MS", 0))
+
+    def recognize(self, pcm: bytes, sample_rate: int, sample_width: int) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.text:
+            return self.text
+        return self.STUB_PHRASES[zlib.crc32(pcm) % len(self.STUB_PHRASES)]
+
+
+BACKENDS: Dict[str, Type[STTBackend]] = {
+    GoogleSTTBackend.name: GoogleSTTBackend,
+    LocalSTTBackend.name: LocalSTTBackend,
+    StubSTTBackend.name: StubSTTBackend,
+}
+
+
+def create_backend(name: str = None) -> STTBackend:
+    """Build the backend named by ``name`` or STT_BACKEND (default: google)"""
+    name = (name or os.getenv("STT_BACKEND", "google")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT_BACKEND '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -1,100 +1,85 @@
 import speech_recognition as sr
 from pathlib import Path
-from pydub import AudioSegment
-import os
+from services.executors import get_executor
+from services.metrics import STAGE_SECONDS, STT_FAILURES
+from services.stt_backends import create_backend
+from services.vad_service import VoiceActivityDetector, NoSpeechError
+from utils.audio_helper import (
+    convert_audio_format, sniff_format,
+    TARGET_SAMPLE_RATE, TARGET_CHANNELS, TARGET_SAMPLE_WIDTH
+)
 
 class STTService:
-    """Speech-to-Text Service using Google's free API"""
+    """Speech-to-Text Service with a pluggable recognition backend (STT_BACKEND)"""
     
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        # Adjust recognition settings for better accuracy
-        self.recognizer.energy_threshold = 4000
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8
+    def __init__(self, backend: str = None):
+        self.backend = create_backend(backend)
+        print(f"[STT] Using '{self.backend.name}' backend")
+        self.executor = get_executor("stt")
+        # Trims silence before upload and keeps a noise-floor calibration per session
+        self.vad = VoiceActivityDetector()
     
     async def transcribe_audio(self, audio_file_path: str) -> str:
-        """Transcribe audio file to text"""
+        """Transcribe an audio file on disk to text on the STT executor"""
+        data = Path(audio_file_path).read_bytes()
+        return await self.transcribe_bytes(data)
+    
+    async def transcribe_bytes(self, data: bytes, session_id: str = None) -> str:
+        """Transcribe an uploaded audio file (any supported container) held in memory"""
+        return await self.executor.run(self._transcribe_bytes_sync, data, session_id)
+    
+    async def transcribe_pcm(self, pcm: bytes, sample_rate: int = 16000, sample_width: int = 2, session_id: str = None) -> str:
+        """Transcribe raw mono PCM already held in memory (streaming path)"""
+        return await self.executor.run(self._transcribe_pcm_sync, pcm, sample_rate, sample_width, session_id)
+    
+    def _transcribe_pcm_sync(self, pcm: bytes, sample_rate: int, sample_width: int, session_id: str = None) -> str:
+        """Blocking recognition of an in-memory PCM buffer, no files involved"""
         try:
-            audio_path = Path(audio_file_path)
+            if not pcm:
+                raise Exception("Audio buffer is empty")
             
-            print(f"[STT] Processing audio file: {audio_path}")
-            print(f"[STT] File exists: {audio_path.exists()}")
-            print(f"[STT] File size: {audio_path.stat().st_size} bytes")
+            # Drop leading/trailing silence; empty clips never reach the network
+            if sample_width == 2:
+                with STAGE_SECONDS.time("vad"):
+                    vad = self.vad.trim(pcm, sample_rate, session_id)
+                print(f"[STT] VAD: {vad.speech_ms}ms speech, trimmed {vad.trimmed_ms}ms silence")
+                pcm = vad.pcm
             
-            # Check if file is empty
-            if audio_path.stat().st_size == 0:
-                raise Exception("Audio file is empty")
+            print(f"[STT] Recognizing with {self.backend.name} backend ({len(pcm)} bytes PCM)...")
+            with STAGE_SECONDS.time("stt_recognize"):
+                text = self.backend.recognize(pcm, sample_rate, sample_width)
+            print(f"[STT] ✓ Transcription successful: '{text}'")
+            return text
             
-            # Convert audio to proper WAV format
-            converted_path = self._convert_to_wav(str(audio_path))
-            
-            print(f"[STT] Converted audio path: {converted_path}")
-            print(f"[STT] Starting transcription...")
-            
-            # Transcribe
-            with sr.AudioFile(converted_path) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Record the audio
-                audio_data = self.recognizer.record(source)
-                
-                # Transcribe using Google
-                print(f"[STT] Calling Google Speech Recognition API...")
-                text = self.recognizer.recognize_google(audio_data)
-                
-                print(f"[STT] ✓ Transcription successful: '{text}'")
-                
-                # Clean up converted file if it's different from original
-                if converted_path != str(audio_path):
-                    try:
-                        os.remove(converted_path)
-                    except:
-                        pass
-                
-                return text
-                
+        except NoSpeechError:
+            STT_FAILURES.inc("no_speech")
+            raise Exception("No speech detected. Please speak clearly and ensure your microphone is working.")
         except sr.UnknownValueError:
+            STT_FAILURES.inc("unintelligible")
             raise Exception("Could not understand audio. Please speak clearly and ensure your microphone is working.")
         except sr.RequestError as e:
+            STT_FAILURES.inc("request_error")
             raise Exception(f"Could not request results from speech recognition service: {e}")
         except Exception as e:
+            STT_FAILURES.inc("error")
             raise Exception(f"STT Error: {str(e)}")
     
-    def _convert_to_wav(self, audio_file_path: str) -> str:
-        """Convert audio to WAV format with correct parameters"""
+    def _transcribe_bytes_sync(self, data: bytes, session_id: str = None) -> str:
+        """Blocking transcription of an uploaded file held in memory"""
         try:
-            audio_path = Path(audio_file_path)
-            
-            # If already a WAV file, try to use it directly
-            # but re-encode to ensure correct format
-            output_path = audio_path.parent / f"{audio_path.stem}_converted.wav"
-            
-            print(f"[STT] Converting audio to proper WAV format...")
-            
-            # Load audio file (supports many formats)
-            audio = AudioSegment.from_file(str(audio_path))
-            
-            # Convert to WAV with specific parameters that work with speech_recognition
-            audio = audio.set_frame_rate(16000)  # 16kHz sample rate
-            audio = audio.set_channels(1)         # Mono
-            audio = audio.set_sample_width(2)     # 16-bit
-            
-            # Export as WAV
-            audio.export(
-                str(output_path),
-                format="wav",
-                parameters=["-ar", "16000", "-ac", "1"]
-            )
+            if not data:
+                raise Exception("Audio file is empty")
             
-            print(f"[STT] Audio converted successfully")
-            print(f"[STT] Original size: {audio_path.stat().st_size} bytes")
-            print(f"[STT] Converted size: {output_path.stat().st_size} bytes")
+            fmt = sniff_format(data)
+            print(f"[STT] Received {len(data)} bytes ({fmt or 'unknown format'})")
             
-            return str(output_path)
+            # Matching 16 kHz mono PCM16 WAV passes straight through; anything
+            # else is decoded in memory, never via a second file on disk
+            with STAGE_SECONDS.time("audio_decode"):
+                pcm = convert_audio_format(data, TARGET_SAMPLE_RATE, TARGET_CHANNELS, TARGET_SAMPLE_WIDTH)
             
         except Exception as e:
-            print(f"[STT] Warning: Could not convert audio: {e}")
-            # If conversion fails, try to use original file
-            return audio_file_path
\ No newline at end of file
+            STT_FAILURES.inc("decode_error")
+            raise Exception(f"STT Error: {str(e)}")
+        
+        return self._transcribe_pcm_sync(pcm, TARGET_SAMPLE_RATE, TARGET_SAMPLE_WIDTH, session_id)
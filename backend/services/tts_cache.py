@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from services.persistence_writer import GroupCommitWriter
+
+
+class TTSCache:
+    """Size-bounded cache of synthesized audio clips
+
+    Clips live as files in ``cache_dir`` and are tracked in an LRU index that
+    is persisted to ``index.json``, so startup reads one file instead of
+    stat-ing the directory and lookups never touch the disk. When the
+    total size exceeds ``max_bytes`` the least recently used clips are
+    deleted; pinned clips (prewarmed fixed phrases) are never evicted.
+
+    The most recently used clips, up to ``hot_max_bytes``, are also kept in
+    memory so they can be served without a disk read.
+
+    Index changes are coalesced and written by a background thread at most
+    every ``TTS_INDEX_FLUSH_MS``, never on the synthesis path. A crash can
+    lose the last interval of changes; ``read`` already forgets clips whose
+    file is gone, and the janitor removes files the index lost track of.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, cache_dir: Path, max_bytes: int = None, hot_max_bytes: int = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        self.index_file = self.cache_dir / self.INDEX_NAME
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("TTS_CACHE_MAX_MB", 200)) * 1024 * 1024)
+        self.hot_max_bytes = hot_max_bytes if hot_max_bytes is not None else int(float(os.getenv("TTS_HOT_CACHE_MB", 16)) * 1024 * 1024)
+
+        self._lock = threading.RLock()
+        # filename -> {"size": int, "pinned": bool}, least recently used first
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.total_bytes = 0
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        self._hot_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index_writer = GroupCommitWriter(
+            self._write_index,
+            mode="async",
+            interval_ms=int(os.getenv("TTS_INDEX_FLUSH_MS", 1000))
+        )
+        self._load_index()
+
+    def get(self, name: str) -> Optional[Path]:
+        """Path of a cached clip (marking it recently used), or None"""
+        with self._lock:
+            if name not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(name)
+            self.hits += 1
+            return self.cache_dir / name
+
+    def contains(self, name: str) -> bool:
+        with self._lock:
+            return name in self.entries
+
+    def size(self, name: str) -> Optional[int]:
+        """Size in bytes of a cached clip, or None if it is not cached"""
+        with self._lock:
+            entry = self.entries.get(name)
+            return entry["size"] if entry is not None else None
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Clip bytes from the hot tier, falling back to disk"""
+        with self._lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+            data = self._hot.get(name)
+            if data is not None:
+                self._hot.move_to_end(name)
+                return data
+
+        try:
+            data = (self.cache_dir / name).read_bytes()
+        except FileNotFoundError:
+            self.discard(name)
+            return None
+        self._remember(name, data)
+        return data
+
+    def read_range(self, name: str, start: int, end: int) -> Optional[bytes]:
+        """Bytes ``start``..``end`` (inclusive) of a clip, reading only that span from disk"""
+        with self._lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+            data = self._hot.get(name)
+        if data is not None:
+            return data[start:end + 1]
+
+        try:
+            with open(self.cache_dir / name, "rb") as f:
+                f.seek(start)
+                return f.read(end - start + 1)
+        except FileNotFoundError:
+            self.discard(name)
+            return None
+
+    def put(self, name: str, data: bytes, pinned: bool = False) -> Path:
+        """Store a clip atomically, evicting older clips past the byte budget"""
+        path = self.cache_dir / name
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        with self._lock:
+            previous = self.entries.pop(name, None)
+            if previous is not None:
+                self.total_bytes -= previous["size"]
+                pinned = pinned or previous["pinned"]
+            self.entries[name] = {"size": len(data), "pinned": pinned}
+            self.total_bytes += len(data)
+            self._remember(name, data)
+            self._evict()
+        self._index_writer.submit(name)
+        return path
+
+    def pin(self, name: str) -> bool:
+        """Exempt a cached clip from eviction"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return False
+            if not entry["pinned"]:
+                entry["pinned"] = True
+                self._index_writer.submit(name)
+            return True
+
+    def discard(self, name: str):
+        """Forget a clip whose file has gone missing"""
+        self.discard_many([name])
+
+    def discard_many(self, names) -> int:
+        """Forget several clips (deleted by someone else) with one index write"""
+        forgotten = 0
+        with self._lock:
+            for name in names:
+                entry = self.entries.pop(name, None)
+                if entry is not None:
+                    self.total_bytes -= entry["size"]
+                    self._forget_hot(name)
+                    forgotten += 1
+        if forgotten:
+            self._index_writer.submit("")
+        return forgotten
+
+    def is_pinned(self, name: str) -> bool:
+        with self._lock:
+            entry = self.entries.get(name)
+            return entry is not None and entry["pinned"]
+
+    def lru_order(self) -> Dict[str, int]:
+        """Rank of every cached clip, 0 for the least recently used"""
+        with self._lock:
+            return {name: rank for rank, name in enumerate(self.entries)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hot_entries": len(self._hot),
+                "hot_bytes": self._hot_bytes,
+                "pinned": sum(1 for e in self.entries.values() if e["pinned"]),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def flush(self):
+        """Write pending index changes now"""
+        self._index_writer.flush()
+
+    def close(self):
+        """Persist the current LRU order and stop the index writer"""
+        # Lookups reorder the LRU without queueing a write; save that order too
+        self._index_writer.submit("")
+        self._index_writer.close()
+
+    def _remember(self, name: str, data: bytes):
+        with self._lock:
+            if len(data) > self.hot_max_bytes or name not in self.entries:
+                return
+            self._forget_hot(name)
+            self._hot[name] = data
+            self._hot_bytes += len(data)
+            while self._hot_bytes > self.hot_max_bytes:
+                _, evicted = self._hot.popitem(last=False)
+                self._hot_bytes -= len(evicted)
+
+    def _forget_hot(self, name: str):
+        data = self._hot.pop(name, None)
+        if data is not None:
+            self._hot_bytes -= len(data)
+
+    def _evict(self):
+        """Delete least recently used unpinned clips until under budget (lock held)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for name in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            entry = self.entries[name]
+            if entry["pinned"]:
+                continue
+            del self.entries[name]
+            self.total_bytes -= entry["size"]
+            self._forget_hot(name)
+            self.evictions += 1
+            try:
+                (self.cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+            for name, entry in entries:
+                self.entries[name] = {"size": int(entry["size"]), "pinned": bool(entry.get("pinned"))}
+            print(f"[TTS Cache] Loaded index: {len(self.entries)} clips")
+        except FileNotFoundError:
+            self._rebuild_index()
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[TTS Cache] ⚠️ Index unreadable ({e}), rebuilding")
+            self.entries.clear()
+            self._rebuild_index()
+
+        self.total_bytes = sum(entry["size"] for entry in self.entries.values())
+        with self._lock:
+            self._evict()
+
+    def _rebuild_index(self):
+        """One directory scan, oldest first, when no index exists yet"""
+        files = [
+            entry for entry in os.scandir(self.cache_dir)
+            if entry.is_file() and entry.name.endswith(".mp3")
+        ]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files:
+            self.entries[entry.name] = {"size": entry.stat().st_size, "pinned": False}
+        print(f"[TTS Cache] Indexed {len(self.entries)} existing clips")
+        # An empty directory gets its index with the first clip
+        if self.entries:
+            self._index_writer.submit("")
+
+    def _write_index(self, changes: List[str], fsync: bool):
+        """GroupCommitWriter batch: one index write covers every queued change"""
+        if not changes:
+            return
+        with self._lock:
+            payload = {"entries": [[name, dict(entry)] for name, entry in self.entries.items()]}
+        tmp_file = self.index_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.index_file)
@@ -1,33 +1,130 @@
 from gtts import gTTS
 from pathlib import Path
+from typing import Dict, List
+from services.executors import get_executor
+from services.tts_cache import TTSCache
+from utils.audio_helper import concat_mp3
+from utils.sentence_splitter import split_sentences
+import asyncio
 import hashlib
+import io
 import os
+import re
 
 class TTSService:
     """Text-to-Speech Service using gTTS (Google TTS - Free)"""
-    
+
     def __init__(self):
         # Get the directory where this file is located
         current_dir = Path(__file__).parent.parent
         self.OUTPUT_DIR = current_dir / "audio_outputs"
         self.OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
-    
-    async def text_to_speech(self, text: str) -> str:
-        """Convert text to speech"""
+        self.executor = get_executor("tts")
+        self.cache = TTSCache(self.OUTPUT_DIR)
+        # Concurrent requests for the same text share one synthesis
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def cache_name(text: str) -> str:
+        """Cache filename for a piece of text (also the public audio URL name)"""
+        text_hash = hashlib.md5(text.encode()).hexdigest()[:10]
+        return f"response_{text_hash}.mp3"
+
+    @staticmethod
+    def normalize_sentence(sentence: str) -> str:
+        """Canonical form used as a sentence clip's cache key"""
+        sentence = sentence.replace("\u2019", "'").replace("\u2018", "'")
+        sentence = sentence.replace("\u201c", '"').replace("\u201d", '"')
+        return re.sub(r"\s+", " ", sentence).strip()
+
+    async def text_to_speech(self, text: str, pinned: bool = False) -> str:
+        """
+        Convert text to speech
+        
+        Multi-sentence text is synthesized one sentence at a time, each
+        sentence cached on its own, and the clips stitched into one file,
+        so recurring sentences are never sent to gTTS twice.
+        """
+        name = self.cache_name(text)
+        cached = self.cache.get(name)
+        if cached is not None:
+            if pinned:
+                self.cache.pin(name)
+            return str(cached)
+        
+        sentences = [self.normalize_sentence(s) for s in split_sentences(text)]
+        sentences = [s for s in sentences if s]
+        if len(sentences) <= 1:
+            return await self._clip(sentences[0] if sentences else text, pinned)
+        
+        # Only sentences never seen before reach gTTS
+        paths = await asyncio.gather(*[self._clip(sentence) for sentence in sentences])
+        
         try:
-            # Create unique filename based on text hash
-            text_hash = hashlib.md5(text.encode()).hexdigest()[:10]
-            output_path = self.OUTPUT_DIR / f"response_{text_hash}.mp3"
-            
-            # Check if already exists (cache)
-            if output_path.exists():
-                return str(output_path)
-            
-            # Generate speech
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(str(output_path))
-            
-            return str(output_path)
+            clips = [self.cache.read(Path(path).name) for path in paths]
+            if any(clip is None for clip in clips):
+                # A clip was evicted between synthesis and stitching; rare, so just retry once
+                paths = await asyncio.gather(*[self._clip(sentence) for sentence in sentences])
+                clips = [Path(path).read_bytes() for path in paths]
             
+            print(f"[TTS] Stitched {len(sentences)} sentence clips")
+            return str(self.cache.put(name, concat_mp3(clips), pinned=pinned))
         except Exception as e:
-            raise Exception(f"TTS Error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"TTS Error: {str(e)}")
+
+    async def _clip(self, text: str, pinned: bool = False) -> str:
+        """Cached (or freshly synthesized) clip for one piece of text"""
+        try:
+            name = self.cache_name(text)
+
+            # Index lookup only; no filesystem access on a hit
+            cached = self.cache.get(name)
+            if cached is not None:
+                if pinned:
+                    self.cache.pin(name)
+                return str(cached)
+
+            pending = self._inflight.get(name)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[name] = future
+            try:
+                # Generate speech off the event loop
+                audio = await self.executor.run(self._synthesize, text)
+                path = str(self.cache.put(name, audio, pinned=pinned))
+                future.set_result(path)
+                return path
+            except BaseException as e:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure is not logged as a warning
+                future.exception()
+                raise
+            finally:
+                del self._inflight[name]
+
+        except Exception as e:
+            raise Exception(f"TTS Error: {str(e)}")
+
+    async def prewarm(self, phrases: List[str]):
+        """Synthesize and pin fixed phrases so they are always served from cache"""
+        extra = [p.strip() for p in os.getenv("TTS_PREWARM_PHRASES", "").split("|") if p.strip()]
+        for text in list(phrases) + extra:
+            try:
+                path = await self.text_to_speech(text, pinned=True)
+                # Load into the hot tier as well
+                self.cache.read(Path(path).name)
+                print(f"[TTS] ✓ Prewarmed: {text[:50]}")
+            except Exception as e:
+                print(f"[TTS] ⚠️ Could not prewarm '{text[:50]}': {e}")
+
+    def close(self):
+        self.cache.close()
+
+    def _synthesize(self, text: str) -> bytes:
+        """Blocking gTTS request, returning the mp3 bytes"""
+        buffer = io.BytesIO()
+        tts = gTTS(text=text, lang='en', slow=False)
+        tts.write_to_fp(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,143 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import numpy as np
+
+
+class NoSpeechError(Exception):
+    """Raised when a clip contains no speech worth sending to recognition"""
+
+
+class VadResult(NamedTuple):
+    pcm: bytes
+    speech_ms: int
+    trimmed_ms: int
+    noise_floor: float
+
+
+class VoiceActivityDetector:
+    """Energy / zero-crossing voice activity detection for 16-bit mono PCM
+
+    Each frame's RMS energy and zero-crossing rate are computed in one
+    vectorized pass. A frame is speech if it is clearly louder than the noise
+    floor, or moderately louder with a fricative-like crossing rate (so "s"
+    and "f" sounds at the edges of words are not clipped). Leading and
+    trailing silence is trimmed, keeping ``padding_ms`` around the speech.
+
+    The noise floor is calibrated per session from quiet frames and cached,
+    so later turns start from the previous estimate instead of spending the
+    start of every clip re-measuring the room.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = None,
+        padding_ms: int = None,
+        min_speech_ms: int = None,
+        min_threshold: float = None,
+        max_noise_floor: float = None,
+        max_sessions: int = 1000
+    ):
+        self.frame_ms = frame_ms or int(os.getenv("VAD_FRAME_MS", 20))
+        self.padding_ms = padding_ms if padding_ms is not None else int(os.getenv("VAD_PADDING_MS", 200))
+        self.min_speech_ms = min_speech_ms if min_speech_ms is not None else int(os.getenv("VAD_MIN_SPEECH_MS", 120))
+        self.min_threshold = min_threshold if min_threshold is not None else float(os.getenv("VAD_MIN_THRESHOLD", 300))
+        # A clip that is speech end to end has no quiet frames to measure;
+        # never trust a room estimate louder than this
+        self.max_noise_floor = max_noise_floor if max_noise_floor is not None else float(os.getenv("VAD_MAX_NOISE_FLOOR", 300))
+        self.speech_ratio = 3.0
+        self.fricative_ratio = 1.5
+        self.fricative_zcr = 0.25
+
+        self.max_sessions = max_sessions
+        self._noise_floors: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def noise_floor(self, session_id: Optional[str]) -> Optional[float]:
+        """Cached calibration for a session, if any"""
+        if session_id is None:
+            return None
+        with self._lock:
+            floor = self._noise_floors.get(session_id)
+            if floor is not None:
+                self._noise_floors.move_to_end(session_id)
+            return floor
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._noise_floors.pop(session_id, None)
+
+    def trim(self, pcm: bytes, sample_rate: int = 16000, session_id: str = None) -> VadResult:
+        """
+        Trim leading/trailing silence from a clip
+
+        Args:
+            pcm: 16-bit mono little-endian PCM
+            sample_rate: Sample rate of ``pcm``
+            session_id: Session whose noise floor calibration to use and update
+
+        Returns:
+            VadResult with the trimmed audio
+
+        Raises:
+            NoSpeechError: If the clip holds less than ``min_speech_ms`` of speech
+        """
+        frame_len = sample_rate * self.frame_ms // 1000
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2")
+        frame_count = len(samples) // frame_len
+        if frame_count == 0:
+            raise NoSpeechError("Audio clip is too short")
+
+        frames = samples[:frame_count * frame_len].reshape(frame_count, frame_len).astype(np.float32)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        cached = self.noise_floor(session_id)
+        # The quietest tenth of the clip approximates the room; a cached
+        # calibration wins unless this clip is quieter still
+        measured = min(float(np.percentile(energy, 10)), self.max_noise_floor)
+        floor = measured if cached is None else min(cached, measured)
+
+        threshold = max(self.min_threshold, floor * self.speech_ratio)
+        speech = (energy >= threshold) | (
+            (energy >= max(self.min_threshold / 2, floor * self.fricative_ratio)) & (zcr >= self.fricative_zcr)
+        )
+
+        speech_frames = int(np.count_nonzero(speech))
+        if speech_frames * self.frame_ms < self.min_speech_ms:
+            self._update_floor(session_id, energy[~speech], cached)
+            raise NoSpeechError("No speech detected in audio")
+
+        indices = np.flatnonzero(speech)
+        pad = self.padding_ms // self.frame_ms
+        first = max(0, indices[0] - pad)
+        last = min(frame_count, indices[-1] + 1 + pad)
+
+        floor = self._update_floor(session_id, energy[~speech], cached)
+        start_byte = first * frame_len * 2
+        end_byte = len(samples) * 2 if last == frame_count else last * frame_len * 2
+        trimmed = pcm[start_byte:end_byte]
+
+        return VadResult(
+            pcm=trimmed,
+            speech_ms=speech_frames * self.frame_ms,
+            trimmed_ms=(len(pcm) - len(trimmed)) * 1000 // (2 * sample_rate),
+            noise_floor=floor
+        )
+
+    def _update_floor(self, session_id: Optional[str], quiet_energy: np.ndarray, cached: Optional[float]) -> float:
+        """Blend this clip's quiet frames into the session's cached noise floor"""
+        if len(quiet_energy) == 0:
+            return cached or 0.0
+
+        measured = min(float(np.median(quiet_energy)), self.max_noise_floor)
+        floor = measured if cached is None else 0.7 * cached + 0.3 * measured
+        if session_id is not None:
+            with self._lock:
+                self._noise_floors[session_id] = floor
+                self._noise_floors.move_to_end(session_id)
+                while len(self._noise_floors) > self.max_sessions:
+                    self._noise_floors.popitem(last=False)
+        return floor
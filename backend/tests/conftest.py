@@ -53,4 +53,80 @@ def cleanup_test_files():
     ]
     for pattern in test_files:
         if pattern.exists():
-            pattern.unlink()
\ No newline at end of file
+            pattern.unlink()
+
+class LocalSMTPServer:
+    """Minimal in-process SMTP stand-in (plain text, no TLS/auth)
+
+    Accepted messages are collected in ``messages`` and accepted sockets are
+    counted in ``connections``. Set ``fail_next`` to drop
+    that many connections (a transient outage) or ``rcpt_code`` to reject
+    recipients with a fixed reply code.
+    """
+
+    def __init__(self):
+        import socketserver
+        import threading
+
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+        self.rcpt_code = 250
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.connections += 1
+                if server.fail_next > 0:
+                    server.fail_next -= 1
+                    return
+                self.wfile.write(b"220 localhost ready\r\n")
+                data_lines = None
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    if data_lines is not None:
+                        if line.rstrip(b"\r\n") == b".":
+                            server.messages.append(b"".join(data_lines).decode("utf-8", "replace"))
+                            data_lines = None
+                            self.wfile.write(b"250 queued\r\n")
+                        else:
+                            data_lines.append(line)
+                        continue
+
+                    command = line[:4].upper()
+                    if command in (b"EHLO", b"HELO"):
+                        self.wfile.write(b"250 localhost\r\n")
+                    elif command == b"RCPT":
+                        self.wfile.write(f"{server.rcpt_code} recipient\r\n".encode())
+                    elif command == b"DATA":
+                        data_lines = []
+                        self.wfile.write(b"354 end with .\r\n")
+                    elif command == b"QUIT":
+                        self.wfile.write(b"221 bye\r\n")
+                        return
+                    else:
+                        self.wfile.write(b"250 ok\r\n")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    """Local SMTP stand-in with EmailService pointed at it"""
+    server = LocalSMTPServer()
+    monkeypatch.setenv("SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(server.port))
+    monkeypatch.setenv("SMTP_EMAIL", "clinic@example.com")
+    monkeypatch.setenv("SMTP_PASSWORD", "")
+    monkeypatch.setenv("SMTP_STARTTLS", "false")
+    yield server
+    server.close()
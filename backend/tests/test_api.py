@@ -1,5 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
+from main import app
+from services.memory_service import ConversationMemory, get_memory
 
 class TestAPIEndpoints:
     def test_root_endpoint(self, client):
@@ -23,4 +25,141 @@ class TestAPIEndpoints:
     def test_appointments_list(self, client):
         response = client.get("/api/appointments/list")
         assert response.status_code == 200
-        assert "appointments" in response.json()
\ No newline at end of file
+        assert "appointments" in response.json()
+    
+    def test_appointments_list_sees_new_bookings(self, client, tmp_path, sample_appointment):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        app.dependency_overrides[get_memory] = lambda: memory
+        try:
+            assert client.get("/api/appointments/list").json()["count"] == 0
+            memory.add_appointment("booked-session", sample_appointment)
+            
+            data = client.get("/api/appointments/list").json()
+            assert data["count"] == 1
+            assert data["appointments"][0]["session_id"] == "booked-session"
+        finally:
+            app.dependency_overrides.clear()
+
+class TestAudioEndpoint:
+    """Test audio serving: index lookups, caching headers and ranges"""
+    
+    @pytest.fixture
+    def audio_cache(self, tmp_path, monkeypatch):
+        from routes import conversation
+        from services.tts_cache import TTSCache
+        cache = TTSCache(tmp_path)
+        monkeypatch.setattr(conversation.tts_service, "cache", cache)
+        cache.put("response_abc123.mp3", bytes(range(100)))
+        return cache
+    
+    def test_serves_with_immutable_headers(self, client, audio_cache):
+        response = client.get("/api/conversation/audio/response_abc123.mp3")
+        assert response.status_code == 200
+        assert response.content == bytes(range(100))
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"]
+    
+    def test_conditional_request_returns_304(self, client, audio_cache):
+        etag = client.get("/api/conversation/audio/response_abc123.mp3").headers["etag"]
+        response = client.get(
+            "/api/conversation/audio/response_abc123.mp3",
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_range_requests(self, client, audio_cache):
+        url = "/api/conversation/audio/response_abc123.mp3"
+        
+        response = client.get(url, headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == bytes(range(10, 20))
+        assert response.headers["content-range"] == "bytes 10-19/100"
+        
+        assert client.get(url, headers={"Range": "bytes=90-"}).content == bytes(range(90, 100))
+        assert client.get(url, headers={"Range": "bytes=-5"}).content == bytes(range(95, 100))
+        
+        response = client.get(url, headers={"Range": "bytes=200-300"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+        
+        # last < first is malformed, so the header is ignored
+        response = client.get(url, headers={"Range": "bytes=5-3"})
+        assert response.status_code == 200
+        assert response.content == bytes(range(100))
+    
+    def test_range_reads_only_the_span(self, client, tmp_path, monkeypatch):
+        from routes import conversation
+        from services.tts_cache import TTSCache
+        cache = TTSCache(tmp_path, hot_max_bytes=0)
+        cache.put("response_big.mp3", bytes(range(256)) * 40)
+        monkeypatch.setattr(conversation.tts_service, "cache", cache)
+        # A whole-file read would fail the request
+        monkeypatch.setattr(cache, "read", lambda name: pytest.fail("range request read the whole clip"))
+        
+        response = client.get("/api/conversation/audio/response_big.mp3", headers={"Range": "bytes=5000-5009"})
+        assert response.status_code == 206
+        assert response.content == bytes(range(136, 146))
+        assert response.headers["content-range"] == "bytes 5000-5009/10240"
+    
+    def test_unknown_file_is_404_without_disk_scan(self, client, audio_cache, tmp_path):
+        # A file on disk but not in the index is not served
+        (tmp_path / "stray.mp3").write_bytes(b"x")
+        assert client.get("/api/conversation/audio/stray.mp3").status_code == 404
+        assert client.get("/api/conversation/audio/..%2Fmain.py").status_code == 404
+
+
+class TestInlineAudio:
+    """Test single round-trip greeting/turn responses"""
+    
+    @pytest.fixture
+    def greeting_setup(self, tmp_path, monkeypatch):
+        from routes import conversation
+        from services.tts_cache import TTSCache
+        cache = TTSCache(tmp_path / "audio")
+        cache.put(conversation.tts_service.cache_name(conversation.GREETING_TEXT), b"ID3-greeting-audio", pinned=True)
+        monkeypatch.setattr(conversation.tts_service, "cache", cache)
+        
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        app.dependency_overrides[get_memory] = lambda: memory
+        yield
+        app.dependency_overrides.clear()
+    
+    def test_greeting_plain_json_by_default(self, client, greeting_setup):
+        response = client.get("/api/conversation/greeting")
+        assert response.headers["content-type"].startswith("application/json")
+        assert response.json()["audio_url"].startswith("/api/conversation/audio/")
+    
+    def test_greeting_binary_frame(self, client, greeting_setup):
+        import json
+        import struct
+        response = client.get(
+            "/api/conversation/greeting",
+            headers={"Accept": "application/x-voice-turn"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-voice-turn"
+        
+        body = response.content
+        header_length = struct.unpack(">I", body[:4])[0]
+        header = json.loads(body[4:4 + header_length])
+        assert header["text"].startswith("Hello!")
+        assert header["audio_media_type"] == "audio/mpeg"
+        assert body[4 + header_length:] == b"ID3-greeting-audio"
+        assert header["audio_length"] == len(b"ID3-greeting-audio")
+    
+    def test_greeting_multipart(self, client, greeting_setup):
+        import email
+        response = client.get("/api/conversation/greeting?inline=multipart")
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/mixed; boundary=")
+        
+        message = email.message_from_bytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + response.content
+        )
+        json_part, audio_part = message.get_payload()
+        assert json_part.get_content_type() == "application/json"
+        assert audio_part.get_content_type() == "audio/mpeg"
+        assert audio_part.get_payload(decode=True) == b"ID3-greeting-audio"
@@ -0,0 +1,164 @@
+import io
+import struct
+import wave
+import pytest
+from services.stt_service import STTService
+from utils import audio_helper
+from utils.audio_helper import sniff_format, parse_wav, convert_audio_format, validate_audio_file
+
+
+def make_wav(pcm: bytes, sample_rate=16000, channels=1, sample_width=2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def tone(frames: int, channels=1) -> bytes:
+    return b"".join(struct.pack("<h", ((i * 37) % 2000 - 1000) * 8) * channels for i in range(frames))
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch):
+    """Fail the test if anything tries to spawn ffmpeg"""
+    def forbidden(*args, **kwargs):
+        raise AssertionError("ffmpeg should not be spawned")
+    monkeypatch.setattr(audio_helper.subprocess, "run", forbidden)
+
+
+class TestFormatSniffing:
+    """Test container detection from header bytes"""
+
+    def test_sniff_formats(self):
+        assert sniff_format(make_wav(tone(10))) == "wav"
+        assert sniff_format(b"\x1a\x45\xdf\xa3" + b"\x00" * 20) == "webm"
+        assert sniff_format(b"OggS" + b"\x00" * 20) == "ogg"
+        assert sniff_format(b"ID3\x04" + b"\x00" * 20) == "mp3"
+        assert sniff_format(b"\x00\x00\x00\x18ftypmp42") == "mp4"
+        assert sniff_format(b"hello world") is None
+
+    def test_validate_audio_file(self):
+        assert validate_audio_file(make_wav(tone(100)))
+        assert not validate_audio_file(b"not audio at all, just some text bytes here....")
+
+    def test_parse_wav_skips_list_chunk(self):
+        """LIST/INFO chunks before the audio (as browsers write) are skipped"""
+        pcm = tone(50)
+        fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+        info = b"INFOISFT\x05\x00\x00\x00test\x00\x00"
+        body = (b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+                + b"LIST" + struct.pack("<I", len(info)) + info
+                + b"data" + struct.pack("<I", len(pcm)) + pcm)
+        data = b"RIFF" + struct.pack("<I", len(body)) + body
+
+        wav = parse_wav(data)
+        assert (wav.sample_rate, wav.channels, wav.sample_width) == (16000, 1, 2)
+        assert wav.pcm == pcm
+
+    def test_parse_wav_streaming_size(self):
+        """A data chunk size of 0 (unknown length) reads to the end of the buffer"""
+        pcm = tone(20)
+        data = bytearray(make_wav(pcm))
+        data[40:44] = struct.pack("<I", 0)
+        assert parse_wav(bytes(data)).pcm == pcm
+
+
+class TestConversion:
+    """Test in-memory decoding to recognizer PCM"""
+
+    def test_matching_wav_passes_through(self, no_ffmpeg):
+        pcm = tone(1600)
+        assert convert_audio_format(make_wav(pcm)) == pcm
+
+    def test_stereo_48k_wav_converted_in_process(self, no_ffmpeg):
+        pcm = convert_audio_format(make_wav(tone(4800, channels=2), sample_rate=48000, channels=2))
+        # 0.1 s at 16 kHz mono 16-bit
+        assert abs(len(pcm) - 3200) <= 4
+
+    def test_8bit_wav_converted(self, no_ffmpeg):
+        pcm = convert_audio_format(make_wav(bytes([128] * 1600), sample_width=1))
+        assert len(pcm) == 3200
+        assert set(pcm) == {0}
+
+    def test_compressed_input_uses_ffmpeg_pipe(self, monkeypatch):
+        calls = []
+
+        class Result:
+            returncode = 0
+            stdout = b"\x00\x00" * 10
+            stderr = b""
+
+        def fake_run(command, input=None, **kwargs):
+            calls.append((command, input))
+            return Result()
+
+        monkeypatch.setattr(audio_helper.subprocess, "run", fake_run)
+        data = b"\x1a\x45\xdf\xa3" + b"\x00" * 64
+
+        assert convert_audio_format(data) == b"\x00\x00" * 10
+        command, piped = calls[0]
+        assert "pipe:0" in command and "pipe:1" in command
+        assert piped == data
+
+
+class TestInMemoryTranscription:
+    """Test STT upload path without temp files"""
+
+    def test_transcribe_bytes(self, monkeypatch, tmp_path, no_ffmpeg):
+        import asyncio
+        service = STTService(backend="google")
+        seen = {}
+
+        def fake_recognize(audio_data):
+            seen["rate"] = audio_data.sample_rate
+            seen["width"] = audio_data.sample_width
+            seen["bytes"] = len(audio_data.frame_data)
+            return "book a cleaning"
+
+        monkeypatch.setattr(service.backend.recognizer, "recognize_google", fake_recognize)
+        monkeypatch.chdir(tmp_path)
+
+        text = asyncio.run(service.transcribe_bytes(make_wav(tone(8000))))
+
+        assert text == "book a cleaning"
+        assert seen == {"rate": 16000, "width": 2, "bytes": 16000}
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestNumpyResampler:
+    """Test the vectorized polyphase resampler and sample conversions"""
+
+    @pytest.mark.parametrize("from_rate", [8000, 22050, 44100, 48000])
+    def test_sine_survives_resampling(self, from_rate):
+        import numpy as np
+        t = np.arange(from_rate) / from_rate
+        samples = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+        out = audio_helper.resample(samples, from_rate, 16000)
+
+        assert len(out) == 16000
+        expected = 0.5 * np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+        assert np.abs(out[200:-200] - expected[200:-200]).max() < 1e-3
+
+    def test_content_above_nyquist_is_removed(self):
+        """Downsampling 48k -> 16k must not alias a 9 kHz tone into the band"""
+        import numpy as np
+        samples = (0.5 * np.sin(2 * np.pi * 9000 * np.arange(48000) / 48000)).astype(np.float32)
+
+        out = audio_helper.resample(samples, 48000, 16000)
+
+        assert np.sqrt(np.mean(out[200:-200] ** 2)) < 1e-3
+
+    def test_24bit_round_trip(self):
+        pcm16 = tone(100)
+        # Widen each 16-bit sample to 24-bit by prepending a zero low byte
+        pcm24 = b"".join(b"\x00" + pcm16[i:i + 2] for i in range(0, len(pcm16), 2))
+
+        assert audio_helper.convert_pcm(pcm24, 16000, 1, 3) == pcm16
+
+    def test_downmix_averages_channels(self):
+        left_right = struct.pack("<hh", 1000, 3000) * 10
+        assert audio_helper.convert_pcm(left_right, 16000, 2, 2) == struct.pack("<h", 2000) * 10
@@ -0,0 +1,48 @@
+from services.booking_slots import BookingSlots, COLLECTING, READY, BOOKED
+from services.memory_service import ConversationMemory
+from utils.date_parser import parse_date
+
+
+class TestBookingSlots:
+    """Test incremental slot filling"""
+
+    def test_slots_fill_across_turns(self):
+        slots = BookingSlots()
+        assert slots.update("Hi, my name is John Doe") == {"name": "John Doe"}
+        slots.update("I'd like a teeth cleaning next Tuesday at 10 am")
+        assert slots.values["service"] == "Teeth Cleaning"
+        assert slots.values["date"] == parse_date("tuesday")
+        assert slots.values["time"] == "10:00"
+        assert slots.missing == ["email", "dentist"]
+        assert slots.state == COLLECTING
+
+        slots.update("With Dr. Chen please, my email is john@example.com")
+        assert slots.missing == []
+        assert slots.state == READY
+
+    def test_invalid_values_are_not_kept(self):
+        slots = BookingSlots()
+        assert slots.update("Sunday at 8 pm works") == {}
+        assert slots.update("Good morning") == {}
+        assert slots.update("email me at john@invalid") == {}
+
+    def test_describe_lists_known_and_missing(self):
+        assert BookingSlots().describe() is None
+        slots = BookingSlots({"name": "John", "service": "Root Canal"})
+        assert slots.describe() == "name: John; service: Root Canal. Still needed: email, date, time, dentist."
+
+    def test_fill_completes_model_booking(self):
+        slots = BookingSlots({"email": "john@example.com", "name": "John"})
+        filled = slots.fill({"name": "John Doe", "service": "Root Canal"})
+        assert filled == {"name": "John Doe", "service": "Root Canal", "email": "john@example.com"}
+
+    def test_state_round_trips_through_metadata(self, tmp_path):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        slots = BookingSlots()
+        slots.update("This is Jane Roe")
+        memory.update_metadata("s1", slots.to_metadata())
+
+        restored = BookingSlots.from_metadata(memory.get_metadata("s1"))
+        assert restored.values == {"name": "Jane Roe"}
+        assert BookingSlots.from_metadata(BookingSlots.completed().to_metadata()).state == BOOKED
+        memory.close()
@@ -0,0 +1,74 @@
+from services.context_window import ContextWindow, ContextWindows, extract_facts
+from services.memory_service import ConversationMemory
+from services.sqlite_memory import SQLiteConversationMemory
+
+
+def conversation(n: int):
+    messages = [{"role": "user", "content": "Hi, my name is John Doe and my email is john@example.com"}]
+    for i in range(1, n):
+        messages.append({"role": "assistant" if i % 2 else "user", "content": f"message {i}"})
+    return messages
+
+
+class TestContextWindow:
+    """Test the rolling context window and running summary"""
+
+    def test_extract_facts(self):
+        facts = extract_facts("Hi, I'm Priya Patel. I'd like a cleaning with Dr. Chen, email priya@example.org")
+        assert facts == {
+            "name": "Priya Patel",
+            "email": "priya@example.org",
+            "service": "Teeth Cleaning",
+            "dentist": "Dr. Emily Chen",
+        }
+        assert "name" not in extract_facts("I'm looking for a checkup")
+
+    def test_ring_keeps_recent_and_summarizes_older(self):
+        window = ContextWindow(size=4)
+        for message in conversation(10):
+            window.append(message)
+
+        context = window.context()
+        assert [m["content"] for m in context.messages] == ["message 6", "message 7", "message 8", "message 9"]
+        assert context.summary == "6 earlier messages; patient said: name John Doe, email john@example.com"
+
+    def test_short_conversation_has_no_summary(self):
+        window = ContextWindow(size=6)
+        window.append({"role": "user", "content": "Hello"})
+        assert window.context() == ([{"role": "user", "content": "Hello"}], None)
+
+
+class TestContextWindows:
+    """Test windows kept current from store events"""
+
+    def test_windows_follow_new_messages_without_reloading(self, tmp_path):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        for message in conversation(3):
+            memory.add_message("s1", message["role"], message["content"])
+
+        memory.get_context("s1")
+        memory.add_message("s1", "user", "I'd like a root canal")
+        context = memory.get_context("s1")
+
+        assert context.messages[-1]["content"] == "I'd like a root canal"
+        assert memory.contexts.rebuilds == 1
+        memory.close()
+
+    def test_rebuilds_when_another_process_wrote(self, tmp_path):
+        db_file = str(tmp_path / "conversations.db")
+        ours, theirs = SQLiteConversationMemory(db_file), SQLiteConversationMemory(db_file)
+        ours.add_message("s1", "user", "Hello")
+        assert len(ours.get_context("s1").messages) == 1
+
+        theirs.add_message("s1", "assistant", "Hi there")
+        context = ours.get_context("s1")
+
+        assert [m["content"] for m in context.messages] == ["Hello", "Hi there"]
+        assert ours.contexts.rebuilds == 2
+
+    def test_session_count_is_bounded(self):
+        windows = ContextWindows(lambda session_id: [], max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            windows.get(session_id)
+        windows.get("a")
+        assert windows.rebuilds == 4
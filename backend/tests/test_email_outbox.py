@@ -0,0 +1,115 @@
+import asyncio
+import time
+from services.email_service import EmailService
+from services.email_outbox import EmailOutbox
+
+
+def make_outbox(tmp_path, **kwargs):
+    kwargs.setdefault("base_delay", 0)
+    return EmailOutbox(EmailService(), outbox_dir=str(tmp_path / "outbox"), **kwargs)
+
+
+class TestEmailOutbox:
+    """Test durable confirmation email delivery"""
+
+    def test_enqueue_persists_before_delivery(self, tmp_path, sample_appointment):
+        """A queued job is on disk immediately and survives a restart"""
+        outbox = make_outbox(tmp_path)
+        job_id = outbox.enqueue(sample_appointment["email"], sample_appointment)
+
+        assert (outbox.pending_dir / f"{job_id}.json").exists()
+
+        reloaded = make_outbox(tmp_path)
+        assert job_id in reloaded.pending
+        assert reloaded.status()["pending"] == 1
+
+    def test_delivers_through_local_smtp(self, tmp_path, smtp_server, sample_appointment):
+        """Due jobs are sent and removed from the queue"""
+        outbox = make_outbox(tmp_path)
+        outbox.enqueue(sample_appointment["email"], sample_appointment)
+
+        asyncio.run(outbox.drain())
+
+        assert len(smtp_server.messages) == 1
+        assert "Appointment Confirmation" in smtp_server.messages[0]
+        assert outbox.status()["pending"] == 0
+        assert outbox.status()["sent"] == 1
+        assert list(outbox.pending_dir.glob("*.json")) == []
+
+    def test_transient_failure_retries_with_backoff(self, tmp_path, smtp_server, sample_appointment):
+        """A dropped connection is retried later, not lost"""
+        smtp_server.fail_next = 1
+        outbox = make_outbox(tmp_path, base_delay=30)
+        job_id = outbox.enqueue(sample_appointment["email"], sample_appointment)
+
+        asyncio.run(outbox.drain())
+
+        job = outbox.pending[job_id]
+        assert job["attempts"] == 1
+        assert job["next_attempt_at"] >= time.time() + 10
+        assert smtp_server.messages == []
+
+        # Not due yet, so draining again does nothing
+        asyncio.run(outbox.drain())
+        assert job["attempts"] == 1
+
+        job["next_attempt_at"] = 0
+        asyncio.run(outbox.drain())
+        assert len(smtp_server.messages) == 1
+        assert outbox.status()["pending"] == 0
+
+    def test_permanent_failure_is_dead_lettered(self, tmp_path, smtp_server, sample_appointment):
+        """A rejected recipient goes straight to the dead-letter list"""
+        smtp_server.rcpt_code = 550
+        outbox = make_outbox(tmp_path)
+        job_id = outbox.enqueue(sample_appointment["email"], sample_appointment)
+
+        asyncio.run(outbox.drain())
+
+        status = outbox.status()
+        assert status["pending"] == 0
+        assert status["dead"] == 1
+        assert status["dead_letters"][0]["id"] == job_id
+        assert (outbox.dead_dir / f"{job_id}.json").exists()
+
+    def test_exhausted_attempts_are_dead_lettered(self, tmp_path, smtp_server, sample_appointment):
+        """Transient failures stop after max_attempts"""
+        smtp_server.fail_next = 10
+        outbox = make_outbox(tmp_path, max_attempts=3)
+        outbox.enqueue(sample_appointment["email"], sample_appointment)
+
+        for _ in range(3):
+            asyncio.run(outbox.drain())
+
+        assert outbox.status()["dead"] == 1
+
+    def test_retry_dead_requeues(self, tmp_path, smtp_server, sample_appointment):
+        """A dead-lettered job can be sent again once the cause is fixed"""
+        smtp_server.rcpt_code = 550
+        outbox = make_outbox(tmp_path)
+        job_id = outbox.enqueue(sample_appointment["email"], sample_appointment)
+        asyncio.run(outbox.drain())
+
+        smtp_server.rcpt_code = 250
+        assert outbox.retry_dead(job_id)
+        asyncio.run(outbox.drain())
+
+        assert len(smtp_server.messages) == 1
+        assert outbox.status()["dead"] == 0
+
+    def test_worker_delivers_in_background(self, tmp_path, smtp_server, sample_appointment):
+        """The started worker picks up newly queued jobs on its own"""
+        async def scenario():
+            outbox = make_outbox(tmp_path)
+            await outbox.start()
+            outbox.enqueue(sample_appointment["email"], sample_appointment)
+            for _ in range(100):
+                if smtp_server.messages:
+                    break
+                await asyncio.sleep(0.02)
+            await outbox.stop()
+            return outbox
+
+        outbox = asyncio.run(scenario())
+        assert len(smtp_server.messages) == 1
+        assert outbox.status()["running"] is False
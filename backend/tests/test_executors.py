@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+import pytest
+from services.executors import StageExecutor, StageOverloadedError
+
+
+class TestStageExecutor:
+    def test_blocking_calls_overlap(self):
+        executor = StageExecutor("test", max_workers=4, max_queue=8)
+        
+        async def run_all():
+            start = time.perf_counter()
+            await asyncio.gather(*[executor.run(time.sleep, 0.2) for _ in range(4)])
+            return time.perf_counter() - start
+        
+        elapsed = asyncio.run(run_all())
+        assert elapsed < 0.6
+        assert executor.stats()["completed"] == 4
+        executor.shutdown()
+    
+    def test_rejects_when_queue_full(self):
+        executor = StageExecutor("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+        
+        async def run_all():
+            first = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            second = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+            
+            stats = executor.stats()
+            with pytest.raises(StageOverloadedError):
+                await executor.run(release.wait)
+            
+            release.set()
+            await asyncio.gather(first, second)
+            return stats
+        
+        stats = asyncio.run(run_all())
+        assert stats["active"] == 1
+        assert stats["queued"] == 1
+        assert executor.stats()["rejected"] == 1
+        executor.shutdown()
+    
+    def test_exceptions_propagate(self):
+        executor = StageExecutor("test", max_workers=1, max_queue=1)
+        
+        async def boom():
+            return await executor.run(lambda: 1 / 0)
+        
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(boom())
+        assert executor.stats()["failed"] == 1
+        executor.shutdown()
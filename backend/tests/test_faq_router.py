@@ -0,0 +1,59 @@
+import pytest
+from services.faq_router import FAQRouter
+
+
+@pytest.fixture
+def router():
+    return FAQRouter(enabled=True)
+
+
+class TestFAQRouter:
+    """Test the local FAQ classifier and answers"""
+
+    @pytest.mark.parametrize("message,intent", [
+        ("What are your opening hours?", "hours"),
+        ("Are you open on Sundays?", "hours"),
+        ("Where are you located?", "location"),
+        ("What services do you offer?", "services"),
+        ("Who are your dentists?", "dentists"),
+        ("Which dentist does teeth whitening?", "service:Teeth Whitening"),
+        ("What does Dr. Johnson do?", "dentist:Dr. Mark Johnson"),
+    ])
+    def test_faq_questions(self, router, message, intent):
+        assert router.classify(message) == intent
+
+    @pytest.mark.parametrize("message", [
+        "I want to book a cleaning",
+        "Can I see Dr. Chen tomorrow at 10 am?",
+        "My email is john@example.com",
+        "Who does dental implants?",
+        "Hello there",
+        "Where are you open on weekends?",
+    ])
+    def test_everything_else_goes_to_model(self, router, message):
+        assert router.classify(message) is None
+
+    def test_follow_up_depends_on_turn(self, router):
+        first = router.answer("Where are you located?", [{"role": "user", "content": "Where are you located?"}])
+        later = router.answer("Where are you located?", [
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello!"},
+            {"role": "user", "content": "Where are you located?"},
+        ])
+
+        assert first.endswith("Would you like to book an appointment?")
+        assert later.endswith("Is there anything else I can help you with?")
+
+    def test_stats_track_hit_rate_and_saved_time(self, router):
+        router.record_llm_latency(1.2)
+        router.answer("What are your hours?")
+        router.answer("I'd like a checkup")
+
+        stats = router.stats()
+        assert stats["turns"] == 2
+        assert stats["hit_rate"] == 0.5
+        assert stats["hits_by_intent"] == {"hours": 1}
+        assert stats["saved_ms"] == 1200
+
+    def test_disabled(self):
+        assert FAQRouter(enabled=False).answer("What are your hours?") is None
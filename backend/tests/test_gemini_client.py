@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+import pytest
+from google.api_core import exceptions as google_exceptions
+from services.executors import StageExecutor
+from services.gemini_client import GeminiClient, LLMDeadlineError, TokenBucket
+
+
+@pytest.fixture
+def executor():
+    executor = StageExecutor("llm-test", max_workers=4, max_queue=16)
+    yield executor
+    executor.shutdown()
+
+
+class TestTokenBucket:
+    """Test the request rate limiter"""
+
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        assert bucket.reserve(1.0) == 0
+        assert bucket.reserve(1.0) == 0
+        assert bucket.reserve(1.0) == pytest.approx(0.1, abs=0.02)
+        assert not bucket.try_take()
+
+    def test_refuses_waits_past_deadline(self):
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.reserve(0)
+        assert bucket.reserve(0.5) is None
+
+
+class TestGeminiClient:
+    """Test deadlines, retries and hedging around model calls"""
+
+    def test_transient_errors_retried(self, executor):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise google_exceptions.ServiceUnavailable("overloaded")
+            return "ok"
+
+        client = GeminiClient(executor, rate_per_minute=6000, deadline=5, max_retries=2, base_delay=0.01, hedge=False)
+        assert asyncio.run(client.generate(flaky)) == "ok"
+        assert client.stats()["retries"] == 2
+        assert client.stats()["success"] == 1
+
+    def test_sdk_timeouts_retried(self, executor):
+        calls = []
+
+        def timing_out():
+            calls.append(1)
+            if len(calls) < 2:
+                raise TimeoutError("read timed out")
+            return "ok"
+
+        client = GeminiClient(executor, rate_per_minute=6000, deadline=5, max_retries=2, base_delay=0.01, hedge=False)
+        assert asyncio.run(client.generate(timing_out)) == "ok"
+        assert client.stats()["retries"] == 1
+        assert client.stats()["timeout"] == 0
+
+    def test_permanent_errors_not_retried(self, executor):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise google_exceptions.InvalidArgument("bad prompt")
+
+        client = GeminiClient(executor, rate_per_minute=6000, deadline=5, base_delay=0.01, hedge=False)
+        with pytest.raises(google_exceptions.InvalidArgument):
+            asyncio.run(client.generate(broken))
+        assert len(calls) == 1
+        assert client.stats()["error"] == 1
+
+    def test_deadline_bounds_the_call(self, executor):
+        client = GeminiClient(executor, rate_per_minute=6000, deadline=0.1, hedge=False)
+        started = time.monotonic()
+        with pytest.raises(LLMDeadlineError):
+            asyncio.run(client.generate(time.sleep, 0.5))
+        assert time.monotonic() - started < 0.4
+        assert client.stats()["timeout"] == 1
+
+    def test_hedge_beats_slow_primary(self, executor):
+        client = GeminiClient(executor, rate_per_minute=6000, burst=10, deadline=5, hedge=True, hedge_min_samples=3)
+        for _ in range(3):
+            client.record("success", 0.02)
+
+        lock = threading.Lock()
+        calls = []
+
+        def first_call_stalls():
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            time.sleep(0.5 if first else 0.01)
+            return "first" if first else "hedge"
+
+        started = time.monotonic()
+        assert asyncio.run(client.generate(first_call_stalls)) == "hedge"
+        assert time.monotonic() - started < 0.3
+        assert client.stats()["hedges"] == 1
+        assert client.stats()["hedge_wins"] == 1
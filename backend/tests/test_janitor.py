@@ -0,0 +1,84 @@
+import asyncio
+import os
+import time
+from services.janitor import RetentionJanitor, RetentionPolicy
+from services.tts_cache import TTSCache
+
+
+def make_file(directory, name: str, size: int, age: float):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestRetentionJanitor:
+    """Test age and size retention of working directories"""
+
+    def test_expired_files_removed(self, tmp_path):
+        make_file(tmp_path, "old_recording.wav", 100, age=7200)
+        make_file(tmp_path, "new_recording.wav", 100, age=120)
+        make_file(tmp_path, ".gitkeep", 0, age=7200)
+        janitor = RetentionJanitor([RetentionPolicy("uploads", tmp_path, max_age=3600, max_bytes=0)])
+
+        metrics = janitor.sweep()["directories"]["uploads"]
+
+        assert sorted(os.listdir(tmp_path)) == [".gitkeep", "new_recording.wav"]
+        assert metrics["reclaimed_files"] == 1
+        assert metrics["reclaimed_bytes"] == 100
+        assert metrics["files"] == 1 and metrics["bytes"] == 100
+
+    def test_size_budget_removes_oldest_first(self, tmp_path):
+        for i, age in enumerate([500, 400, 300, 200]):
+            make_file(tmp_path, f"f{i}.wav", 100, age=age)
+        janitor = RetentionJanitor([RetentionPolicy("uploads", tmp_path, max_age=0, max_bytes=250)])
+
+        janitor.sweep()
+
+        assert sorted(os.listdir(tmp_path)) == ["f2.wav", "f3.wav"]
+
+    def test_files_in_progress_kept(self, tmp_path):
+        make_file(tmp_path, "writing.wav", 1000, age=1)
+        janitor = RetentionJanitor([RetentionPolicy("uploads", tmp_path, max_age=0, max_bytes=10)])
+
+        janitor.sweep()
+
+        assert (tmp_path / "writing.wav").exists()
+
+    def test_cooperates_with_tts_cache(self, tmp_path):
+        cache = TTSCache(tmp_path, max_bytes=10_000, hot_max_bytes=0)
+        cache.put("greeting.mp3", b"g" * 100, pinned=True)
+        cache.put("a.mp3", b"a" * 100)
+        cache.put("b.mp3", b"b" * 100)
+        cache.get("a.mp3")  # b is now least recently used
+        for name in ("greeting.mp3", "a.mp3", "b.mp3"):
+            os.utime(tmp_path / name, (time.time() - 600, time.time() - 600))
+        make_file(tmp_path, "orphan.mp3", 100, age=120)
+        cache.flush()  # index.json on disk so the sweep has to skip it
+
+        policy = RetentionPolicy("audio_outputs", tmp_path, max_age=0, max_bytes=250, cache=cache)
+        RetentionJanitor([policy]).sweep()
+
+        # The untracked file goes first, then the LRU clip; the pinned clip and index stay
+        assert sorted(os.listdir(tmp_path)) == ["a.mp3", "greeting.mp3", "index.json"]
+        assert not cache.contains("b.mp3")
+        assert cache.contains("a.mp3") and cache.contains("greeting.mp3")
+        assert cache.stats()["bytes"] == 200
+
+    def test_background_worker_sweeps_on_start(self, tmp_path):
+        make_file(tmp_path, "old.wav", 10, age=7200)
+        janitor = RetentionJanitor([RetentionPolicy("uploads", tmp_path, max_age=3600, max_bytes=0)], interval=60)
+
+        async def run():
+            await janitor.start()
+            for _ in range(100):
+                if janitor.sweeps:
+                    break
+                await asyncio.sleep(0.01)
+            await janitor.stop()
+
+        asyncio.run(run())
+
+        assert janitor.sweeps == 1
+        assert not (tmp_path / "old.wav").exists()
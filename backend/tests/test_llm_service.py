@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from services.llm_service import LLMService, FALLBACK_RESPONSE
+
+
+class FakeModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+    
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        if stream:
+            return [SimpleNamespace(text=chunk) for chunk in self.chunks]
+        return SimpleNamespace(text="".join(self.chunks))
+
+
+@pytest.fixture
+def llm_service():
+    return LLMService()
+
+
+def collect(llm_service, message="Hi"):
+    async def run():
+        return [event async for event in llm_service.stream_response(message, [])]
+    return asyncio.run(run())
+
+
+class TestStreamResponse:
+    def test_sentences_arrive_before_done(self, llm_service):
+        llm_service.model = FakeModel(["Sure thing. What", " day works? Mornings", " are open."])
+        events = collect(llm_service)
+        
+        assert [e["text"] for e in events if e["type"] == "sentence"] == [
+            "Sure thing.", "What day works?", "Mornings are open."
+        ]
+        assert events[-1]["type"] == "done"
+        assert events[-1]["intent"] == "conversation"
+    
+    def test_appointment_block_is_never_spoken(self, llm_service):
+        llm_service.model = FakeModel([
+            "Booked with Dr. Emily Chen! See you then.\n\nAPPOINT",
+            "MENT_READY\nname: John\nemail: john@email.com\nservice: Teeth Cleaning\n",
+            "date: 2030-01-02\ntime: 10:00\ndentist: Dr. Emily Chen\nEND_APPOINTMENT"
+        ])
+        events = collect(llm_service)
+        
+        sentences = [e["text"] for e in events if e["type"] == "sentence"]
+        assert sentences == ["Booked with Dr. Emily Chen!", "See you then."]
+        assert events[-1]["intent"] == "book_appointment"
+        assert events[-1]["metadata"]["dentist"] == "Dr. Emily Chen"
+        assert events[-1]["response"] == "Booked with Dr. Emily Chen! See you then."
+    
+    def test_failure_falls_back(self, llm_service):
+        class BrokenModel:
+            def generate_content(self, *args, **kwargs):
+                raise RuntimeError("quota")
+        
+        llm_service.model = BrokenModel()
+        events = collect(llm_service)
+        assert events[-1] == {"type": "done", "response": FALLBACK_RESPONSE, "intent": "error", "metadata": None}
+
+    
+    def test_overloaded_stage_falls_back(self, llm_service):
+        from services.executors import StageExecutor
+        llm_service.model = FakeModel(["Sure thing."])
+        # No queue slots: every job is rejected before it reaches a worker
+        llm_service.executor = StageExecutor("llm-test", 1, 0)
+        
+        async def run():
+            stream = llm_service.stream_response("Hi", [])
+            return await asyncio.wait_for(_drain(stream), timeout=5)
+        
+        events = asyncio.run(run())
+        assert events[-1] == {"type": "done", "response": FALLBACK_RESPONSE, "intent": "error", "metadata": None}
+        assert llm_service.executor.stats()["rejected"] == 1
+
+    
+    def test_stalled_stream_hits_deadline(self, llm_service):
+        release = threading.Event()
+        
+        class StalledModel:
+            def generate_content(self, *args, **kwargs):
+                release.wait(5)
+                return [SimpleNamespace(text="Too late.")]
+        
+        llm_service.model = StalledModel()
+        llm_service.client.deadline = 0.1
+        started = time.monotonic()
+        try:
+            events = collect(llm_service)
+        finally:
+            release.set()
+        
+        assert time.monotonic() - started < 1
+        assert events[-1] == {"type": "done", "response": FALLBACK_RESPONSE, "intent": "error", "metadata": None}
+        assert llm_service.client.stats()["timeout"] == 1
+
+
+async def _drain(stream):
+    return [event async for event in stream]
+
+
+class TestFAQFastPath:
+    def test_faq_turn_skips_gemini(self, llm_service):
+        class UnusedModel:
+            def generate_content(self, *args, **kwargs):
+                raise AssertionError("Gemini should not be called")
+        
+        llm_service.model = UnusedModel()
+        result = asyncio.run(llm_service.get_response("What are your opening hours?", []))
+        
+        assert result["intent"] == "faq"
+        assert "Monday to Saturday" in result["response"]
+        assert llm_service.faq.stats()["hits"] == 1
+    
+    def test_faq_turn_streams_sentences(self, llm_service):
+        events = collect(llm_service, "Who does root canals?")
+        
+        sentences = [e["text"] for e in events if e["type"] == "sentence"]
+        assert sentences[0] == "Root Canal is handled by Dr. James Wilson."
+        assert events[-1]["intent"] == "faq"
+    
+    def test_booking_turn_goes_to_gemini(self, llm_service):
+        llm_service.model = FakeModel(["Sure, what day works for you?"])
+        result = asyncio.run(llm_service.get_response("I want to book a cleaning", []))
+        
+        assert result["intent"] == "conversation"
+        stats = llm_service.faq.stats()
+        assert stats["hits"] == 0 and stats["turns"] == 1
+        assert stats["llm_latency_ms"] is not None
+
+
+class TestResponseMemo:
+    def test_repeated_opener_served_from_memory(self, llm_service):
+        calls = []
+        
+        class CountingModel(FakeModel):
+            def generate_content(self, prompt, generation_config=None, stream=False):
+                calls.append(prompt)
+                return super().generate_content(prompt, generation_config, stream)
+        
+        llm_service.model = CountingModel(["Happy to help. What day works for you?"])
+        first = asyncio.run(llm_service.get_response("I want to book a cleaning", []))
+        second = asyncio.run(llm_service.get_response("I want to book a cleaning.", []))
+        events = collect(llm_service, "i want to book a cleaning")
+        
+        assert len(calls) == 1
+        assert first == second
+        assert [e["text"] for e in events if e["type"] == "sentence"] == ["Happy to help.", "What day works for you?"]
+    
+    def test_booking_turns_always_reach_gemini(self, llm_service):
+        calls = []
+        
+        class BookingModel:
+            def generate_content(self, prompt, generation_config=None, stream=False):
+                calls.append(prompt)
+                return SimpleNamespace(text=(
+                    "Booked!\nAPPOINTMENT_READY\nname: John\nemail: john@email.com\nservice: Teeth Cleaning\n"
+                    "date: 2030-01-02\ntime: 10:00\ndentist: Dr. Emily Chen\nEND_APPOINTMENT"
+                ))
+        
+        llm_service.model = BookingModel()
+        for _ in range(2):
+            assert asyncio.run(llm_service.get_response("Yes, that works", []))["intent"] == "book_appointment"
+        assert len(calls) == 2
+
+
+class TestPromptContext:
+    def test_summary_leads_bounded_prompt(self, llm_service):
+        history = [{"role": "user", "content": f"message {i}"} for i in range(20)]
+        prompt = llm_service._build_prompt("Thanks", history, "14 earlier messages; patient said: name John")
+        
+        assert prompt.startswith("Earlier in this call: 14 earlier messages; patient said: name John")
+        assert "message 13" not in prompt and "message 14" in prompt
+        assert prompt.endswith("Patient: Thanks\nSarah:")
+    
+    def test_prompt_carries_booking_slots(self, llm_service):
+        from services.booking_slots import BookingSlots
+        booking = BookingSlots({"name": "John", "service": "Root Canal"})
+        prompt = llm_service._build_prompt("Tomorrow please", [], None, booking)
+        
+        assert prompt.startswith("Booking so far: name: John; service: Root Canal. Still needed: email, date, time, dentist.")
+    
+    def test_incomplete_booking_completed_from_slots(self, llm_service):
+        from services.booking_slots import BookingSlots
+        booking = BookingSlots({"email": "john@email.com"})
+        result = llm_service._parse_response(
+            "Booked!\nAPPOINTMENT_READY\nname: John\nservice: Teeth Cleaning\n"
+            "date: 2030-01-02\ntime: 10:00\ndentist: Dr. Emily Chen\nEND_APPOINTMENT",
+            booking
+        )
+        
+        assert result["intent"] == "book_appointment"
+        assert result["metadata"]["email"] == "john@email.com"
+
+
+class TestDailyPromptState:
+    def test_prompt_and_model_roll_over_at_midnight(self, llm_service, monkeypatch):
+        from datetime import date, datetime as real_datetime
+        from services import llm_service as module
+        
+        class Tomorrow(real_datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return real_datetime.now(tz) + module.timedelta(days=1)
+        
+        today_state = llm_service.state
+        assert llm_service.state is today_state
+        
+        monkeypatch.setattr(module, "datetime", Tomorrow)
+        rolled = llm_service.state
+        
+        assert rolled is not today_state
+        assert rolled.day == today_state.day + module.timedelta(days=1)
+        assert rolled.day.strftime('%A, %B %d, %Y') in llm_service.SYSTEM_INSTRUCTION
+        assert rolled.model is not today_state.model
+        assert llm_service.state is rolled
+    
+    def test_injected_model_used_for_the_turn(self, llm_service):
+        llm_service.model = FakeModel(["Sure, what day works for you?"])
+        result = asyncio.run(llm_service.get_response("Hi there", []))
+        assert result["response"] == "Sure, what day works for you?"
@@ -1,6 +1,8 @@
 import pytest
-from services.memory_service import ConversationMemory
+from services.memory_service import ConversationMemory, get_memory
+from services import events
 import json
+import threading
 from pathlib import Path
 
 class TestMemoryService:
@@ -38,6 +40,7 @@ class TestMemoryService:
         memory1 = ConversationMemory(data_file="data/test_persistence.json")
         memory1.create_session(sample_session_id)
         memory1.add_message(sample_session_id, "user", "Test message")
+        memory1.close()
         
         # Load in new instance
         memory2 = ConversationMemory(data_file="data/test_persistence.json")
@@ -47,4 +50,150 @@ class TestMemoryService:
         assert history[0]["content"] == "Test message"
         
         # Cleanup
-        Path("data/test_persistence.json").unlink()
\ No newline at end of file
+        memory2.close()
+        Path("data/test_persistence.json").unlink(missing_ok=True)
+        Path("data/test_persistence.journal.jsonl").unlink(missing_ok=True)
+
+
+class TestJournalStorage:
+    def test_appends_instead_of_rewriting(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="sync")
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.add_message(sample_session_id, "assistant", "Hi there")
+        
+        assert not data_file.exists()
+        lines = (tmp_path / "conversations.journal.jsonl").read_text().splitlines()
+        assert [json.loads(line)["op"] for line in lines] == ["create_session", "add_message", "add_message"]
+    
+    def test_replay_drops_torn_tail(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="sync")
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.close()
+        
+        journal = tmp_path / "conversations.journal.jsonl"
+        with open(journal, "a") as f:
+            f.write('{"op": "add_message", "session_id": "')
+        
+        reloaded = ConversationMemory(data_file=str(data_file), durability="sync")
+        assert [m["content"] for m in reloaded.get_history(sample_session_id)] == ["Hello"]
+        assert journal.read_text().endswith("\n")
+    
+    def test_compaction_writes_snapshot(self, tmp_path, sample_session_id, sample_appointment):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), compact_every=3, durability="sync")
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.add_appointment(sample_session_id, sample_appointment)
+        
+        assert json.loads(data_file.read_text())[sample_session_id]["appointments"][0]["name"] == "John Doe"
+        assert (tmp_path / "conversations.journal.jsonl").read_text() == ""
+        
+        memory.add_message(sample_session_id, "assistant", "Booked")
+        reloaded = ConversationMemory(data_file=str(data_file), compact_every=3, durability="sync")
+        assert len(reloaded.get_history(sample_session_id)) == 2
+        assert len(reloaded.sessions[sample_session_id]["appointments"]) == 1
+    
+    def test_replay_is_idempotent_after_interrupted_compaction(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="sync")
+        memory.add_message(sample_session_id, "user", "Hello")
+        # Snapshot swapped in but journal never truncated
+        memory.store.write_snapshot(json.dumps(memory.sessions))
+        memory.close()
+        
+        reloaded = ConversationMemory(data_file=str(data_file), durability="sync")
+        assert len(reloaded.get_history(sample_session_id)) == 1
+
+
+class TestGroupCommit:
+    def test_group_mode_batches_until_flush(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="group")
+        memory.store.writer.interval = 60  # keep the background flush out of the way
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.add_message(sample_session_id, "assistant", "Hi")
+        
+        journal = tmp_path / "conversations.journal.jsonl"
+        assert not journal.exists()
+        
+        memory.flush()
+        assert len(journal.read_text().splitlines()) == 3
+        memory.close()
+    
+    def test_close_flushes_pending_writes(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="async")
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.close()
+        
+        reloaded = ConversationMemory(data_file=str(data_file), durability="sync")
+        assert len(reloaded.get_history(sample_session_id)) == 1
+    
+    def test_background_compaction_keeps_later_events(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), compact_every=5, durability="group")
+        for i in range(12):
+            memory.add_message(sample_session_id, "user", f"message {i}")
+        memory.close()
+        
+        reloaded = ConversationMemory(data_file=str(data_file), durability="sync")
+        contents = [m["content"] for m in reloaded.get_history(sample_session_id)]
+        assert contents == [f"message {i}" for i in range(12)]
+    
+    def test_compaction_serializes_outside_lock(self, tmp_path, sample_session_id):
+        data_file = tmp_path / "conversations.json"
+        memory = ConversationMemory(data_file=str(data_file), durability="group")
+        memory.store.writer.interval = 60  # compaction below is the only flush
+        memory.add_message(sample_session_id, "user", "message 0")
+        store = memory.store
+        original_write = store.write_snapshot
+        
+        def write_snapshot(payload):
+            # A turn arriving mid-compaction neither blocks nor gets lost
+            added = threading.Thread(target=memory.add_message, args=(sample_session_id, "user", "message 1"))
+            added.start()
+            added.join(timeout=1)
+            assert not added.is_alive()
+            original_write(payload)
+        
+        store.write_snapshot = write_snapshot
+        store.compact()
+        memory.close()
+        
+        assert [m["content"] for m in json.loads(data_file.read_text())[sample_session_id]["messages"]] == ["message 0"]
+        reloaded = ConversationMemory(data_file=str(data_file), durability="sync")
+        assert [m["content"] for m in reloaded.get_history(sample_session_id)] == ["message 0", "message 1"]
+    
+    def test_rejects_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            ConversationMemory(data_file=str(tmp_path / "conversations.json"), durability="eventually")
+
+
+class TestChangeEvents:
+    def test_mutations_publish_events(self, tmp_path, sample_session_id, sample_appointment):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        received = []
+        unsubscribe = memory.events.subscribe(received.append)
+        
+        memory.add_message(sample_session_id, "user", "Hello")
+        memory.add_appointment(sample_session_id, sample_appointment)
+        unsubscribe()
+        memory.add_message(sample_session_id, "assistant", "Bye")
+        
+        assert [e["type"] for e in received] == [
+            events.SESSION_CREATED,
+            events.MESSAGE_ADDED,
+            events.APPOINTMENT_BOOKED
+        ]
+        assert received[2]["appointment"]["name"] == "John Doe"
+    
+    def test_failing_subscriber_does_not_break_writes(self, tmp_path, sample_session_id):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        memory.events.subscribe(lambda event: 1 / 0)
+        
+        memory.add_message(sample_session_id, "user", "Hello")
+        assert len(memory.get_history(sample_session_id)) == 1
+    
+    def test_get_memory_is_shared(self):
+        assert get_memory() is get_memory()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import time
+from services.metrics import Counter, Gauge, Histogram, Registry, CONTENT_TYPE, STAGE_SECONDS
+
+
+class TestMetrics:
+    """Test the Prometheus text exposition of counters, gauges and histograms"""
+
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        counter = registry.register(Counter("turns_total", "Turns", ("intent",)))
+        gauge = registry.register(Gauge("in_flight", "Turns in flight"))
+
+        counter.inc("faq")
+        counter.inc("faq")
+        counter.inc("conversation", amount=3)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+        assert "# TYPE turns_total counter" in text
+        assert 'turns_total{intent="faq"} 2' in text
+        assert 'turns_total{intent="conversation"} 3' in text
+        assert "in_flight 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, "tts")
+        histogram.observe(0.5, "tts")
+        histogram.observe(2.0, "tts")
+
+        lines = histogram.render()
+        assert 'stage_seconds_bucket{stage="tts",le="0.1"} 1' in lines
+        assert 'stage_seconds_bucket{stage="tts",le="1.0"} 2' in lines
+        assert 'stage_seconds_bucket{stage="tts",le="+Inf"} 3' in lines
+        assert 'stage_seconds_count{stage="tts"} 3' in lines
+        assert 'stage_seconds_sum{stage="tts"} 2.55' in lines
+
+    def test_span_records_block_time(self):
+        histogram = Histogram("stage_seconds", "Stage time", ("stage",))
+
+        with histogram.time("llm"):
+            time.sleep(0.01)
+
+        state = histogram._values[("llm",)]
+        assert sum(state[:-1]) == 1
+        assert state[-1] >= 0.01
+
+    def test_label_values_escaped(self):
+        counter = Counter("errors_total", "Errors", ("reason",))
+        counter.inc('bad "quote"')
+
+        assert 'errors_total{reason="bad \\"quote\\""} 1' in counter.render()
+
+    def test_collectors_polled_at_scrape(self):
+        registry = Registry()
+        depth = {"stt": 0}
+        registry.add_collector(lambda: [
+            ("queue_depth", "gauge", "Queued jobs", [({"stage": s}, v) for s, v in depth.items()])
+        ])
+
+        depth["stt"] = 4
+
+        assert 'queue_depth{stage="stt"} 4' in registry.render()
+
+    def test_failing_collector_skipped(self):
+        registry = Registry()
+        registry.register(Counter("ok_total", "Still exported"))
+
+        def broken():
+            raise RuntimeError("boom")
+            yield
+
+        registry.add_collector(broken)
+
+        assert "ok_total 0" in registry.render()
+
+    def test_metrics_endpoint(self, client):
+        STAGE_SECONDS.observe(0.2, "tts")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert 'voice_stage_seconds_count{stage="tts"}' in response.text
+        assert "# TYPE executor_queued gauge" in response.text
+        assert 'cache_hits_total{cache="tts"}' in response.text
@@ -0,0 +1,45 @@
+import time
+from services.response_cache import ResponseCache, normalize_text
+
+
+def reply(text="Sure, what day works for you?", intent="conversation", metadata=None):
+    return {"response": text, "intent": intent, "metadata": metadata}
+
+
+class TestResponseCache:
+    """Test the memo of model replies"""
+
+    def test_key_ignores_case_punctuation_and_spacing(self):
+        assert normalize_text("I want to  book a Cleaning.") == "i want to book a cleaning"
+        assert ResponseCache.key("I want to book a cleaning!", []) == ResponseCache.key("i want to book a cleaning", [])
+        assert ResponseCache.key("Hi", []) != ResponseCache.key("Hi", [{"role": "user", "content": "Hello"}])
+        assert ResponseCache.key("Hi", [], namespace="2030-01-01") != ResponseCache.key("Hi", [], namespace="2030-01-02")
+
+    def test_hit_returns_a_copy(self):
+        cache = ResponseCache(max_entries=10, ttl=60)
+        cache.put("k", reply())
+
+        first = cache.get("k")
+        first["response"] = "changed"
+        assert cache.get("k")["response"] == "Sure, what day works for you?"
+        assert cache.stats()["hits"] == 2
+
+    def test_bookings_and_errors_never_cached(self):
+        cache = ResponseCache(max_entries=10, ttl=60)
+        assert not cache.put("a", reply(intent="book_appointment", metadata={"name": "John"}))
+        assert not cache.put("b", reply(intent="error"))
+        assert not cache.put("c", reply(), raw="Booked!\nAPPOINTMENT_READY\nname: John")
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["skipped"] == 3
+
+    def test_ttl_and_lru_bound(self):
+        cache = ResponseCache(max_entries=2, ttl=0.05)
+        cache.put("a", reply())
+        cache.put("b", reply())
+        cache.get("a")
+        cache.put("c", reply())
+
+        assert cache.get("b") is None
+        time.sleep(0.06)
+        assert cache.get("a") is None
+        assert cache.stats()["expired"] == 1
@@ -0,0 +1,21 @@
+from utils.sentence_splitter import split_sentences, SentenceBuffer
+
+class TestSentenceSplitter:
+    def test_split_sentences(self):
+        text = "Perfect, John! See you with Dr. Priya Sharma tomorrow. Looking forward to seeing you!"
+        assert split_sentences(text) == [
+            "Perfect, John!",
+            "See you with Dr. Priya Sharma tomorrow.",
+            "Looking forward to seeing you!"
+        ]
+    
+    def test_email_is_not_a_boundary(self):
+        assert split_sentences("Email sent to john@email.com shortly.") == ["Email sent to john@email.com shortly."]
+    
+    def test_buffer_releases_complete_sentences(self):
+        buffer = SentenceBuffer()
+        assert buffer.push("Hello the") == []
+        assert buffer.push("re. How are") == ["Hello there."]
+        assert buffer.push(" you? I am") == ["How are you?"]
+        assert buffer.flush() == "I am"
+        assert buffer.flush() is None
@@ -0,0 +1,99 @@
+import asyncio
+from email.mime.text import MIMEText
+from services.email_service import EmailService
+
+
+def make_message(to_email: str) -> MIMEText:
+    msg = MIMEText("Reminder: your appointment is tomorrow")
+    msg["Subject"] = "Reminder - SmileCare Dental"
+    msg["From"] = "clinic@example.com"
+    msg["To"] = to_email
+    return msg
+
+
+class TestSMTPConnectionPool:
+    """Test pooled SMTP sessions"""
+
+    def test_connection_reused_across_sends(self, smtp_server):
+        """Consecutive sends share one authenticated session"""
+        service = EmailService()
+        for i in range(3):
+            service.pool.send(make_message(f"patient{i}@example.com"))
+
+        assert len(smtp_server.messages) == 3
+        assert smtp_server.connections == 1
+        assert service.pool.stats()["reused"] == 2
+        service.close()
+
+    def test_idle_timeout_reconnects(self, smtp_server):
+        """Sessions idle past the timeout are replaced, not reused"""
+        service = EmailService()
+        service.pool.idle_timeout = 0
+        service.pool.send(make_message("a@example.com"))
+        service.pool.send(make_message("b@example.com"))
+
+        assert smtp_server.connections == 2
+        assert service.pool.stats()["discarded"] == 1
+        service.close()
+
+    def test_dead_connection_is_replaced(self, smtp_server):
+        """A session the server dropped is detected and the send retried"""
+        service = EmailService()
+        service.pool.send(make_message("a@example.com"))
+        service.pool._idle[0].server.close()
+
+        service.pool.send(make_message("b@example.com"))
+
+        assert len(smtp_server.messages) == 2
+        assert smtp_server.connections == 2
+        service.close()
+
+    def test_rejection_keeps_reused_connection(self, smtp_server):
+        """A 550 on a pooled session resets it instead of reconnecting"""
+        service = EmailService()
+        service.pool.send(make_message("a@example.com"))
+        smtp_server.rcpt_code = 550
+
+        results = service.pool.send_batch([make_message("bad1@example.com"), make_message("bad2@example.com")])
+
+        assert all(results)
+        assert smtp_server.connections == 1
+        assert service.pool.stats()["discarded"] == 0
+        smtp_server.rcpt_code = 250
+        service.pool.send(make_message("b@example.com"))
+        assert smtp_server.connections == 1
+        service.close()
+
+    def test_connection_retired_after_max_messages(self, smtp_server):
+        service = EmailService()
+        service.pool.max_messages = 2
+        service.pool.send_batch([make_message(f"p{i}@example.com") for i in range(5)])
+
+        assert len(smtp_server.messages) == 5
+        assert smtp_server.connections == 3
+        service.close()
+
+
+class TestSendMany:
+    """Test bulk sending"""
+
+    def test_send_many_preserves_order(self, smtp_server):
+        service = EmailService()
+        messages = [make_message(f"patient{i}@example.com") for i in range(7)]
+
+        results = asyncio.run(service.send_many(messages))
+
+        assert results == [True] * 7
+        assert len(smtp_server.messages) == 7
+        assert smtp_server.connections <= service.pool.max_size
+        service.close()
+
+    def test_send_many_reports_rejections(self, smtp_server):
+        """A rejected recipient fails only its own message"""
+        smtp_server.rcpt_code = 550
+        service = EmailService()
+
+        results = asyncio.run(service.send_many([make_message("bad@example.com")]))
+
+        assert results == [False]
+        service.close()
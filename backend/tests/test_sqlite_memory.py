@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+import pytest
+from services.sqlite_memory import SQLiteConversationMemory
+
+
+@pytest.fixture
+def sqlite_memory(tmp_path):
+    memory = SQLiteConversationMemory(db_file=str(tmp_path / "conversations.db"))
+    yield memory
+    memory.close()
+
+
+class TestSQLiteMemory:
+    def test_add_message(self, sqlite_memory, sample_session_id):
+        sqlite_memory.create_session(sample_session_id)
+        sqlite_memory.add_message(sample_session_id, "user", "Hello")
+        sqlite_memory.add_message(sample_session_id, "assistant", "Hi")
+        
+        history = sqlite_memory.get_history(sample_session_id)
+        assert history == [
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "Hi"}
+        ]
+    
+    def test_get_session_shape(self, sqlite_memory, sample_session_id, sample_appointment):
+        sqlite_memory.add_message(sample_session_id, "user", "Hello")
+        sqlite_memory.update_metadata(sample_session_id, {"name": "John"})
+        sqlite_memory.update_metadata(sample_session_id, {"email": "john@example.com"})
+        sqlite_memory.add_appointment(sample_session_id, sample_appointment)
+        
+        session = sqlite_memory.get_session(sample_session_id)
+        assert session["metadata"] == {"name": "John", "email": "john@example.com"}
+        assert session["messages"][0]["content"] == "Hello"
+        assert session["appointments"][0]["name"] == "John Doe"
+        assert "booked_at" in session["appointments"][0]
+        assert sqlite_memory.get_session("missing") is None
+    
+    def test_list_appointments_filters(self, sqlite_memory, sample_appointment):
+        sqlite_memory.add_appointment("a", dict(sample_appointment))
+        sqlite_memory.add_appointment("b", dict(sample_appointment, date="2024-12-26", dentist="Dr. James Wilson"))
+        
+        assert len(sqlite_memory.list_appointments()) == 2
+        by_date = sqlite_memory.list_appointments(date="2024-12-26")
+        assert [a["session_id"] for a in by_date] == ["b"]
+        by_dentist = sqlite_memory.list_appointments(dentist="Dr. Emily Chen")
+        assert [a["session_id"] for a in by_dentist] == ["a"]
+    
+    def test_shared_between_instances(self, tmp_path, sample_session_id):
+        db_file = str(tmp_path / "shared.db")
+        writer = SQLiteConversationMemory(db_file=db_file)
+        reader = SQLiteConversationMemory(db_file=db_file)
+        
+        writer.add_message(sample_session_id, "user", "Hello")
+        assert reader.get_history(sample_session_id) == [{"role": "user", "content": "Hello"}]
+        
+        writer.close()
+        reader.close()
+    
+    def test_close_releases_every_thread_connection(self, tmp_path, sample_session_id):
+        memory = SQLiteConversationMemory(db_file=str(tmp_path / "threads.db"))
+        opened = []
+        
+        def worker():
+            memory.add_message(sample_session_id, "user", "Hello")
+            opened.append(memory._conn)
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        main_conn = memory._conn
+        
+        memory.close()
+        
+        for conn in opened + [main_conn]:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        # A later call reconnects rather than reusing a closed handle
+        assert memory.get_history(sample_session_id) == [{"role": "user", "content": "Hello"}]
+        memory.close()
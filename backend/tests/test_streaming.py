@@ -0,0 +1,131 @@
+import asyncio
+import math
+import struct
+from starlette.websockets import WebSocketDisconnect
+from main import app
+from routes import conversation
+from services.memory_service import ConversationMemory, get_memory
+from services.endpointer import UtteranceEndpointer, SPEECH_STARTED, PAUSE, END_OF_UTTERANCE
+
+
+def tone(ms, amplitude=8000, sample_rate=16000):
+    samples = sample_rate * ms // 1000
+    return struct.pack(
+        f"<{samples}h",
+        *(int(amplitude * math.sin(2 * math.pi * 440 * i / sample_rate)) for i in range(samples))
+    )
+
+
+def silence(ms, sample_rate=16000):
+    return b"\x00\x00" * (sample_rate * ms // 1000)
+
+
+class TestEndpointer:
+    def test_detects_speech_pause_and_end(self):
+        endpointer = UtteranceEndpointer()
+        events = []
+        for chunk in [silence(200), tone(500), silence(400), silence(400)]:
+            events += endpointer.feed(chunk)
+        
+        assert events == [SPEECH_STARTED, PAUSE, END_OF_UTTERANCE]
+        utterance = endpointer.take_utterance()
+        # Leading silence is trimmed to the pre-roll
+        assert len(utterance) < len(silence(200) + tone(500) + silence(800))
+    
+    def test_silence_alone_never_ends_an_utterance(self):
+        endpointer = UtteranceEndpointer()
+        assert endpointer.feed(silence(3000)) == []
+    
+    def test_audio_after_end_is_kept_for_next_utterance(self):
+        endpointer = UtteranceEndpointer()
+        events = endpointer.feed(tone(300) + silence(700) + tone(300))
+        assert events[-1] == END_OF_UTTERANCE
+        endpointer.take_utterance()
+        
+        assert endpointer.feed(silence(20)) == [SPEECH_STARTED]
+
+
+class TestStreamEndpoint:
+    def test_stream_turn_events(self, client, tmp_path, monkeypatch):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        app.dependency_overrides[get_memory] = lambda: memory
+        
+        async def fake_transcribe(pcm, sample_rate=16000, sample_width=2, session_id=None):
+            return "I need a cleaning"
+        
+        async def fake_stream(user_message, history, summary=None, booking=None):
+            yield {"type": "sentence", "text": "Sure."}
+            yield {"type": "sentence", "text": "What day works?"}
+            yield {"type": "done", "response": "Sure. What day works?", "intent": "conversation", "metadata": None}
+        
+        async def fake_tts(text):
+            audio_file = tmp_path / f"response_{len(text)}.mp3"
+            audio_file.write_bytes(b"mp3")
+            return str(audio_file)
+        
+        monkeypatch.setattr(conversation.stt_service, "transcribe_pcm", fake_transcribe)
+        monkeypatch.setattr(conversation.llm_service, "stream_response", fake_stream)
+        monkeypatch.setattr(conversation.tts_service, "text_to_speech", fake_tts)
+        
+        try:
+            with client.websocket_connect("/api/conversation/stream?session_id=ws-session") as ws:
+                assert ws.receive_json()["type"] == "ready"
+                ws.send_bytes(tone(400))
+                ws.send_bytes(silence(800))
+                
+                events = []
+                while not events or events[-1]["type"] != "done":
+                    events.append(ws.receive_json())
+            
+            by_type = {}
+            for event in events:
+                by_type.setdefault(event["type"], []).append(event)
+            
+            assert by_type["transcript"][0]["text"] == "I need a cleaning"
+            assert by_type["assistant"][0]["text"] == "Sure. What day works?"
+            assert [e["audio_url"] for e in by_type["audio_segment"]] == [
+                "/api/conversation/audio/response_5.mp3",
+                "/api/conversation/audio/response_15.mp3"
+            ]
+            assert by_type["done"][0]["segments"] == 2
+            assert len(memory.get_history("ws-session")) == 2
+        finally:
+            app.dependency_overrides.clear()
+    
+    def test_failed_turn_sends_no_later_audio(self, tmp_path, monkeypatch):
+        memory = ConversationMemory(data_file=str(tmp_path / "conversations.json"))
+        sent = []
+        
+        async def send(event):
+            sent.append(event)
+        
+        async def failing_stream(user_message, history, summary=None, booking=None):
+            yield {"type": "sentence", "text": "Sure."}
+            raise RuntimeError("stream broke")
+        
+        async def slow_tts(text):
+            await asyncio.sleep(0.2)
+            return str(tmp_path / "response_late.mp3")
+        
+        monkeypatch.setattr(conversation.llm_service, "stream_response", failing_stream)
+        monkeypatch.setattr(conversation.tts_service, "text_to_speech", slow_tts)
+        
+        async def run():
+            try:
+                await conversation._run_streaming_turn("ws-failed", "Hello", memory, send)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("turn did not fail")
+            await asyncio.sleep(0.3)
+        
+        asyncio.run(run())
+        assert not [e for e in sent if e["type"] == "audio_segment"]
+    
+    def test_invalid_sample_rate_rejected(self, client):
+        for rate in (0, -16000, 192000):
+            try:
+                with client.websocket_connect(f"/api/conversation/stream?sample_rate={rate}"):
+                    raise AssertionError(f"{rate} Hz accepted")
+            except WebSocketDisconnect as e:
+                assert e.code == 1008
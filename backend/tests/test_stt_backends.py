@@ -0,0 +1,56 @@
+import asyncio
+import numpy as np
+import pytest
+from services.stt_backends import create_backend, StubSTTBackend, GoogleSTTBackend
+from services.stt_service import STTService
+
+
+def speech_pcm(seconds: float = 1.0, freq: float = 220) -> bytes:
+    t = np.arange(int(16000 * seconds)) / 16000
+    return (4000 * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+class TestBackendSelection:
+    """Test STT_BACKEND configuration"""
+
+    def test_default_is_google(self, monkeypatch):
+        monkeypatch.delenv("STT_BACKEND", raising=False)
+        assert isinstance(create_backend(), GoogleSTTBackend)
+
+    def test_env_selects_backend(self, monkeypatch):
+        monkeypatch.setenv("STT_BACKEND", "stub")
+        assert STTService().backend.name == "stub"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            create_backend("nope")
+
+    def test_local_backend_requires_engine(self):
+        try:
+            import faster_whisper  # noqa: F401
+            pytest.skip("faster-whisper is installed")
+        except ImportError:
+            pass
+        with pytest.raises(RuntimeError, match="faster-whisper"):
+            create_backend("local")
+
+
+class TestStubBackend:
+    """Test the deterministic load-test backend"""
+
+    def test_same_audio_same_text(self):
+        backend = StubSTTBackend()
+        pcm = speech_pcm()
+        first = backend.recognize(pcm, 16000, 2)
+
+        assert first in StubSTTBackend.STUB_PHRASES
+        assert all(backend.recognize(pcm, 16000, 2) == first for _ in range(5))
+
+    def test_pinned_text(self):
+        assert StubSTTBackend(text="hello").recognize(speech_pcm(), 16000, 2) == "hello"
+
+    def test_service_runs_through_stub(self):
+        service = STTService(backend=StubSTTBackend.name)
+        service.backend = StubSTTBackend(text="book a cleaning")
+
+        assert asyncio.run(service.transcribe_pcm(speech_pcm())) == "book a cleaning"
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from services.tts_cache import TTSCache
+from services.tts_service import TTSService
+
+
+def clip(n: int, fill: bytes = b"a") -> bytes:
+    return fill * n
+
+
+class TestTTSCache:
+    """Test the size-bounded clip cache"""
+
+    def test_lru_eviction_respects_budget(self, tmp_path):
+        cache = TTSCache(tmp_path, max_bytes=300, hot_max_bytes=0)
+        cache.put("a.mp3", clip(100))
+        cache.put("b.mp3", clip(100))
+        cache.put("c.mp3", clip(100))
+        cache.get("a.mp3")  # a is now most recently used
+
+        cache.put("d.mp3", clip(100))
+
+        assert not cache.contains("b.mp3")
+        assert not (tmp_path / "b.mp3").exists()
+        assert cache.contains("a.mp3") and cache.contains("d.mp3")
+        assert cache.stats()["bytes"] == 300
+        assert cache.stats()["evictions"] == 1
+
+    def test_pinned_clips_never_evicted(self, tmp_path):
+        cache = TTSCache(tmp_path, max_bytes=200, hot_max_bytes=0)
+        cache.put("greeting.mp3", clip(100), pinned=True)
+        for i in range(5):
+            cache.put(f"r{i}.mp3", clip(100))
+
+        assert cache.contains("greeting.mp3")
+        assert cache.stats()["pinned"] == 1
+
+    def test_index_survives_restart(self, tmp_path):
+        cache = TTSCache(tmp_path, max_bytes=10_000)
+        cache.put("a.mp3", clip(10), pinned=True)
+        cache.put("b.mp3", clip(20))
+        cache.close()
+
+        reloaded = TTSCache(tmp_path, max_bytes=10_000)
+        assert list(reloaded.entries) == ["a.mp3", "b.mp3"]
+        assert reloaded.entries["a.mp3"]["pinned"] is True
+        assert reloaded.total_bytes == 30
+
+    def test_missing_index_rebuilt_from_directory(self, tmp_path):
+        (tmp_path / "old.mp3").write_bytes(clip(42))
+        cache = TTSCache(tmp_path)
+        cache.flush()
+
+        assert cache.contains("old.mp3")
+        assert json.loads((tmp_path / "index.json").read_text())["entries"][0][0] == "old.mp3"
+
+    def test_index_writes_are_coalesced(self, tmp_path):
+        cache = TTSCache(tmp_path)
+        cache._index_writer.interval = 60  # keep the background flush out of the way
+        assert not (tmp_path / "index.json").exists()
+
+        for i in range(5):
+            cache.put(f"r{i}.mp3", clip(10))
+        cache.pin("r0.mp3")
+
+        assert not (tmp_path / "index.json").exists()
+        cache.flush()
+        entries = json.loads((tmp_path / "index.json").read_text())["entries"]
+        assert [name for name, _ in entries] == [f"r{i}.mp3" for i in range(5)]
+        assert entries[0][1]["pinned"] is True
+        cache.close()
+
+    def test_hot_tier_serves_from_memory(self, tmp_path):
+        cache = TTSCache(tmp_path, hot_max_bytes=150)
+        cache.put("a.mp3", clip(100, b"x"))
+        (tmp_path / "a.mp3").unlink()  # a hot read must not touch the disk
+
+        assert cache.read("a.mp3") == clip(100, b"x")
+
+        cache.put("b.mp3", clip(100))
+        assert cache.stats()["hot_entries"] == 1
+        assert cache.stats()["hot_bytes"] <= 150
+
+
+class TestTTSServiceCache:
+    """Test TTSService on top of the managed cache"""
+
+    def make_service(self, tmp_path, monkeypatch):
+        service = TTSService()
+        service.cache = TTSCache(tmp_path)
+        calls = []
+
+        def fake_synthesize(text):
+            calls.append(text)
+            return f"mp3:{text}".encode()
+
+        monkeypatch.setattr(service, "_synthesize", fake_synthesize)
+        return service, calls
+
+    def test_repeat_text_served_from_cache(self, tmp_path, monkeypatch):
+        service, calls = self.make_service(tmp_path, monkeypatch)
+
+        async def scenario():
+            first = await service.text_to_speech("Looking forward to seeing you!")
+            second = await service.text_to_speech("Looking forward to seeing you!")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first == second
+        assert calls == ["Looking forward to seeing you!"]
+
+    def test_concurrent_requests_share_synthesis(self, tmp_path, monkeypatch):
+        service, calls = self.make_service(tmp_path, monkeypatch)
+
+        async def scenario():
+            return await asyncio.gather(*[service.text_to_speech("Hello there") for _ in range(5)])
+
+        paths = asyncio.run(scenario())
+        assert len(set(paths)) == 1
+        assert calls == ["Hello there"]
+
+    def test_prewarm_pins_and_loads_hot(self, tmp_path, monkeypatch):
+        service, calls = self.make_service(tmp_path, monkeypatch)
+        monkeypatch.delenv("TTS_PREWARM_PHRASES", raising=False)
+
+        asyncio.run(service.prewarm(["Hello!", "Please repeat that."]))
+
+        name = TTSService.cache_name("Hello!")
+        assert service.cache.entries[name]["pinned"] is True
+        assert name in service.cache._hot
+        assert len(calls) == 2
+
+
+def mp3_frame(payload: bytes = b"") -> bytes:
+    """One MPEG-2 Layer III frame: 32 kbps, 24 kHz, no padding (96 bytes)"""
+    header = bytes([0xFF, 0xF3, 0x44, 0xC4])
+    body = payload.ljust(92, b"\x00")[:92]
+    return header + body
+
+
+class TestSentenceClips:
+    """Test sentence-level caching and MP3 stitching"""
+
+    def make_service(self, tmp_path, monkeypatch):
+        service = TTSService()
+        service.cache = TTSCache(tmp_path)
+        calls = []
+
+        def fake_synthesize(text):
+            calls.append(text)
+            return mp3_frame(text.encode())
+
+        monkeypatch.setattr(service, "_synthesize", fake_synthesize)
+        return service, calls
+
+    def test_only_new_sentences_synthesized(self, tmp_path, monkeypatch):
+        service, calls = self.make_service(tmp_path, monkeypatch)
+
+        async def scenario():
+            await service.text_to_speech("Your cleaning is booked. Looking forward to seeing you!")
+            await service.text_to_speech("Your filling is booked.  Looking forward to seeing you!")
+
+        asyncio.run(scenario())
+        assert calls == [
+            "Your cleaning is booked.",
+            "Looking forward to seeing you!",
+            "Your filling is booked.",
+        ]
+
+    def test_response_is_concatenated_frames(self, tmp_path, monkeypatch):
+        service, _ = self.make_service(tmp_path, monkeypatch)
+
+        path = asyncio.run(service.text_to_speech("First one. Second one."))
+
+        data = (tmp_path / path.split("/")[-1]).read_bytes()
+        assert data == mp3_frame(b"First one.") + mp3_frame(b"Second one.")
+
+    def test_concat_drops_tags_and_xing(self):
+        from utils.audio_helper import concat_mp3
+        id3 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+        xing = mp3_frame(b"\x00" * 9 + b"Xing")
+        clip_a = id3 + xing + mp3_frame(b"a")
+        clip_b = mp3_frame(b"b") + b"TAG" + b"\x00" * 125
+
+        assert concat_mp3([clip_a, clip_b]) == mp3_frame(b"a") + mp3_frame(b"b")
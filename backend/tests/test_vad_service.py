@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from services.vad_service import VoiceActivityDetector, NoSpeechError
+
+RATE = 16000
+
+
+def clip(*segments) -> bytes:
+    """Build 16-bit PCM from (kind, ms) segments: 'silence', 'noise' or 'speech'"""
+    rng = np.random.default_rng(0)
+    parts = []
+    for kind, ms in segments:
+        n = RATE * ms // 1000
+        if kind == "silence":
+            parts.append(np.zeros(n))
+        elif kind == "noise":
+            parts.append(rng.normal(0, 60, n))
+        else:
+            t = np.arange(n) / RATE
+            parts.append(4000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 60, n))
+    return np.concatenate(parts).astype("<i2").tobytes()
+
+
+class TestVoiceActivityDetector:
+    """Test silence trimming and empty-clip rejection"""
+
+    def test_trims_leading_and_trailing_silence(self):
+        vad = VoiceActivityDetector(padding_ms=100)
+        pcm = clip(("noise", 1000), ("speech", 800), ("noise", 1200))
+
+        result = vad.trim(pcm, RATE)
+
+        duration_ms = len(result.pcm) * 1000 // (2 * RATE)
+        assert 800 <= duration_ms <= 1040
+        assert result.speech_ms >= 760
+        assert result.trimmed_ms >= 1900
+
+    def test_rejects_clip_without_speech(self):
+        vad = VoiceActivityDetector()
+        with pytest.raises(NoSpeechError):
+            vad.trim(clip(("noise", 2000)), RATE)
+
+    def test_rejects_too_short_clip(self):
+        vad = VoiceActivityDetector()
+        with pytest.raises(NoSpeechError):
+            vad.trim(b"\x00" * 10, RATE)
+
+    def test_keeps_fricatives_at_word_edges(self):
+        """Quiet, high-crossing-rate frames next to speech are kept"""
+        rng = np.random.default_rng(1)
+        hiss = (rng.choice([-1, 1], RATE // 5) * 400).astype("<i2").tobytes()
+        pcm = clip(("noise", 500)) + hiss + clip(("speech", 500), ("noise", 500))
+
+        result = VoiceActivityDetector(padding_ms=0).trim(pcm, RATE)
+
+        assert len(result.pcm) * 1000 // (2 * RATE) >= 680
+
+    def test_noise_floor_cached_per_session(self):
+        vad = VoiceActivityDetector()
+        assert vad.noise_floor("s1") is None
+
+        vad.trim(clip(("noise", 500), ("speech", 500), ("noise", 500)), RATE, session_id="s1")
+        first = vad.noise_floor("s1")
+        assert first is not None and first < 200
+        assert vad.noise_floor("s2") is None
+
+        # A clip that is speech from end to end still trims against the cached floor
+        result = vad.trim(clip(("speech", 600)), RATE, session_id="s1")
+        assert result.speech_ms >= 560
+
+    def test_session_cache_is_bounded(self):
+        vad = VoiceActivityDetector(max_sessions=2)
+        pcm = clip(("noise", 300), ("speech", 300))
+        for session_id in ("a", "b", "c"):
+            vad.trim(pcm, RATE, session_id=session_id)
+
+        assert vad.noise_floor("a") is None
+        assert vad.noise_floor("c") is not None
+
+
+class TestSTTSkipsSilence:
+    """Test that silent clips never reach the recognizer"""
+
+    def test_silent_clip_rejected_before_network(self, monkeypatch):
+        import asyncio
+        from services.stt_service import STTService
+        service = STTService(backend="stub")
+
+        def fail_recognize(pcm, sample_rate, sample_width):
+            raise AssertionError("recognizer should not be called")
+
+        monkeypatch.setattr(service.backend, "recognize", fail_recognize)
+        with pytest.raises(Exception, match="No speech detected"):
+            asyncio.run(service.transcribe_pcm(clip(("noise", 1000))))
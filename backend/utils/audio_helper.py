@@ -0,0 +1,332 @@
+import struct
+import subprocess
+from functools import lru_cache
+from math import gcd
+from typing import NamedTuple, Optional
+import numpy as np
+
+# Format the recognizer wants: 16 kHz, mono, 16-bit PCM
+TARGET_SAMPLE_RATE = 16000
+TARGET_CHANNELS = 1
+TARGET_SAMPLE_WIDTH = 2
+
+# Resampler quality: filter half-length in zero crossings and Kaiser window beta
+RESAMPLE_ZERO_CROSSINGS = 16
+RESAMPLE_KAISER_BETA = 8.6
+RESAMPLE_BLOCK = 8192
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    sample_width: int
+    pcm: bytes
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    Identify an audio container from its first bytes
+
+    Browsers label MediaRecorder output as whatever the page asks for, so the
+    filename and content type are not trusted.
+
+    Returns:
+        "wav", "webm", "ogg", "mp3", "flac", "mp4" or None if unknown
+    """
+    if len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:3] == b"ID3" or (len(data) >= 2 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if len(data) >= 8 and data[4:8] == b"ftyp":
+        return "mp4"
+    return None
+
+
+def parse_wav(data: bytes) -> Optional[WavInfo]:
+    """
+    Read the fmt and data chunks of a PCM WAV file held in memory
+
+    Walks the RIFF chunk list so LIST/INFO chunks before the audio are skipped,
+    and tolerates the bogus sizes streaming encoders write for the data chunk.
+
+    Returns:
+        WavInfo, or None if this is not integer PCM WAV
+    """
+    if sniff_format(data) != "wav":
+        return None
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                audio_format = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, bits = fmt
+            if audio_format != WAVE_FORMAT_PCM or bits not in (8, 16, 24, 32) or channels < 1:
+                return None
+
+            if chunk_size == 0 or body + chunk_size > len(data):
+                chunk_size = len(data) - body
+            sample_width = bits // 8
+            pcm = data[body:body + chunk_size]
+            # Drop a trailing partial frame rather than feed garbage downstream
+            pcm = pcm[:len(pcm) - len(pcm) % (sample_width * channels)]
+            return WavInfo(sample_rate, channels, sample_width, pcm)
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def validate_audio_file(data: bytes) -> bool:
+    """Check that an upload looks like audio we can decode"""
+    return len(data) > 44 and sniff_format(data) is not None
+
+
+def convert_audio_format(
+    data: bytes,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    channels: int = TARGET_CHANNELS,
+    sample_width: int = TARGET_SAMPLE_WIDTH
+) -> bytes:
+    """
+    Decode an in-memory audio file to raw PCM in the requested format
+
+    PCM WAV that already matches is sliced out of the buffer untouched;
+    other PCM WAV is converted in-process. Only compressed containers go
+    through ffmpeg, over pipes so nothing touches the disk.
+
+    Returns:
+        Raw little-endian PCM bytes
+    """
+    wav = parse_wav(data)
+    if wav is None:
+        return _ffmpeg_decode(data, sample_rate, channels, sample_width)
+
+    if (wav.sample_rate, wav.channels, wav.sample_width) == (sample_rate, channels, sample_width):
+        return wav.pcm
+
+    return convert_pcm(wav.pcm, wav.sample_rate, wav.channels, wav.sample_width, sample_rate, channels, sample_width)
+
+
+def convert_pcm(
+    pcm: bytes,
+    from_rate: int,
+    from_channels: int,
+    from_width: int,
+    to_rate: int = TARGET_SAMPLE_RATE,
+    to_channels: int = TARGET_CHANNELS,
+    to_width: int = TARGET_SAMPLE_WIDTH
+) -> bytes:
+    """Convert raw PCM between sample widths, channel counts and rates (vectorized)"""
+    samples = pcm_to_float(pcm, from_width)
+    samples = samples[:len(samples) - len(samples) % from_channels].reshape(-1, from_channels)
+
+    if from_channels != to_channels:
+        if to_channels != 1:
+            raise ValueError("Only downmixing to mono is supported")
+        samples = samples.mean(axis=1, keepdims=True)
+
+    if from_rate != to_rate:
+        samples = np.stack([resample(samples[:, c], from_rate, to_rate) for c in range(to_channels)], axis=1)
+
+    return float_to_pcm(samples.reshape(-1), to_width)
+
+
+def pcm_to_float(pcm: bytes, sample_width: int) -> np.ndarray:
+    """Decode little-endian PCM (8-bit unsigned, 16/24/32-bit signed) to float32 in [-1, 1)"""
+    if sample_width == 1:
+        return (np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 3:
+        raw = np.frombuffer(pcm[:len(pcm) - len(pcm) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        return values.astype(np.float32) / 8388608.0
+    if sample_width == 4:
+        return (np.frombuffer(pcm, dtype="<i4").astype(np.float64) / 2147483648.0).astype(np.float32)
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def float_to_pcm(samples: np.ndarray, sample_width: int) -> bytes:
+    """Encode float samples as little-endian PCM, clipping out-of-range values"""
+    if sample_width == 1:
+        return np.clip(np.round(samples * 128.0 + 128.0), 0, 255).astype(np.uint8).tobytes()
+    if sample_width == 2:
+        return np.clip(np.round(samples * 32768.0), -32768, 32767).astype("<i2").tobytes()
+    if sample_width == 4:
+        return np.clip(np.round(samples.astype(np.float64) * 2147483648.0), -2147483648, 2147483647).astype("<i4").tobytes()
+    raise ValueError(f"Unsupported output sample width: {sample_width}")
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass, split into ``up`` phases (rows)"""
+    factor = max(up, down)
+    half_taps = RESAMPLE_ZERO_CROSSINGS * factor
+    n = np.arange(-half_taps, half_taps + 1)
+    cutoff = 0.95 / factor
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), RESAMPLE_KAISER_BETA) * up
+
+    # Pad to a whole number of taps per phase; row p holds taps p, p+up, p+2*up...
+    taps = np.concatenate([taps, np.zeros(-len(taps) % up)])
+    return taps.reshape(-1, up).T.astype(np.float32).copy()
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """
+    Polyphase rational resampling of one channel
+
+    Output sample ``j`` sits at input position ``j * down / up``; only the
+    filter phase that lands on real input samples is evaluated, so no
+    zero-stuffed intermediate signal is ever built.
+    """
+    if from_rate == to_rate or len(samples) == 0:
+        return samples.astype(np.float32)
+
+    g = gcd(from_rate, to_rate)
+    up, down = to_rate // g, from_rate // g
+    phases = _polyphase_filter(up, down)
+    taps_per_phase = phases.shape[1]
+    center = RESAMPLE_ZERO_CROSSINGS * max(up, down)
+    out_len = len(samples) * up // down
+
+    if up == 1:
+        # Integer decimation (48k/32k -> 16k): one C-level convolution is fastest
+        filtered = np.convolve(samples.astype(np.float32), phases[0])
+        return filtered[center:center + out_len * down:down].astype(np.float32)
+
+    padded = np.concatenate([
+        np.zeros(taps_per_phase, dtype=np.float32),
+        samples.astype(np.float32),
+        np.zeros(taps_per_phase, dtype=np.float32)
+    ])
+    output = np.empty(out_len, dtype=np.float32)
+    offsets = np.arange(taps_per_phase)
+
+    # Bounded block size keeps the gathered (block x taps) matrix small
+    for start in range(0, out_len, RESAMPLE_BLOCK):
+        j = np.arange(start, min(start + RESAMPLE_BLOCK, out_len))
+        position = j * down + center
+        phase = position % up
+        base = (position // up + taps_per_phase)[:, None] - offsets[None, :]
+        output[j] = np.einsum("ij,ij->i", padded[base], phases[phase])
+
+    return output
+
+
+def _ffmpeg_decode(data: bytes, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """Decode a compressed container through ffmpeg using stdin/stdout pipes"""
+    sample_formats = {1: "u8", 2: "s16le", 4: "s32le"}
+    if sample_width not in sample_formats:
+        raise ValueError(f"Unsupported output sample width: {sample_width}")
+
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-f", sample_formats[sample_width],
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "pipe:1"
+    ]
+    try:
+        result = subprocess.run(command, input=data, capture_output=True, timeout=30)
+    except FileNotFoundError:
+        raise RuntimeError(f"ffmpeg is required to decode {sniff_format(data) or 'unknown'} audio")
+
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg could not decode audio: {error}")
+    return result.stdout
+
+
+# MPEG audio Layer III tables, indexed by header fields
+_MP3_BITRATES = {
+    "1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],   # MPEG-1
+    0b10: [22050, 24000, 16000],   # MPEG-2
+    0b00: [11025, 12000, 8000],    # MPEG-2.5
+}
+
+
+def _mp3_frame_length(data: bytes, offset: int) -> int:
+    """Length of the Layer III frame starting at ``offset``, or 0 if there is none"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return 0
+    version = (data[offset + 1] >> 3) & 0b11
+    layer = (data[offset + 1] >> 1) & 0b11
+    bitrate_index = data[offset + 2] >> 4
+    rate_index = (data[offset + 2] >> 2) & 0b11
+    padding = (data[offset + 2] >> 1) & 1
+    if version == 0b01 or layer != 0b01 or bitrate_index in (0, 15) or rate_index == 3:
+        return 0
+
+    mpeg1 = version == 0b11
+    bitrate = _MP3_BITRATES["1" if mpeg1 else "2"][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    return (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+
+
+def _strip_id3(data: bytes) -> bytes:
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def concat_mp3(clips) -> bytes:
+    """
+    Join MP3 clips into one stream at frame boundaries
+
+    ID3 tags and Xing/Info header frames are dropped, since their duration
+    and seek tables would describe only the first clip. Clips must share a
+    sample rate (true for one TTS voice). Unparseable clips are appended as-is.
+    """
+    output = bytearray()
+    for clip in clips:
+        data = _strip_id3(clip)
+        offset = 0
+        frames_start = None
+        while offset < len(data):
+            length = _mp3_frame_length(data, offset)
+            if length == 0:
+                offset += 1
+                continue
+            if frames_start is None:
+                frames_start = offset
+                # A Xing/Info frame carries no audio; it sits in the first frame
+                if b"Xing" in data[offset + 4:offset + 40] or b"Info" in data[offset + 4:offset + 40]:
+                    offset += length
+                    frames_start = offset
+                    continue
+            output.extend(data[offset:offset + length])
+            offset += length
+
+        if frames_start is None:
+            output.extend(clip)
+    return bytes(output)
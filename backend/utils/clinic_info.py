@@ -0,0 +1,41 @@
+"""
+Static facts about the clinic
+
+Single source for the system prompt, the FAQ fast path and the booking
+validators, so the three never disagree.
+"""
+
+CLINIC_NAME = "SmileCare Dental"
+
+# Service -> dentist who handles it (None: no dedicated dentist listed)
+SERVICES = {
+    "General Checkup": "Dr. Emily Chen",
+    "Teeth Cleaning": "Dr. Emily Chen",
+    "Root Canal": "Dr. James Wilson",
+    "Teeth Whitening": "Dr. Priya Sharma",
+    "Braces Consultation": "Dr. Mark Johnson",
+    "Dental Implants": None,
+}
+
+DENTISTS = {
+    "Dr. Emily Chen": ["General Dentistry", "Teeth Cleaning"],
+    "Dr. James Wilson": ["Root Canal Specialist"],
+    "Dr. Priya Sharma": ["Cosmetic Dentistry", "Whitening"],
+    "Dr. Mark Johnson": ["Orthodontics", "Braces"],
+}
+
+OPENING_DAYS = "Monday to Saturday"
+OPENING_TIMES = "9 AM to 6 PM"
+CLOSED_DAYS = "Sundays"
+WORKING_HOURS = f"{OPENING_DAYS}, {OPENING_TIMES} (Closed {CLOSED_DAYS})"
+LOCATION = "123 Healthcare Ave, Downtown"
+
+# Words a caller may use for each service
+SERVICE_ALIASES = {
+    "General Checkup": ["checkup", "check-up", "check up", "exam", "examination", "general dentistry"],
+    "Teeth Cleaning": ["cleaning", "clean", "scale and polish", "hygiene"],
+    "Root Canal": ["root canal", "root canals"],
+    "Teeth Whitening": ["whitening", "whiten", "bleaching", "cosmetic"],
+    "Braces Consultation": ["braces", "orthodontic", "orthodontics", "aligners", "invisalign"],
+    "Dental Implants": ["implant", "implants"],
+}
@@ -0,0 +1,77 @@
+import re
+from typing import List, Optional
+
+# Abbreviations that end with a period but do not end a sentence
+ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "st", "ave", "jr", "sr", "vs", "etc", "e.g", "i.e", "a.m", "p.m"}
+
+# Sentence-ending punctuation (optionally followed by closing quotes/brackets) then whitespace
+_BOUNDARY = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    """Check whether the period ending at ``end`` belongs to an abbreviation"""
+    match = re.search(r'([A-Za-z.]+)\.$', text[:end])
+    return bool(match) and match.group(1).lower() in ABBREVIATIONS
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of stripped, non-empty sentences
+    """
+    buffer = SentenceBuffer()
+    sentences = buffer.push(text)
+    tail = buffer.flush()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+class SentenceBuffer:
+    """Accumulates streamed text and releases it one complete sentence at a time"""
+
+    def __init__(self):
+        self.pending = ""
+
+    def push(self, text: str) -> List[str]:
+        """
+        Add streamed text
+
+        Args:
+            text: Next chunk of text
+
+        Returns:
+            Sentences completed by this chunk
+        """
+        self.pending += text
+        sentences = []
+        start = 0
+
+        for match in _BOUNDARY.finditer(self.pending):
+            punctuation_end = match.start() + len(match.group().rstrip())
+            if self.pending[match.start()] == "." and _is_abbreviation(self.pending, match.start() + 1):
+                continue
+
+            sentence = self.pending[start:punctuation_end].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+
+        self.pending = self.pending[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """
+        Release whatever text is left once the stream has ended
+
+        Returns:
+            The trailing sentence, or None if nothing is pending
+        """
+        tail = self.pending.strip()
+        self.pending = ""
+        return tail or None
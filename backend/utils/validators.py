@@ -1,6 +1,7 @@
 import re
 from datetime import datetime, timedelta
 from typing import Optional
+from utils.clinic_info import SERVICES, DENTISTS
 
 def validate_email(email: str) -> bool:
     """
@@ -95,14 +96,7 @@ def validate_service(service: str, available_services: list = None) -> bool:
         True if service is available
     """
     if available_services is None:
-        available_services = [
-            "General Checkup",
-            "Teeth Cleaning",
-            "Root Canal",
-            "Teeth Whitening",
-            "Braces Consultation",
-            "Dental Implants"
-        ]
+        available_services = list(SERVICES)
     
     # Case-insensitive match
     return service.lower() in [s.lower() for s in available_services]
@@ -120,11 +114,6 @@ def validate_dentist(dentist: str, available_dentists: list = None) -> bool:
         True if dentist is available
     """
     if available_dentists is None:
-        available_dentists = [
-            "Dr. Emily Chen",
-            "Dr. James Wilson",
-            "Dr. Priya Sharma",
-            "Dr. Mark Johnson"
-        ]
+        available_dentists = list(DENTISTS)
     
     return dentist in available_dentists
\ No newline at end of file
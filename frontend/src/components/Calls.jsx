@@ -4,12 +4,28 @@ import {
   Play, Pause, User, Bot, MessageCircle
 } from 'lucide-react'
 
+// Object URL for a Blob source (strings pass through), revoked once the
+// blob is replaced or the component using it unmounts
+function useObjectUrl(source) {
+  const [objectUrl, setObjectUrl] = useState(null)
+
+  useEffect(() => {
+    if (!(source instanceof Blob)) return
+    const url = URL.createObjectURL(source)
+    setObjectUrl(url)
+    return () => URL.revokeObjectURL(url)
+  }, [source])
+
+  return source instanceof Blob ? objectUrl : source
+}
+
 // 🎧 Reusable voice bubble with auto-play support
-function VoiceMessage({ url, role, timestamp, autoPlay = false, onPlayingChange, messageId, hasBeenPlayed }) {
+function VoiceMessage({ audio, role, timestamp, autoPlay = false, onPlayingChange, messageId, hasBeenPlayed }) {
   const [isPlaying, setIsPlaying] = useState(false)
   const [duration, setDuration] = useState(0)
   const [currentTime, setCurrentTime] = useState(0)
   const audioRef = useRef(null)
+  const url = useObjectUrl(audio)
 
   const togglePlay = () => {
     if (!audioRef.current) return
@@ -22,7 +38,7 @@ function VoiceMessage({ url, role, timestamp, autoPlay = false, onPlayingChange,
 
   // Auto-play logic - only if autoPlay is true AND hasn't been played before
   useEffect(() => {
-    if (autoPlay && audioRef.current && !hasBeenPlayed) {
+    if (autoPlay && url && audioRef.current && !hasBeenPlayed) {
       const timer = setTimeout(() => {
         audioRef.current?.play().catch(err => {
           console.log('Auto-play prevented:', err)
@@ -31,7 +47,7 @@ function VoiceMessage({ url, role, timestamp, autoPlay = false, onPlayingChange,
       
       return () => clearTimeout(timer)
     }
-  }, [autoPlay, hasBeenPlayed])
+  }, [autoPlay, hasBeenPlayed, url])
 
   useEffect(() => {
     const audio = audioRef.current
@@ -161,6 +177,25 @@ function VoiceMessage({ url, role, timestamp, autoPlay = false, onPlayingChange,
   )
 }
 
+// Voice turns are requested with inline audio: one response carries the JSON
+// payload and the reply audio, so playback needs no second request.
+// Frame: 4-byte big-endian header length, JSON header, audio bytes.
+// `audio` is the server URL or, for inline audio, the Blob itself; blobs
+// only get an object URL while their VoiceMessage is on screen.
+const VOICE_TURN_MEDIA_TYPE = 'application/x-voice-turn'
+
+async function readVoiceTurn(res) {
+  if (!(res.headers.get('content-type') || '').startsWith(VOICE_TURN_MEDIA_TYPE)) {
+    const data = await res.json()
+    return { ...data, audio: data.audio_url ? `http://localhost:8000${data.audio_url}` : null }
+  }
+  const buffer = await res.arrayBuffer()
+  const headerLength = new DataView(buffer).getUint32(0)
+  const data = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, headerLength)))
+  const audio = new Blob([new Uint8Array(buffer, 4 + headerLength)], { type: data.audio_media_type })
+  return { ...data, audio }
+}
+
 export default function Calls({ conversationState, setConversationState, onAppointmentBooked }) {
   const mediaRecorderRef = useRef(null)
   const audioChunksRef = useRef([])
@@ -169,6 +204,7 @@ export default function Calls({ conversationState, setConversationState, onAppoi
 
   // Extract state values
   const { sessionId, messages, greeted, isRecording, isProcessing, audioBlob, playedMessageIds = new Set() } = conversationState
+  const recordingUrl = useObjectUrl(audioBlob)
 
   // Helper to update conversation state
   const updateState = (updates) => {
@@ -198,14 +234,16 @@ export default function Calls({ conversationState, setConversationState, onAppoi
   const startConversation = async () => {
     try {
       updateState({ isProcessing: true })
-      const res = await fetch(`${API_BASE_URL}/conversation/greeting?session_id=${sessionId}`)
-      const data = await res.json()
+      const res = await fetch(`${API_BASE_URL}/conversation/greeting?session_id=${sessionId}`, {
+        headers: { Accept: VOICE_TURN_MEDIA_TYPE }
+      })
+      const data = await readVoiceTurn(res)
       
       const messageId = `greeting-${Date.now()}`
       const greetingMsg = {
         id: messageId,
         role: 'assistant',
-        audioUrl: `http://localhost:8000${data.audio_url}`,
+        audio: data.audio,
         content: data.text || 'Hello! How can I help you today?',
         timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
         autoPlay: true
@@ -265,9 +303,10 @@ export default function Calls({ conversationState, setConversationState, onAppoi
     try {
       const res = await fetch(`${API_BASE_URL}/conversation/process-voice?session_id=${sessionId}`, {
         method: 'POST',
+        headers: { Accept: VOICE_TURN_MEDIA_TYPE },
         body: form
       })
-      const result = await res.json()
+      const result = await readVoiceTurn(res)
       
       const timestamp = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
       const userMessageId = `user-${Date.now()}`
@@ -278,14 +317,14 @@ export default function Calls({ conversationState, setConversationState, onAppoi
         { 
           id: userMessageId,
           role: 'user', 
-          audioUrl: URL.createObjectURL(audioBlob),
+          audio: audioBlob,
           content: result.user_text || 'User message',
           timestamp
         },
         { 
           id: assistantMessageId,
           role: 'assistant', 
-          audioUrl: `http://localhost:8000${result.audio_url}`,
+          audio: result.audio,
           content: result.assistant_text || 'Assistant response',
           timestamp,
           autoPlay: true
@@ -435,11 +474,11 @@ export default function Calls({ conversationState, setConversationState, onAppoi
         {messages.length > 0 && (
           <div className="min-h-[400px] max-h-[500px] overflow-y-auto space-y-4 mb-4 flex flex-col">
             {messages.map((msg, i) => (
-              msg.audioUrl ? (
+              msg.audio ? (
                 <VoiceMessage 
                   key={msg.id || i}
                   messageId={msg.id}
-                  url={msg.audioUrl} 
+                  audio={msg.audio} 
                   role={msg.role} 
                   timestamp={msg.timestamp}
                   autoPlay={msg.autoPlay}
@@ -483,7 +522,7 @@ export default function Calls({ conversationState, setConversationState, onAppoi
             {audioBlob && !isRecording && (
               <div className="space-y-4">
                 <CheckCircle className="w-10 h-10 text-green-500 mx-auto" />
-                <audio src={URL.createObjectURL(audioBlob)} controls className="w-full rounded-lg" />
+                <audio src={recordingUrl} controls className="w-full rounded-lg" />
                 <div className="flex gap-4 justify-center">
                   <button
                     onClick={sendAudio}